@@ -16,8 +16,12 @@ else:
 # モジュールパスの追加
 sys.path.append(str(PROJECT_DIR / "src"))
 
+# 起動時間の計測開始（重いモジュールは各機能の使用時にインポートされる）
+from src.services.startup_timer import startup_timer
 from src import AOIView
 
+startup_timer.mark("imports")
+
 
 def main():
     """メインエントリーポイント"""
@@ -53,4 +57,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if "--startup-report" in sys.argv:
+        # 起動時間ログをバージョン毎に比較して表示
+        from src.services.startup_timer import print_comparison
+
+        print_comparison(str(PROJECT_DIR / "startup_timing.log"))
+    else:
+        main()
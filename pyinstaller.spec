@@ -44,7 +44,8 @@ print(f"Is 32bit build: {is_32bit}")
 datas = []
 embedded_files = [
     'settings.ini',
-    'kintone_settings.ini'
+    'kintone_settings.ini',
+    'pyproject.toml'
 ]
 
 for data_file in embedded_files:
@@ -1,9 +1,24 @@
-from .aoi_view import AOIView
-from .mode_view import ModeView
-from .repair_view import RepairView
+# 各ビューは重いモジュール（pandas・PIL・aoi_data_manager等）を使用するため、
+# 属性として参照されたときに初めてインポートする（PEP 562）
+_VIEW_MODULES = {
+    "AOIView": ".aoi_view",
+    "ModeView": ".mode_view",
+    "RepairView": ".repair_view",
+}
 
 __all__ = [
             "AOIView",
             "ModeView",
             "RepairView"
-           ]
\ No newline at end of file
+           ]
+
+
+def __getattr__(name):
+    if name in _VIEW_MODULES:
+        from importlib import import_module
+
+        module = import_module(_VIEW_MODULES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,35 +1,87 @@
 import configparser
+import copy
 import os
 import re
-import shutil
-import threading
+import sqlite3
 import time
 import tkinter as tk
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import List, Dict
-
-import pandas as pd
-from aoi_data_manager import (
-    DefectInfo,
-    FileManager,
-    KintoneClient,
-    RepairdInfo,
-    SqlOperations,
-)
-from ktec_smt_schedule import SMTSchedule
-from pandas import DataFrame
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from .dialog import ChangeUserDialog, ItemCodeChangeDialog, LotChangeDialog
+from .services import (
+    CsvJournal,
+    DbPartitions,
+    DbSnapshotCache,
+    DefectImageExporter,
+    DefectImageRenamer,
+    DefectStore,
+    ImageCatalog,
+    ImageEncodeOptions,
+    MemoryBudget,
+    RecordSnapshot,
+    ReferenceData,
+    ShareHealthMonitor,
+    TaskExecutor,
+    UiDispatcher,
+    WriteSpool,
+    compact_dataframe,
+    dataframe_nbytes,
+    fs_cache,
+    latency,
+    marker_geometry,
+    records_nbytes,
+    startup_timer,
+)
+from .services.task_executor import QUEUE_DB, QUEUE_IO, QUEUE_KINTONE
 from .sub_window import KintoneSettings, SettingsWindow
-from .utils import get_config_file_path, get_csv_file_path, get_project_dir
+from .utils import (
+    get_app_version,
+    get_config_file_path,
+    get_csv_file_path,
+    get_project_dir,
+    parse_image_filename,
+)
+
+# pandas・PIL・aoi_data_manager等の重いモジュールは起動を速くするため
+# 使用する機能の中でインポートする
+if TYPE_CHECKING:
+    from aoi_data_manager import DefectInfo, KintoneClient, RepairdInfo, SqlOperations
+    from pandas import DataFrame
 
 PROJECT_DIR = get_project_dir()
 
 
+# メモリ使用量を確認する間隔（ms）
+MEMORY_CHECK_INTERVAL_MS = 10_000
+# 終了時にスプールの反映を待つ最大時間（秒。残りは次回起動時に反映する）
+SPOOL_DRAIN_TIMEOUT_S = 2.0
+# 終了時にバックグラウンド処理（Kintone送信・SQLite書き込み・画像出力）を待つ最大時間（秒）
+EXECUTOR_SHUTDOWN_TIMEOUT_S = 10.0
+# ワーカースレッドからのUI更新をまとめて反映する間隔（ms）
+UI_DISPATCH_INTERVAL_MS = 30
+# 共有データベースのページキャッシュ（KiB）
+SHARED_DB_CACHE_KIB = 16 * 1024
+
+# NAS接続状態の表示（状態: (表示名, 色)）
+SHARE_STATE_LABELS = {
+    "unknown": ("確認中", "gray"),
+    "healthy": ("正常", "green"),
+    "degraded": ("遅延", "orange"),
+    "down": ("切断", "red"),
+}
+# 監視するディレクトリの表示名
+SHARE_NAMES = {
+    "image_directory": "画像",
+    "data_directory": "データ",
+    "schedule_directory": "計画表",
+    "shared_directory": "共有DB",
+}
+
+
 class AOIView(tk.Tk):
     """AOI製品経歴書ウィンドウ"""
 
@@ -75,11 +127,12 @@ class AOIView(tk.Tk):
         self.shared_directory = None  # 共有ディレクトリ
 
         # Kintone関連
-        self.kintone_client: KintoneClient = None  # Kintoneクライアント
+        self.kintone_client: "KintoneClient" = None  # Kintoneクライアント
         self.is_kintone_connected: bool = False
 
         # SMTスケジュール関連
-        self.schedule_df: DataFrame = None
+        self.schedule_df: "DataFrame" = None
+        self.schedule_nbytes: int = 0
         self.is_read_schedule: bool = False
 
         # UI要素の宣言
@@ -110,6 +163,8 @@ class AOIView(tk.Tk):
         self.smt_status_label = None
         self.connection_label = None
         self.sqlite_status_label = None
+        self.share_status_label = None
+        self.spool_status_label = None
         self.photo_image = None
 
         # 画像とプロジェクト関連
@@ -117,16 +172,56 @@ class AOIView(tk.Tk):
         self.current_line_name: str = None
         self.current_item_code: str = None
         self.current_lot_number: str = None
+        # 指図の世代（指図の切り替え毎に更新し、前の指図の非同期処理の結果を破棄する）
+        self.lot_generation = 0
+        # 指図の不良リストを読み込み中か（読み込み中は保存・削除を受け付けない）
+        self.lot_loading = False
         self.current_image_path: str = None
         self.current_image_filename: str = None
         self.user_name: str = None
 
         # データリスト
-        self.defect_list: List[DefectInfo] = []
-        self.repaird_list: List[RepairdInfo] = []
+        # 不良リスト（指図内で一定の列の文字列を共有するストア）
+        self.defect_list: DefectStore = DefectStore()
+        self.repaird_list: List["RepairdInfo"] = []
         self.delete_defect_ids: List[str] = []
         self.serial_dict: Dict[str] = {}
 
+        # 現在の基板の不良座標の格子索引（クリックでの選択用）
+        self._marker_grid = None
+        self._marker_grid_key = None
+
+        # 不良名マッピング・ユーザー一覧（更新時のみ再読み込み）
+        self.reference_data = ReferenceData(
+            PROJECT_DIR / "defect_mapping.csv", get_csv_file_path("user.csv")
+        )
+
+        # 不良画像のリネーム
+        self.image_renamer = DefectImageRenamer()
+
+        # 基板画像カタログ（指図変更時の画像検索用）
+        self.image_catalog = ImageCatalog(
+            PROJECT_DIR / "image_catalog.json", parser=parse_image_filename
+        )
+
+        # 不良画像の出力形式（settings.iniの[IMAGE_EXPORT]）
+        self.image_encode_options = ImageEncodeOptions()
+
+        # 起動時間をステータスバーに表示するか（settings.iniの[STARTUP]）
+        self.show_startup_timing = False
+        self.startup_timing_label = None
+
+        # メモリ予算（settings.iniの[MEMORY]、32bit版は既定で有効）
+        self.memory_budget = MemoryBudget()
+        self.memory_status_label = None
+
+        # NAS接続状態の監視（settings.iniの[NETWORK]）
+        self.share_health = ShareHealthMonitor()
+
+        # 過去のパーティションを圧縮スナップショットで取得するか（settings.iniの[DATABASE]）
+        self.db_sync_mode = "direct"
+        self.db_snapshot_codec = "lzma"
+
         # 基板番号
         self.current_board_index = 1
         self.total_boards = 1
@@ -135,23 +230,56 @@ class AOIView(tk.Tk):
         self._update_scheduled = None
 
         # 設定読み込み
-        self.__read_settings()
+        with startup_timer.phase("settings_read"):
+            self.__read_settings()
+        startup_timer.configure(PROJECT_DIR / "startup_timing.log", get_app_version())
+
+        # 操作レイテンシの定期出力
+        latency.start(PROJECT_DIR / "latency.log", interval_s=60)
+
+        # ワーカースレッドからのUI更新（同じ表示先は最新の値のみ反映）
+        self.ui = UiDispatcher(self, interval_ms=UI_DISPATCH_INTERVAL_MS)
+        self.ui.start()
+
+        # バックグラウンド処理の実行キュー（キュー毎に同時実行数を制限）
+        self.executor = TaskExecutor()
+
+        # NASへの書き込みのスプール（接続できない間はローカルに記録し、回復後に反映）
+        self.write_spool = WriteSpool(
+            PROJECT_DIR / "spool" / "aoi", is_available=self.is_share_available
+        )
+        self.__register_spool_handlers()
+
+        # 不良画像のバックグラウンド出力
+        self.image_exporter = DefectImageExporter(
+            marker_size=20,
+            font_size=12,
+            max_image_size=(800, 600),
+            text_area_width=160,
+            encode_options=self.image_encode_options,
+            spool=self.write_spool,
+            executor=self.executor,
+        )
+        self.__register_memory_consumers()
 
         # sqlite3データベース（UI作成前に変数のみ初期化）
         self.db_name = None
         self.sqlite_db = None
-        self.shared_sqlite_db = None
         self.sqlite_db_dir = None
-        self.shared_db_path = None
+        # 月毎に分割した共有データベース（ローカルにコピーせず直接参照）
+        self.db_partitions: Optional[DbPartitions] = None
+        # パーティション毎のローカルデータベース
+        self.local_dbs: Dict[str, "SqlOperations"] = {}
+        # 共有データベースへ未マージの指図（指図 -> パーティション）
+        self.unmerged_lots: Dict[str, str] = {}
+        # 共有データベースのカタログへ未登録の削除（ID -> 指図）
+        self.unmerged_deletes: Dict[str, str] = {}
 
         # UIの作成
         self.create_ui()
 
     def create_ui(self):
         """UI要素を作成する"""
-        # Kintoneクライアントの初期化
-        self.init_kintone_client()
-
         # UI描画
         self.create_menu()
         self.create_header()
@@ -160,9 +288,10 @@ class AOIView(tk.Tk):
         self.create_canvas_widgets()
         self.create_defect_list_widgets()
         self.create_status_bar()
+        startup_timer.mark("ui_built")
 
-        # SQLiteデータベース作成（ステータスバー作成後）
-        self.__create_sqlite_db()
+        # Kintone・SQLiteの初期化は初回描画後に行う（ユーザー入力中も進める）
+        self.after_idle(self._start_background_tasks)
 
         # 基板ラベルの初期化
         self.update_board_label()
@@ -175,17 +304,158 @@ class AOIView(tk.Tk):
 
     def run(self):
         """アプリケーションを起動してメインループを実行"""
-        # メインループ開始後に非同期処理を開始
-        self.after_idle(self._start_background_tasks)
         # メインループ開始
         self.mainloop()
 
     def _start_background_tasks(self):
-        """バックグラウンドタスクを開始（メインループ開始後に実行）"""
+        """バックグラウンドタスクを開始（初回描画後に実行）"""
+        # ウィンドウの描画を済ませてから重い初期化を行う
+        self.update_idletasks()
+        startup_timer.mark("first_paint")
+        # NAS接続状態の監視開始（回復したらスプールを反映）
+        self.share_health.add_listener(lambda *_: self.write_spool.kick())
+        self.share_health.start()
+        # 前回までの未反映分を含めてスプールの反映を開始
+        self.write_spool.start()
+        # Kintoneクライアントの初期化
+        try:
+            self.init_kintone_client()
+        except Exception as e:
+            print(f"キントーンクライアント初期化エラー: {e}")
+        # SQLiteデータベース作成
+        with startup_timer.phase("db_ready"):
+            self.__create_sqlite_db()
         # キントーン接続確認（非同期）
         self.kintone_connected_async()
         # SMTスケジュール非同期読み込み開始
         self.__read_smt_schedule_async()
+        # 基板画像カタログの更新
+        if self.image_directory:
+            self.image_catalog.refresh_async(self.image_directory)
+
+    def __register_spool_handlers(self):
+        """スプールの記録の種類毎の反映処理を登録"""
+
+        def _rename(entry):
+            result = self.image_renamer.rename_all(
+                [tuple(pair) for pair in entry["args"]["pairs"]]
+            )
+            for old_path, error in result.errors:
+                print(f"画像リネームエラー: {old_path}: {error}")
+            if result.errors:
+                raise OSError(f"画像リネームエラー: {len(result.errors)}件")
+
+        def _merge_db(entry):
+            from aoi_data_manager import SqlOperations
+
+            args = entry["args"]
+            try:
+                # 月の最初のマージで共有ディレクトリにパーティションを作成
+                if not os.path.exists(os.path.join(entry["target"], args["db_name"])):
+                    shared_db = SqlOperations(entry["target"], args["db_name"])
+                    shared_db.create_tables()
+                    shared_db.close()
+                SqlOperations.merge_target_database(
+                    args["local_dir"],
+                    entry["target"],
+                    args["db_name"],
+                    delete_defect_ids=args["delete_defect_ids"],
+                )
+            except sqlite3.OperationalError as e:
+                # 共有ディレクトリに接続できない・ロック中の場合は再試行する
+                # （それ以外の例外は再試行しても反映できないためfailedに移す）
+                raise OSError(f"共有データベースマージエラー: {e}") from e
+
+        def _register_lots(entry):
+            from aoi_data_manager import DefectInfo
+
+            try:
+                DbPartitions(entry["target"], DefectInfo).register(
+                    entry["args"]["lots"], entry["args"].get("deleted")
+                )
+            except sqlite3.OperationalError as e:
+                raise OSError(f"パーティションカタログ登録エラー: {e}") from e
+
+        def _publish_snapshot(entry):
+            DbSnapshotCache(PROJECT_DIR / "db_cache", entry["args"]["codec"]).publish(
+                entry["target"]
+            )
+
+        self.write_spool.register("rename", _rename)
+        self.write_spool.register("merge_db", _merge_db)
+        self.write_spool.register("register_lots", _register_lots)
+        self.write_spool.register("publish_snapshot", _publish_snapshot)
+
+    def spool_merge_database(self):
+        """
+        ローカルDBの差分の共有データベースへのマージをスプールに記録
+
+        書き込みのあったパーティションのみをマージし、先にカタログへ指図の
+        パーティションと削除した不良情報（書き込みの終わったパーティションに
+        ある場合もあるため）を登録する。
+        """
+        if not (self.sqlite_db_dir and self.shared_directory and self.unmerged_lots):
+            return
+        lots, self.unmerged_lots = self.unmerged_lots, {}
+        deleted, self.unmerged_deletes = self.unmerged_deletes, {}
+        self.write_spool.put(
+            "register_lots",
+            self.shared_directory,
+            {"lots": lots, "deleted": deleted},
+        )
+        for db_name in sorted(set(lots.values())):
+            self.write_spool.put(
+                "merge_db",
+                self.shared_directory,
+                {
+                    "local_dir": str(self.sqlite_db_dir),
+                    "db_name": db_name,
+                    "delete_defect_ids": list(self.delete_defect_ids),
+                },
+            )
+
+    def is_share_available(self, target: str) -> bool:
+        """
+        反映先を含むディレクトリが切断と判定されていないか（ネットワークには触れない）
+
+        ### Args:
+        - target (str): 反映先のパス
+
+        Returns:
+            bool: 切断と判定されていない場合True（監視対象外・未確認を含む）
+        """
+        target = os.path.normcase(os.path.normpath(str(target)))
+        for name, directory in self.share_targets().items():
+            if not directory:
+                continue
+            directory = os.path.normcase(os.path.normpath(directory))
+            if target == directory or target.startswith(
+                directory.rstrip(os.sep) + os.sep
+            ):
+                return not self.share_health.is_down(name)
+        return True
+
+    def __register_memory_consumers(self):
+        """メモリ予算の対象となるキャッシュを登録（破棄できるものは優先度順）"""
+        self.memory_budget.register(
+            "画像キャッシュ",
+            self.image_exporter.cache.nbytes,
+            evict=self.image_exporter.cache.clear,
+            priority=10,
+        )
+        self.memory_budget.register(
+            "表示画像",
+            lambda: (
+                self.displayed_image_size[0] * self.displayed_image_size[1] * 4
+                if self.photo_image and self.displayed_image_size
+                else 0
+            ),
+        )
+        self.memory_budget.register("SMT計画表", lambda: self.schedule_nbytes)
+        self.memory_budget.register(
+            "不良リスト",
+            lambda: self.defect_list.nbytes() + records_nbytes(self.repaird_list),
+        )
 
     def __alert_not_directory_settings(self):
         """ディレクトリ未設定アラート表示"""
@@ -203,28 +473,43 @@ class AOIView(tk.Tk):
     def __before_close(self):
         """閉じる前の処理"""
         if len(self.defect_list) > 0:
+            snapshot = self.defect_list.snapshot()
             try:
-                self.post_kintone_record_async(self.defect_list)
+                self.post_kintone_record_async(snapshot)
             except ValueError as e:
                 print(e)
                 messagebox.showerror("送信エラー", f"API送信エラー:{e}")
             # データベースにアイテムを追加
-            self.__insert_defect_info_to_db_async(self.defect_list)
-            # SQLiteデータベースを閉じる
-            if self.sqlite_db:
-                self.sqlite_db.close()
+            self.__insert_defect_info_to_db_async(snapshot)
+        # SQLiteデータベースは登録済みの書き込みの後にDBキューで閉じる
+        self.__close_sqlite_dbs()
+        # Kintone送信・SQLite書き込み・画像出力の完了を合わせて最大時間まで待つ
+        deadline = time.monotonic() + EXECUTOR_SHUTDOWN_TIMEOUT_S
+        if not self.executor.shutdown(wait=True, timeout=EXECUTOR_SHUTDOWN_TIMEOUT_S):
+            print(f"未完了のバックグラウンド処理があります: {self.executor.stats()}")
+        # 起動が完了しないまま終了した場合も記録済みの段階を出力する
+        startup_timer.write_report()
+        # 操作レイテンシの残りを出力
+        latency.stop()
+        # NAS接続状態の監視を停止
+        self.share_health.stop()
+        # 出力中の不良画像を書き終える（スプールへの記録。残りの時間まで待つ）
+        if not self.image_exporter.shutdown(
+            wait=True, timeout=max(0.0, deadline - time.monotonic())
+        ):
+            print(
+                f"未完了の不良画像出力が{self.image_exporter.pending_count()}件あります"
+            )
         # 差分を共有データベースにマージ
-        if self.sqlite_db_dir and self.shared_directory and self.db_name:
-            # マージ処理の実行
-            try:
-                SqlOperations.merge_target_database(
-                    self.sqlite_db_dir,
-                    self.shared_directory,
-                    self.db_name,
-                    delete_defect_ids=self.delete_defect_ids,
-                )
-            except Exception as e:
-                print(f"共有データベースマージエラー: {e}")
+        self.spool_merge_database()
+        # NASに反映できなかった記録は次回起動時に反映する
+        if not self.write_spool.drain(timeout=SPOOL_DRAIN_TIMEOUT_S):
+            print(
+                f"未送信の書き込みが{self.write_spool.pending()}件あります（次回起動時に送信）"
+            )
+        self.write_spool.stop()
+        # 未反映のUI更新を破棄して定期処理を止める
+        self.ui.stop()
         self.destroy()
 
     def __read_settings(self):
@@ -245,6 +530,30 @@ class AOIView(tk.Tk):
                 self.shared_directory = config["DIRECTORIES"].get(
                     "shared_directory", ""
                 )
+            # 不良画像の出力形式
+            self.image_encode_options = ImageEncodeOptions.from_config(
+                config["IMAGE_EXPORT"] if "IMAGE_EXPORT" in config else None
+            )
+            # 起動時間のステータスバー表示
+            if "STARTUP" in config:
+                self.show_startup_timing = config["STARTUP"].getboolean(
+                    "show_timing", False
+                )
+            # メモリ予算
+            self.memory_budget = MemoryBudget.from_config(
+                config["MEMORY"] if "MEMORY" in config else None
+            )
+            # NAS接続状態の監視
+            self.share_health = ShareHealthMonitor.from_config(
+                config["NETWORK"] if "NETWORK" in config else None,
+                self.share_targets(),
+            )
+            # 共有データベースの同期方法
+            if "DATABASE" in config:
+                self.db_sync_mode = config["DATABASE"].get("sync_mode", "direct")
+                self.db_snapshot_codec = config["DATABASE"].get(
+                    "snapshot_codec", "lzma"
+                )
 
     def __read_smt_schedule_async(self):
         """SMTスケジュールを非同期で読み込み"""
@@ -252,15 +561,18 @@ class AOIView(tk.Tk):
         def _read_schedule():
             """SMTスケジュールを読み込む"""
             try:
+                from ktec_smt_schedule import SMTSchedule
+
                 # ステータスバーの更新
                 self.safe_update_smt_status("読み込み中...", "orange")
                 self.safe_update_status("SMTスケジュールを読み込み中...")
                 # スケジュール情報の取得
                 if self.schedule_directory:
                     # スケジュール情報のDataFrame取得
-                    self.schedule_df = SMTSchedule.get_lot_infos(
-                        self.schedule_directory, 1, 9
-                    )
+                    with startup_timer.phase("schedule_ready"):
+                        self.schedule_df = SMTSchedule.get_lot_infos(
+                            self.schedule_directory, 1, 9
+                        )
                     # スケジュール情報の読み込み完了
                     self.is_read_schedule = True
                     # スケジュール情報のCSVパスを取得
@@ -269,12 +581,16 @@ class AOIView(tk.Tk):
                     self.schedule_df.to_csv(
                         output_path, index=False, encoding="utf-8-sig"
                     )
+                    # 参照用の列を省メモリな型に変換
+                    self.schedule_df = compact_dataframe(self.schedule_df)
+                    self.schedule_nbytes = dataframe_nbytes(self.schedule_df)
 
                     # 成功時のステータスバー更新
                     self.safe_update_smt_status("読み込み完了", "green")
                     self.safe_update_status("SMTスケジュールの読み込みが完了しました")
                 else:
                     # ディレクトリ未設定時
+                    startup_timer.mark("schedule_ready")
                     self.safe_update_smt_status("未設定", "gray")
                     self.safe_update_status(
                         "設定からディレクトリ設定を完了してください"
@@ -286,73 +602,185 @@ class AOIView(tk.Tk):
                 self.safe_update_status(error_msg)
                 print(error_msg)
 
-        # バックグラウンドスレッドで実行
-        thread = threading.Thread(target=_read_schedule, daemon=True)
-        thread.start()
+        # バックグラウンドで実行（読み込み中の再要求は順番に実行）
+        self.executor.submit(QUEUE_IO, _read_schedule, key="schedule")
 
     def __create_sqlite_db(self):
         """SQLiteデータベースを作成"""
-        self.db_name = "aoi_data.db"
-        db_connected = False
+        from aoi_data_manager import DefectInfo
+
         db_type = "local"
         self.sqlite_db_dir = PROJECT_DIR
+        self.__close_sqlite_dbs()
 
         try:
+            # 共有データベースは月毎のパーティションを指図毎に読み取り専用で参照する。
+            # 接続は最初の読み込みで開く（起動時に切断していても回復後に参照できる）
             if self.shared_directory:
-                self.shared_db_path = os.path.join(self.shared_directory, self.db_name)
-                if os.path.exists(self.shared_db_path):
-                    # 共有データをローカルにコピー
-                    shutil.copy(self.shared_db_path, self.sqlite_db_dir)
-                    db_type = "共有"
-                else:
-                    # 新しいデータベースを共有ディレクトリに作成
-                    self.shared_sqlite_db = SqlOperations(
-                        self.shared_directory, self.db_name
-                    )
-                    self.shared_sqlite_db.create_tables()
-                    db_type = "共有"
+                snapshots = self.__create_snapshot_cache()
+                self.db_partitions = DbPartitions(
+                    self.shared_directory,
+                    DefectInfo,
+                    cache_kib=SHARED_DB_CACHE_KIB,
+                    snapshots=snapshots,
+                    on_missing_snapshot=lambda db_path: self.fetch_snapshot_async(
+                        snapshots, db_path
+                    ),
+                )
+                db_type = "共有"
+            else:
+                self.db_partitions = DbPartitions("", DefectInfo)
 
-            # ローカルデータベースの作成
-            self.sqlite_db = SqlOperations(self.sqlite_db_dir, self.db_name)
-            self.sqlite_db.create_tables()
-            db_connected = True
+            # 指図（未選択の場合は当月）のローカルデータベースの作成
+            if self.current_lot_number:
+                db_name = self.db_partitions.partition_for_lot(self.current_lot_number)
+            else:
+                db_name = self.db_partitions.partition_name()
+            self.__open_partition(db_name)
 
             # 接続状態をステータスバーに反映
-            self.safe_update_sqlite_status(db_connected, db_type)
+            self.safe_update_sqlite_status(True, db_type)
         except Exception as e:
             print(f"SQLiteデータベース作成エラー: {e}")
             self.safe_update_sqlite_status(False, db_type)
             messagebox.showerror("エラー", "ネットワーク接続を確認してください。")
 
-    def __insert_defect_info_to_db_async(self, defect_info: List[DefectInfo]):
+    def __create_snapshot_cache(self) -> Optional[DbSnapshotCache]:
+        """圧縮スナップショットのキャッシュを作成（sync_mode = compressed の場合のみ）"""
+        if self.db_sync_mode != "compressed":
+            return None
+        try:
+            return DbSnapshotCache(PROJECT_DIR / "db_cache", self.db_snapshot_codec)
+        except (ValueError, OSError) as e:
+            print(f"スナップショットキャッシュ作成エラー: {e}")
+            return None
+
+    def fetch_snapshot_async(self, snapshots: DbSnapshotCache, db_path: str):
+        """
+        過去のパーティションの圧縮スナップショットをバックグラウンドで取得
+
+        取得と展開はIOキューで行い、次の読み込みから展開したものを使う。
+        スナップショットがまだない場合は作成をスプールに記録する。
+
+        ### Args:
+        - snapshots (DbSnapshotCache): 展開先のキャッシュ
+        - db_path (str): 共有ディレクトリのパーティションのパス
+        """
+
+        def _fetch():
+            try:
+                local_path = snapshots.fetch(db_path)
+            except OSError as e:
+                print(f"スナップショット取得エラー: {e}")
+                return
+            if local_path is None:
+                self.spool_publish_snapshot(db_path)
+
+        self.executor.submit(QUEUE_IO, _fetch, key=db_path)
+
+    def spool_publish_snapshot(self, db_path: str):
+        """
+        過去のパーティションの圧縮スナップショットの作成をスプールに記録
+
+        ### Args:
+        - db_path (str): 共有ディレクトリのパーティションのパス
+        """
+        self.write_spool.put(
+            "publish_snapshot", db_path, {"codec": self.db_snapshot_codec}
+        )
+
+    def __open_partition(self, db_name: str) -> "SqlOperations":
+        """
+        パーティションのローカルデータベースを開き、書き込み先にする
+
+        ### Args:
+        - db_name (str): パーティションのファイル名
+
+        Returns:
+            SqlOperations: ローカルデータベース
+        """
+        sqlite_db = self.local_dbs.get(db_name)
+        if sqlite_db is None:
+            sqlite_db = self.__create_local_db(db_name)
+            self.local_dbs[db_name] = sqlite_db
+        self.db_name = db_name
+        self.sqlite_db = sqlite_db
+        return sqlite_db
+
+    def __create_local_db(self, db_name: str) -> "SqlOperations":
+        """パーティションのローカルデータベースを作成して開く（各スレッドから呼ばれる）"""
+        from aoi_data_manager import SqlOperations
+
+        sqlite_db = SqlOperations(self.sqlite_db_dir, db_name)
+        sqlite_db.create_tables()
+        return sqlite_db
+
+    def __close_sqlite_dbs(self):
+        """
+        ローカルデータベースとパーティションの接続を閉じる
+
+        登録済みの書き込みは閉じる前の接続を使うため、書き込みと同じキーで
+        DBキューに登録し、それらの完了後に閉じる。
+        """
+        sqlite_dbs = list(self.local_dbs.values())
+        partitions = self.db_partitions
+        self.local_dbs = {}
+        self.sqlite_db = None
+
+        def _close():
+            for sqlite_db in sqlite_dbs:
+                try:
+                    sqlite_db.close()
+                except Exception as e:
+                    print(f"SQLiteデータベースクローズエラー: {e}")
+            if partitions is not None:
+                partitions.close()
+
+        self.executor.submit(QUEUE_DB, _close, key="sqlite")
+
+    def __insert_defect_info_to_db_async(self, snapshot: RecordSnapshot):
         """不良情報を非同期でSQLiteデータベースに挿入"""
+        # 指図の切り替え後に実行されても元のパーティションに書き込む
+        sqlite_db = self.sqlite_db
+        self.__mark_unmerged()
 
         def _task():
             """非同期挿入タスク"""
-            if self.sqlite_db:
+            if sqlite_db:
                 try:
-                    self.sqlite_db.merge_insert_defect_infos(defect_info)
+                    # スナップショット取得時点の内容をDefectInfoのリストとして渡す
+                    defect_info = snapshot.records()
+                    with latency.measure("sqlite_insert"):
+                        sqlite_db.merge_insert_defect_infos(defect_info)
                 except Exception as e:
                     print(f"データベースマージ挿入エラー: {e}")
 
-        thread = threading.Thread(target=_task, daemon=True)
-        thread.start()
+        self.executor.submit(QUEUE_DB, _task, key="sqlite")
 
-    def __remove_defect_info_from_db_async(self, defect_info: DefectInfo):
+    def __remove_defect_info_from_db_async(self, defect_info: "DefectInfo"):
         """不良情報を非同期でSQLiteデータベースから削除"""
+        sqlite_db = self.sqlite_db
+        self.__mark_unmerged()
 
         def _task():
-            if self.sqlite_db:
+            if sqlite_db:
                 try:
-                    self.sqlite_db.delete_defect_info(defect_info.id)
+                    with latency.measure("sqlite_delete"):
+                        sqlite_db.delete_defect_info(defect_info.id)
                 except Exception as e:
                     print(f"データベース削除エラー: {e}")
 
-        thread = threading.Thread(target=_task, daemon=True)
-        thread.start()
+        self.executor.submit(QUEUE_DB, _task, key="sqlite")
+
+    def __mark_unmerged(self):
+        """現在の指図のパーティションを共有データベースへのマージ対象にする"""
+        if self.current_lot_number and self.db_name:
+            self.unmerged_lots[self.current_lot_number] = self.db_name
 
     def init_kintone_client(self):
         """キントーンクライアントの初期化"""
+        from aoi_data_manager import FileManager, KintoneClient
+
         kintone_settings_path = get_config_file_path("kintone_settings.ini")
         kintone_settings = FileManager.load_kintone_settings_file(
             kintone_settings_path.as_posix()
@@ -368,20 +796,20 @@ class AOIView(tk.Tk):
 
         def _check_connection():
             try:
-                connected = self.kintone_client.is_connected()
+                with startup_timer.phase("kintone_ready"):
+                    connected = self.kintone_client.is_connected()
                 self.is_kintone_connected = connected
                 status_msg = "キントーン接続済み" if connected else "キントーン未接続"
-                self.after(0, lambda: self.safe_update_connection_status(connected))
-                self.after(0, lambda: self.safe_update_status(status_msg))
+                self.safe_update_connection_status(connected)
+                self.safe_update_status(status_msg)
             except Exception as e:
                 error_msg = f"キントーン接続エラー: {e}"
-                self.after(0, lambda: self.safe_update_connection_status(False))
-                self.after(0, lambda: self.safe_update_status(error_msg))
+                self.safe_update_connection_status(False)
+                self.safe_update_status(error_msg)
                 print(error_msg)
 
-        # バックグラウンドスレッドで実行
-        thread = threading.Thread(target=_check_connection, daemon=True)
-        thread.start()
+        # バックグラウンドで実行
+        self.executor.submit(QUEUE_KINTONE, _check_connection, key="connection")
 
     def create_menu(self):
         """メニューの作成"""
@@ -728,12 +1156,79 @@ class AOIView(tk.Tk):
         )
         self.sqlite_status_label.pack(side=tk.RIGHT, padx=10)
 
+        # NAS接続状態インジケータ
+        self.share_status_label = tk.Label(
+            self.status_right_frame,
+            text="● NAS: 確認中",
+            font=("Yu Gothic UI", 9),
+            fg="gray",
+        )
+        self.share_status_label.pack(side=tk.RIGHT, padx=10)
+        self.share_health.add_listener(self.safe_update_share_status)
+
+        # NASに未反映の書き込み件数・失敗件数（ある場合のみ表示）
+        self.spool_status_label = tk.Label(
+            self.status_right_frame, text="", font=("Yu Gothic UI", 9), fg="orange"
+        )
+        self.spool_status_label.pack(side=tk.RIGHT, padx=10)
+        self.write_spool.add_listener(self.safe_update_spool_status)
+        self.update_spool_status(self.write_spool.pending())
+
         # 接続状況インジケータ
         self.connection_label = tk.Label(
             self.status_right_frame, text="● 未接続", font=("Yu Gothic UI", 9), fg="red"
         )
         self.connection_label.pack(side=tk.RIGHT, padx=10)
 
+        # 起動時間（settings.iniで有効な場合のみ）
+        if self.show_startup_timing:
+            self.startup_timing_label = tk.Label(
+                self.status_right_frame,
+                text="起動: 計測中",
+                font=("Yu Gothic UI", 9),
+                fg="gray",
+            )
+            self.startup_timing_label.pack(side=tk.RIGHT, padx=10)
+            startup_timer.add_listener(self.safe_update_startup_timing)
+
+        # メモリ使用量の警告（予算が有効な場合のみ、予算に近づいたら表示）
+        if self.memory_budget.enabled:
+            self.memory_status_label = tk.Label(
+                self.status_right_frame, text="", font=("Yu Gothic UI", 9)
+            )
+            self.memory_status_label.pack(side=tk.RIGHT, padx=10)
+            self.memory_budget.add_listener(
+                lambda level, used: print(
+                    f"メモリ使用量: {level} ({self.memory_budget.report()})"
+                )
+            )
+            self.after(MEMORY_CHECK_INTERVAL_MS, self.check_memory_budget)
+
+    def check_memory_budget(self):
+        """メモリ使用量を確認し、予算に近い場合は警告を表示する（定期実行）"""
+        try:
+            level = self.memory_budget.check()
+            if level == "ok":
+                self.memory_status_label.config(text="")
+            else:
+                used_mb = self.memory_budget.last_used_bytes / (1024 * 1024)
+                self.memory_status_label.config(
+                    text=f"⚠ メモリ {used_mb:.0f}/{self.memory_budget.budget_mb:.0f}MB",
+                    fg="red" if level == "critical" else "orange",
+                )
+            self.after(MEMORY_CHECK_INTERVAL_MS, self.check_memory_budget)
+        except tk.TclError:
+            pass
+
+    def safe_update_startup_timing(self, name: str, elapsed: float):
+        """起動時間の表示を更新（各スレッドから呼ばれる）"""
+
+        def _update():
+            if self.startup_timing_label and self.startup_timing_label.winfo_exists():
+                self.startup_timing_label.config(text=f"起動: {name} {elapsed:.2f}s")
+
+        self.ui.post("startup_timing", _update)
+
     def update_status(self, message: str):
         """ステータスメッセージを更新"""
         try:
@@ -745,15 +1240,8 @@ class AOIView(tk.Tk):
             pass
 
     def safe_update_status(self, message: str):
-        """安全なステータス更新（非同期処理用）"""
-        try:
-            # ウィンドウ自体が存在するかチェック
-            if hasattr(self, "winfo_exists") and self.winfo_exists():
-                # メインスレッドで実行
-                self.after(0, lambda: self.update_status(message))
-        except (tk.TclError, AttributeError, RuntimeError):
-            # ウィンドウが既に破棄されている場合は何もしない
-            pass
+        """安全なステータス更新（非同期処理用、最新のメッセージのみ反映）"""
+        self.ui.post("status", self.update_status, message)
 
     def update_smt_status(self, status: str, color: str = "black"):
         """SMTスケジュール読み込み状況を更新"""
@@ -764,12 +1252,7 @@ class AOIView(tk.Tk):
 
     def safe_update_smt_status(self, status: str, color: str = "black"):
         """安全なSMTスケジュール読み込み状況更新（非同期処理用）"""
-        try:
-            if hasattr(self, "winfo_exists") and self.winfo_exists():
-                # メインスレッドで実行
-                self.after(0, lambda: self.update_smt_status(status, color))
-        except (tk.TclError, AttributeError, RuntimeError):
-            pass
+        self.ui.post("smt_status", self.update_smt_status, status, color)
 
     def update_connection_status(self, connected: bool):
         """接続状況を更新"""
@@ -789,12 +1272,7 @@ class AOIView(tk.Tk):
 
     def safe_update_connection_status(self, connected: bool):
         """安全な接続状況更新（非同期処理用）"""
-        try:
-            if hasattr(self, "winfo_exists") and self.winfo_exists():
-                # メインスレッドで実行
-                self.after(0, lambda: self.update_connection_status(connected))
-        except (tk.TclError, AttributeError, RuntimeError):
-            pass
+        self.ui.post("connection_status", self.update_connection_status, connected)
 
     def update_sqlite_status(self, connected: bool, db_type: str = "local"):
         """SQLite接続状況を更新"""
@@ -813,13 +1291,58 @@ class AOIView(tk.Tk):
 
     def safe_update_sqlite_status(self, connected: bool, db_type: str = "local"):
         """安全なSQLite接続状況更新（非同期処理用）"""
+        self.ui.post("sqlite_status", self.update_sqlite_status, connected, db_type)
+
+    def update_share_status(self, state: str, statuses: dict):
+        """NAS接続状態を更新"""
+        try:
+            if (
+                hasattr(self, "share_status_label")
+                and self.share_status_label.winfo_exists()
+            ):
+                label, color = SHARE_STATE_LABELS.get(state, (state, "gray"))
+                # 正常でないディレクトリを併記
+                names = [
+                    SHARE_NAMES.get(name, name)
+                    for name, status in statuses.items()
+                    if status.state in ("degraded", "down")
+                ]
+                text = f"● NAS: {label}"
+                if names:
+                    text += f" ({', '.join(names)})"
+                self.share_status_label.config(text=text, fg=color)
+        except tk.TclError:
+            pass
+
+    def safe_update_share_status(self, state: str, statuses: dict):
+        """安全なNAS接続状態更新（監視スレッドから呼ばれる）"""
+        self.ui.post("share_status", self.update_share_status, state, statuses)
+
+    def update_spool_status(self, count: int):
+        """NASに未反映の書き込み件数・反映できずにfailedに移した件数を更新"""
         try:
-            if hasattr(self, "winfo_exists") and self.winfo_exists():
-                # メインスレッドで実行
-                self.after(0, lambda: self.update_sqlite_status(connected, db_type))
-        except (tk.TclError, AttributeError, RuntimeError):
+            if (
+                hasattr(self, "spool_status_label")
+                and self.spool_status_label.winfo_exists()
+            ):
+                failed = self.write_spool.failed()
+                texts = []
+                if count:
+                    texts.append(f"未送信: {count}件")
+                if failed:
+                    texts.append(f"失敗: {failed}件")
+                self.spool_status_label.config(text=" / ".join(texts))
+        except tk.TclError:
             pass
 
+    def safe_update_spool_status(self, count: int):
+        """安全な未反映件数の更新（各スレッドから呼ばれる）"""
+        self.ui.post("spool_status", self.update_spool_status, count)
+
+    def share_targets(self) -> Dict[str, str]:
+        """NAS接続状態の監視対象 {名前: ディレクトリ}"""
+        return {name: getattr(self, name, "") or "" for name in SHARE_NAMES}
+
     def on_window_resize(self, event):
         """ウィンドウリサイズ時の処理"""
         # self以外のウィジェットのConfigureイベントは無視
@@ -896,6 +1419,8 @@ class AOIView(tk.Tk):
 
     def open_image(self):
         """画像を開くダイアログを表示し、選択された画像をcanvasに表示"""
+        from PIL import Image, ImageTk
+
         filepath = filedialog.askopenfilename(
             filetypes=[
                 ("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif"),
@@ -921,63 +1446,70 @@ class AOIView(tk.Tk):
 
     def open_select_image(self, filepath: str):
         """指定されたファイルパスの画像をcanvasに表示"""
+        from PIL import Image, ImageTk
+
         if not filepath:
             return
         try:
-            self.current_image_path = filepath
-            image = Image.open(filepath)
-
-            # 元画像のサイズを保存
-            self.original_image_size = image.size
-
-            # Canvas実際のサイズを取得
-            self.canvas.update_idletasks()  # サイズ情報を確実に取得
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-
-            # Canvasサイズが取得できない場合（初期化時など）はデフォルト値を使用
-            if canvas_width <= 1 or canvas_height <= 1:
-                canvas_width = 800  # デフォルト幅
-                canvas_height = 400  # デフォルト高さ
-
-            # 画像のアスペクト比を計算
-            img_width, img_height = image.size
-            img_aspect = img_width / img_height
-            canvas_aspect = canvas_width / canvas_height
-
-            # アスペクト比を維持しつつ、Canvasに最適なサイズを計算
-            if img_aspect > canvas_aspect:
-                # 画像が横長の場合、幅を基準にリサイズ
-                new_width = canvas_width
-                new_height = int(canvas_width / img_aspect)
-            else:
-                # 画像が縦長の場合、高さを基準にリサイズ
-                new_height = canvas_height
-                new_width = int(canvas_height * img_aspect)
-
-            # 画像をリサイズ（アスペクト比保持、拡大・縮小両対応）
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            self.displayed_image_size = image.size
-
-            # 画像の中央配置のためのオフセット計算
-            self.image_offset = (
-                (canvas_width - self.displayed_image_size[0]) // 2,
-                (canvas_height - self.displayed_image_size[1]) // 2,
-            )
+            with latency.measure("open_select_image"):
+                self.current_image_path = filepath
+                image = Image.open(filepath)
+
+                # 元画像のサイズを保存
+                self.original_image_size = image.size
+
+                # Canvas実際のサイズを取得
+                self.canvas.update_idletasks()  # サイズ情報を確実に取得
+                canvas_width = self.canvas.winfo_width()
+                canvas_height = self.canvas.winfo_height()
+
+                # Canvasサイズが取得できない場合（初期化時など）はデフォルト値を使用
+                if canvas_width <= 1 or canvas_height <= 1:
+                    canvas_width = 800  # デフォルト幅
+                    canvas_height = 400  # デフォルト高さ
+
+                # メモリ予算が有効な場合はJPEGを表示サイズに近い縮小率でデコードする
+                if self.memory_budget.enabled:
+                    image.draft("RGB", (canvas_width, canvas_height))
+
+                # 画像のアスペクト比を計算（縮小デコード時も元画像のサイズで計算）
+                img_width, img_height = self.original_image_size
+                img_aspect = img_width / img_height
+                canvas_aspect = canvas_width / canvas_height
+
+                # アスペクト比を維持しつつ、Canvasに最適なサイズを計算
+                if img_aspect > canvas_aspect:
+                    # 画像が横長の場合、幅を基準にリサイズ
+                    new_width = canvas_width
+                    new_height = int(canvas_width / img_aspect)
+                else:
+                    # 画像が縦長の場合、高さを基準にリサイズ
+                    new_height = canvas_height
+                    new_width = int(canvas_height * img_aspect)
+
+                # 画像をリサイズ（アスペクト比保持、拡大・縮小両対応）
+                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                self.displayed_image_size = image.size
+
+                # 画像の中央配置のためのオフセット計算
+                self.image_offset = (
+                    (canvas_width - self.displayed_image_size[0]) // 2,
+                    (canvas_height - self.displayed_image_size[1]) // 2,
+                )
 
-            self.photo_image = ImageTk.PhotoImage(image)
-            self.canvas.delete("all")
+                self.photo_image = ImageTk.PhotoImage(image)
+                self.canvas.delete("all")
 
-            # 画像を中央に配置
-            self.canvas.create_image(
-                canvas_width // 2,
-                canvas_height // 2,
-                image=self.photo_image,
-                anchor="center",
-            )
+                # 画像を中央に配置
+                self.canvas.create_image(
+                    canvas_width // 2,
+                    canvas_height // 2,
+                    image=self.photo_image,
+                    anchor="center",
+                )
 
-            # 既存の座標マーカーを再描画
-            # self.redraw_coordinate_markers()
+                # 既存の座標マーカーを再描画
+                self.redraw_coordinate_markers()
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open image:\n{e}")
@@ -1012,27 +1544,105 @@ class AOIView(tk.Tk):
 
     def redraw_coordinate_markers(self):
         """既存の不良座標マーカーを再描画"""
+        # 全ての座標マーカーをクリア
+        self.canvas.delete("defect_marker")
+
         # defect_listが空の場合は何もしない
         if not self.defect_list:
             return
 
-        # 現在の基板の不良リストを取得
-        current_defects = [
-            d
-            for d in self.defect_list
-            if d.current_board_index == self.current_board_index
-        ]
+        # 現在の基板の不良座標をまとめてCanvas座標に変換
+        _, ranks, canvas_xs, canvas_ys = self.current_board_marker_coords()
 
-        # 全ての座標マーカーをクリア
-        self.canvas.delete("defect_marker")
+        # マーカーのサイズ
+        r = 5
 
         # 各不良座標にマーカーを描画
-        for i, defect in enumerate(current_defects):
-            if defect.x is not None and defect.y is not None:
-                # 相対座標として扱う
-                self.draw_coordinate_marker(
-                    defect.x, defect.y, tag=f"defect_marker_{i}"
-                )
+        for i, canvas_x, canvas_y in zip(
+            ranks.tolist(), canvas_xs.tolist(), canvas_ys.tolist()
+        ):
+            self.canvas.create_oval(
+                canvas_x - r,
+                canvas_y - r,
+                canvas_x + r,
+                canvas_y + r,
+                fill=self.fillColor,
+                outline="red",
+                width=2,
+                tags=("defect_marker", f"defect_marker_{i}"),
+            )
+
+    def relative_to_canvas_coords_batch(self, xs, ys):
+        """相対座標の配列をCanvas座標の配列に変換（画像未表示の場合はNone）"""
+        if not self.displayed_image_size or not self.image_offset:
+            return None
+        return marker_geometry.relative_to_canvas(
+            xs, ys, self.displayed_image_size, self.image_offset
+        )
+
+    def current_board_marker_coords(self):
+        """
+        現在の基板の座標がある不良のCanvas座標を取得
+
+        Returns:
+            Tuple: (defect_list内の位置, 基板内の順番, Canvas座標x, Canvas座標y)
+        """
+        import numpy as np
+
+        positions, ranks, xs, ys = marker_geometry.board_coordinates(
+            self.defect_list, self.current_board_index
+        )
+        coords = self.relative_to_canvas_coords_batch(xs, ys)
+        if coords is None:
+            empty = np.empty(0)
+            return positions[:0], ranks[:0], empty, empty
+        return positions, ranks, coords[0], coords[1]
+
+    def current_board_marker_grid(self) -> marker_geometry.MarkerGrid:
+        """現在の基板の不良座標の格子索引（不良リスト・基板が変わった場合のみ作り直す）"""
+        version = getattr(self.defect_list, "version", None)
+        key = (id(self.defect_list), version, self.current_board_index)
+        if version is None or key != self._marker_grid_key:
+            positions, _, xs, ys = marker_geometry.board_coordinates(
+                self.defect_list, self.current_board_index
+            )
+            self._marker_grid = marker_geometry.MarkerGrid.build(positions, xs, ys)
+            self._marker_grid_key = key
+        return self._marker_grid
+
+    def hit_test_marker(self, canvas_x: float, canvas_y: float, radius: float = 8):
+        """
+        クリック位置から半径（px）以内で最も近い現在の基板の不良を返す
+
+        マーカーを表示していない場合は判定しない（見えない不良を選択しない）。
+
+        Returns:
+            Optional[int]: defect_list内の位置（該当なしの場合はNone）
+        """
+        if not self.defect_list or not self.displayed_image_size:
+            return None
+        if not self.canvas.find_withtag("defect_marker"):
+            return None
+        rel_x, rel_y = self.canvas_to_relative_coords(canvas_x, canvas_y)
+        if rel_x is None or rel_y is None:
+            return None
+        return self.current_board_marker_grid().nearest(
+            rel_x,
+            rel_y,
+            radius / self.displayed_image_size[0],
+            radius / self.displayed_image_size[1],
+        )
+
+    def select_defect(self, defect_id: str) -> bool:
+        """不良リストの指定したIDの行を選択（選択時の表示はon_defect_selectで行う）"""
+        for item in self.defect_listbox.get_children():
+            values = self.defect_listbox.item(item, "values")
+            if len(values) > 3 and values[3] == defect_id:
+                self.defect_listbox.selection_set(item)
+                self.defect_listbox.focus(item)
+                self.defect_listbox.see(item)
+                return True
+        return False
 
     def on_defect_select(self, event):
         """defect_listboxで選択されたアイテムの情報をエントリに表示し、canvasに座標マーカーを表示"""
@@ -1046,10 +1656,12 @@ class AOIView(tk.Tk):
             self.rf_entry.insert(0, item_values[1])  # RFエントリに値を設定
             self.defect_entry.delete(0, tk.END)  # 不良項目エントリをクリア
             self.defect_entry.insert(0, item_values[2])  # 不良項目エントリに値を設定
-            index = int(item_values[0]) - 1  # Noは1始まりなので-1してインデックスに変換
-            defect_item = self.defect_list[
-                index
-            ]  # defect_listから選択中のアイテムを取得
+            # defect_listから選択中のアイテムをIDで取得（Noは基板毎の番号のため）
+            defect_item = next(
+                (d for d in self.defect_list if d.id == item_values[3]), None
+            )
+            if defect_item is None:
+                return
 
             # 相対座標を取得
             rel_x, rel_y = defect_item.x, defect_item.y  # 相対座標として扱う
@@ -1059,6 +1671,20 @@ class AOIView(tk.Tk):
             if rel_x is not None and rel_y is not None:
                 self.draw_coordinate_marker(rel_x, rel_y)
 
+    def find_board_defect(
+        self, board_index: int, defect_number: str
+    ) -> Optional["DefectInfo"]:
+        """指定した基板・不良番号の不良を返す（ない場合はNone）"""
+        return next(
+            (
+                d
+                for d in self.defect_list
+                if d.current_board_index == board_index
+                and d.defect_number == defect_number
+            ),
+            None,
+        )
+
     def defect_number_update(self):
         filter_defect_list = [
             d
@@ -1068,7 +1694,7 @@ class AOIView(tk.Tk):
         max_len = len(filter_defect_list)
         self.no_value.config(text=str(max_len + 1))
 
-    def defect_list_insert(self, item: DefectInfo):
+    def defect_list_insert(self, item: "DefectInfo"):
         self.defect_list.append(item)
         self.defect_listbox.insert(
             "",
@@ -1076,6 +1702,7 @@ class AOIView(tk.Tk):
             values=[item.defect_number, item.reference, item.defect_name, item.id],
         )
         self.defect_number_update()
+        self.redraw_coordinate_markers()
 
     def defect_list_delete(self, index, tree_index: str):
         del self.defect_list[index]
@@ -1084,19 +1711,21 @@ class AOIView(tk.Tk):
         self.defect_number_update()
         # canvasの座標マーカーを削除
         self.canvas.delete("coordinate_marker")
+        self.redraw_coordinate_markers()
 
-    def defect_list_update(self, index: str, item: DefectInfo):
+    def defect_list_update(self, index: str, item: "DefectInfo"):
         # indexが数値に変換可能か確認
         if not index.isdigit():
             messagebox.showerror("Error", "不良番号が不正です。")
             return
         index = int(index)
-        list_index = 0
-        for i in self.defect_list:
+        # 同じIDのレコードをその位置のまま置き換える（見つからない場合は追加）
+        for list_index, i in enumerate(self.defect_list):
             if i.id == item.id:
+                self.defect_list[list_index] = item
                 break
-            list_index = list_index + 1
-        self.defect_list[list_index] = item
+        else:
+            self.defect_list.append(item)
         self.defect_listbox.item(
             self.defect_listbox.get_children()[index - 1],
             values=[item.defect_number, item.reference, item.defect_name, item.id],
@@ -1104,6 +1733,7 @@ class AOIView(tk.Tk):
         self.defect_number_update()
         # canvasの座標マーカーを削除
         self.canvas.delete("coordinate_marker")
+        self.redraw_coordinate_markers()
 
     def exists_defect_listbox(self, defect_number: str) -> bool:
         """defect_listboxに指定された不良番号が存在するか確認"""
@@ -1115,39 +1745,135 @@ class AOIView(tk.Tk):
 
     def read_defect_list_csv(self, filepath: str):
         """CSVファイルから不良リストを読み込み、defect_listに設定"""
+        from aoi_data_manager import FileManager, RepairdInfo
+
         try:
             # ライブラリを使用して不良データを取得
-            self.defect_list = FileManager.read_defect_csv(filepath)
+            self.defect_list = DefectStore(FileManager.read_defect_csv(filepath))
 
-            # 修理データを取得
+            # 修理データを取得（修理画面の追記ジャーナルを畳み込む）
             repaird_path = FileManager.create_repaird_csv_path(
                 self.data_directory, self.current_lot_number
             )
-            self.repaird_list = FileManager.read_repaird_csv(repaird_path)
+            self.repaird_list = CsvJournal(
+                repaird_path,
+                RepairdInfo,
+                FileManager.read_repaird_csv,
+                FileManager.save_repaird_csv,
+            ).load()
             self.update_defect_listbox()
         except Exception as e:
             raise Exception(e)
 
     def read_defect_list_db(self):
-        """SQLiteデータベースから不良リストを読み込み、defect_listに設定"""
+        """
+        SQLiteデータベースから不良リストを非同期に読み込み、defect_listに設定
+
+        書き込み先のパーティションの決定（カタログ）と共有データベースの読み込みは
+        NASに触れるためDBキューで行い、結果はTkスレッドで反映する（指図が
+        変わっていれば破棄）。読み込みが終わるまで保存・削除は受け付けない。
+        """
+        if not (self.sqlite_db and self.db_partitions is not None):
+            return
+        lot_number = self.current_lot_number
+        generation = self.lot_generation
+        partitions = self.db_partitions
+        local_dbs = dict(self.local_dbs)
+        self.lot_loading = True
+
+        def _apply(db_name: str, sqlite_db: "SqlOperations", records: list):
+            """読み込んだ不良リストを反映（Tkスレッド）"""
+            if self.local_dbs.setdefault(db_name, sqlite_db) is not sqlite_db:
+                sqlite_db.close()
+            if generation != self.lot_generation:
+                return
+            self.lot_loading = False
+            # 指図のパーティションを書き込み先にする
+            self.__open_partition(db_name)
+            self.defect_list = DefectStore(records)
+            self.update_defect_listbox()
+            # defectListからserial_dictを作成
+            self.create_serial_dict(self.defect_list)
+            self.update_index()
+            self.update_board_label()
+            self.defect_number_update()
+
+        def _failed(error: Exception):
+            """読み込みに失敗した場合は空の不良リストのまま保存を受け付ける（Tkスレッド）"""
+            if generation != self.lot_generation:
+                return
+            self.lot_loading = False
+            self.update_status(f"不良リストの読み込みに失敗しました: {error}")
+
+        def _load():
+            try:
+                db_name = partitions.partition_for_lot(lot_number)
+                sqlite_db = local_dbs.get(db_name) or self.__create_local_db(db_name)
+                records = sqlite_db.get_defect_info_by_lot(lot_number)
+                merged = self.__merge_shared_defects(partitions, lot_number, records)
+            except Exception as e:
+                print(f"不良リスト読み込みエラー: {e}")
+                self.ui.post(None, _failed, e)
+                return
+            self.ui.post(None, _apply, db_name, sqlite_db, merged)
+
+        # 登録済みの書き込みの後に読み込む（書き込みと同じキー）
+        self.executor.submit(QUEUE_DB, _load, key="sqlite")
+
+    def __check_lot_loaded(self) -> bool:
+        """指図の不良リストを読み込み済みか確認（読み込み中はステータスバーに表示）"""
+        if self.lot_loading:
+            self.update_status("不良リストを読み込み中です。しばらくお待ちください。")
+            return False
+        return True
+
+    def __merge_shared_defects(
+        self, partitions: DbPartitions, lot_number: str, local: List["DefectInfo"]
+    ):
+        """
+        共有データベースの指図の不良情報にローカルの不良情報を重ねる（DBキュー）
+
+        ローカルには自端末で登録・編集したものだけがあるため、他端末の登録分は
+        共有データベースから読み取り専用で取得する。同じIDはローカルを優先し、
+        共有データベースへ未反映の削除は除外する。共有データベースに接続できない
+        場合はローカルのみを返す。
+
+        ### Args:
+        - partitions (DbPartitions): 共有データベースのパーティション
+        - lot_number (str): 指図
+        - local (List[DefectInfo]): ローカルデータベースの不良情報
+
+        Returns:
+            List[DefectInfo]: 不良情報のリスト
+        """
+        if not partitions.directory or not self.is_share_available(
+            partitions.directory
+        ):
+            return local
         try:
-            if self.sqlite_db:
-                self.defect_list = self.sqlite_db.get_defect_info_by_lot(
-                    self.current_lot_number
-                )
-                self.update_defect_listbox()
+            with latency.measure("shared_db_read"):
+                shared = partitions.get_by_lot(lot_number)
         except Exception as e:
-            raise Exception(e)
+            print(f"共有データベース読み込みエラー: {e}")
+            return local
+        local_ids = {item.id for item in local}
+        deleted = set(self.delete_defect_ids)
+        merged = [
+            item
+            for item in shared
+            if item.id not in local_ids and item.id not in deleted
+        ]
+        return merged + list(local)
 
     def save_defect_info(self):
         """保存ボタンを押したときの処理"""
 
         # データディレクトリが有効か確認
-        if not self.exist_data_directory():
-            messagebox.showerror(
-                "Error",
-                "データディレクトリに接続できませんでした。ネットワークへの接続を確認してください。",
-            )
+        from aoi_data_manager import DefectInfo
+
+        if not self.__check_data_directory():
+            return
+        if not self.__check_lot_loaded():
             return
 
         # 不良番号を不良名に変換
@@ -1184,147 +1910,193 @@ class AOIView(tk.Tk):
             messagebox.showwarning("Warning", "基板上の座標をクリックしてください。")
             return
 
-        # defect_listに追加（相対座標で保存）
-        defect = DefectInfo(
-            line_name=self.current_line_name,
-            current_board_index=current_board_index,
-            defect_number=defect_number,
-            reference=rf,
-            defect_name=defect_name,
-            x=rel_x,  # 相対座標（0.0～1.0）
-            y=rel_y,  # 相対座標（0.0～1.0）
-            insert_datetime=insert_date,
-            serial=serial,
-            aoi_user=aoi_user,
-            model_code=model_code,
-            lot_number=lot_number,
-            model_label=model_label,
-            board_label=board_label,
-            board_number_label=board_number_label,
-        )
+        # 入力確認のダイアログを除いた保存処理の時間を記録する
+        with latency.measure("save_defect_info"):
+            # defect_listに追加（相対座標で保存）
+            defect = DefectInfo(
+                line_name=self.current_line_name,
+                current_board_index=current_board_index,
+                defect_number=defect_number,
+                reference=rf,
+                defect_name=defect_name,
+                x=rel_x,  # 相対座標（0.0～1.0）
+                y=rel_y,  # 相対座標（0.0～1.0）
+                insert_datetime=insert_date,
+                serial=serial,
+                aoi_user=aoi_user,
+                model_code=model_code,
+                lot_number=lot_number,
+                model_label=model_label,
+                board_label=board_label,
+                board_number_label=board_number_label,
+            )
 
-        if self.exists_defect_listbox(defect_number):
-            self.defect_list_update(defect_number, defect)
-        else:
-            self.defect_list_insert(defect)
-
-        # 座標画像を生成出力
-        image_path = ""
-        if self.data_directory:
-            output_dir: str = os.path.join(self.data_directory, lot_number)
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)  # ディレクトリがなければ作成
-            filename = f"{lot_number}_{current_board_index}_{defect_number}"
-            try:
-                image_path = FileManager.export_canvas_image_with_markers(
-                    defect,
-                    self.current_image_path,
-                    output_dir,
-                    filename,
-                    marker_size=20,
-                    font_size=12,
-                    max_image_size=(800, 600),
-                    text_area_width=160,
-                )
-                success_msg = f"画像を保存しました: {image_path}"
-                self.safe_update_status(success_msg)
-            except ValueError as e:
-                self.update_status(e)
+            # 既存の不良の編集の場合はIDとKintoneのレコードIDを引き継ぐ
+            existing = self.find_board_defect(current_board_index, defect_number)
+            if existing is not None:
+                defect.id = existing.id
+                defect.kintone_record_id = existing.kintone_record_id
 
-        # defectにimage_pathを設定
-        defect.image_path = image_path
+            if self.exists_defect_listbox(defect_number):
+                self.defect_list_update(defect_number, defect)
+            else:
+                self.defect_list_insert(defect)
 
-        if self.exists_defect_listbox(defect_number):
-            self.defect_list_update(defect_number, defect)
-        else:
-            self.defect_list_insert(defect)
+            # 座標画像を生成出力
+            image_path = ""
+            if self.data_directory:
+                output_dir: str = os.path.join(self.data_directory, lot_number)
+                filename = f"{lot_number}_{current_board_index}_{defect_number}"
+                try:
+                    # 画像出力（出力先ディレクトリの作成を含む）はバックグラウンドで
+                    # 実行し、ここでは出力予定のパスのみ受け取る
+                    image_path = self.image_exporter.submit(
+                        copy.copy(defect),
+                        self.current_image_path,
+                        output_dir,
+                        filename,
+                        on_done=self.__on_defect_image_exported,
+                    )
+                except ValueError as e:
+                    self.update_status(e)
 
-        # 入力エントリを初期化
-        self.rf_entry.delete(0, tk.END)
-        self.defect_entry.delete(0, tk.END)
+            # defectにimage_pathを設定
+            defect.image_path = image_path
 
-        # 既存の座標マーカーを削除
-        self.canvas.delete("coordinate_marker")
+            if self.exists_defect_listbox(defect_number):
+                self.defect_list_update(defect_number, defect)
+            else:
+                self.defect_list_insert(defect)
+
+            # 入力エントリを初期化
+            self.rf_entry.delete(0, tk.END)
+            self.defect_entry.delete(0, tk.END)
 
-        # キントーンにデータを登録
-        self.post_kintone_record_async(self.defect_list)
+            # 既存の座標マーカーを削除
+            self.canvas.delete("coordinate_marker")
 
-        # sqlteデータベースに登録
-        self.__insert_defect_info_to_db_async(self.defect_list)
+            # キントーンにデータを登録（Kintone・SQLiteで同じスナップショットを使う）
+            snapshot = self.defect_list.snapshot()
+            self.post_kintone_record_async(snapshot)
+
+            # sqlteデータベースに登録
+            self.__insert_defect_info_to_db_async(snapshot)
+
+    def __on_defect_image_exported(self, image_path: str, error: Exception):
+        """不良画像の出力完了時の処理（ワーカースレッド）"""
+        if error is None:
+            self.safe_update_status(f"画像を保存しました: {image_path}")
+        else:
+            self.safe_update_status(f"画像の保存に失敗しました: {error}")
+            print(f"不良画像出力エラー: {error}")
+
+    def __on_defect_image_deleted(self, future: Future):
+        """不良画像の削除の登録完了時の処理（ワーカースレッド）"""
+        error = future.exception()
+        self.safe_update_status(str(error) if error else future.result())
+
+    def __on_image_rename_recorded(self, future: Future):
+        """不良画像のリネームの登録完了時の処理（ワーカースレッド）"""
+        error = future.exception()
+        if error is not None:
+            self.safe_update_status(f"画像のリネームの登録に失敗しました: {error}")
+            print(f"画像リネーム登録エラー: {error}")
 
     def delete_defect_info(self):
         """削除ボタンを押したときの動作"""
         # 選択中のアイテムを取得
         selected_item = self.defect_listbox.focus()
-        if selected_item:
-            # Treeview内の全アイテムIDリスト
-            items = self.defect_listbox.item(selected_item, "values")
-            # 削除するアイテムのIDを取得
-            remove_id = items[3]
-            # defect_listから削除対象のアイテムを取得
-            defect_item = [item for item in self.defect_list if item.id == remove_id][0]
-            # ツリーからアイテムを削除
-            self.defect_listbox.delete(selected_item)
-            # リファレンス入力エリアを初期化
-            self.rf_entry.delete(0, tk.END)
-            # 不良名入力エリアを初期化
-            self.defect_entry.delete(0, tk.END)
-            # defect_listから対象のID要素を削除
-            self.defect_list = [
-                item for item in self.defect_list if item.id != remove_id
-            ]
-            # 画像を削除
-            if self.data_directory:
-                output_dir: str = os.path.join(
-                    self.data_directory, defect_item.lot_number
-                )
-                filename = (
-                    f"{defect_item.lot_number}_{defect_item.current_board_index}_"
-                    f"{defect_item.defect_number}"
+        if selected_item and self.__check_lot_loaded():
+            with latency.measure("delete_defect_info"):
+                # Treeview内の全アイテムIDリスト
+                items = self.defect_listbox.item(selected_item, "values")
+                # 削除するアイテムのIDを取得
+                remove_id = items[3]
+                # defect_listから削除対象のアイテムを取得（削除後も使うため複製する）
+                remove_index = next(
+                    i for i, item in enumerate(self.defect_list) if item.id == remove_id
                 )
-                try:
-                    msg = FileManager.delete_exported_image(output_dir, filename)
-                    self.update_status(msg)
-                except ValueError as e:
-                    self.update_status(e)
-            # defect_listの不良番号を振りなおす
-            defect_index = None
-            board_index = None
-            for item in self.defect_list:
-                if board_index != item.current_board_index:
-                    board_index = item.current_board_index
-                    defect_index = 1
-                # 画像ファイルをリネーム
-                ext = "png"
-                oldName = f"{item.lot_number}_{item.current_board_index}_{item.defect_number}.{ext}"
-                old_path = os.path.join(self.data_directory, item.lot_number, oldName)
-                newName = (
-                    f"{item.lot_number}_{item.current_board_index}_{defect_index}.{ext}"
-                )
-                newPath = os.path.join(self.data_directory, item.lot_number, newName)
-                os.rename(old_path, newPath)
-                # defect_numberを変更
-                item.defect_number = defect_index
-                defect_index = defect_index + 1
-            # 削除IDリストに追加
-            self.delete_defect_ids.append(remove_id)
-            # kintoneからレコードを削除
-            self.delete_kintone_record_async(defect_item.kintone_record_id)
-            # データベースから削除
-            self.__remove_defect_info_from_db_async(defect_item)
-            # キントーンにデータを更新
-            self.post_kintone_record_async(self.defect_list)
-            # sqlteデータベースを更新
-            self.__insert_defect_info_to_db_async(self.defect_list)
-            # ツリーのインデックスを振りなおす
-            index = 1
-            for item_id in self.defect_listbox.get_children():
-                values = list(
-                    self.defect_listbox.item(item_id, "values")
-                )  # タプル→リストに変換（変更しやすいように）
-                values[0] = str(index)
-                self.defect_listbox.item(item_id, values=values)
-                index = index + 1
+                defect_item = copy.copy(self.defect_list[remove_index])
+                # ツリーからアイテムを削除
+                self.defect_listbox.delete(selected_item)
+                # リファレンス入力エリアを初期化
+                self.rf_entry.delete(0, tk.END)
+                # 不良名入力エリアを初期化
+                self.defect_entry.delete(0, tk.END)
+                # defect_listから対象のID要素を削除
+                del self.defect_list[remove_index]
+                # 画像を削除
+                if self.data_directory:
+                    output_dir: str = os.path.join(
+                        self.data_directory, defect_item.lot_number
+                    )
+                    filename = (
+                        f"{defect_item.lot_number}_{defect_item.current_board_index}_"
+                        f"{defect_item.defect_number}"
+                    )
+                    # 出力中の画像をスプールに記録し終えてから削除を記録する（待機しない）
+                    self.image_exporter.after_exports(
+                        self.image_exporter.delete, output_dir, filename
+                    ).add_done_callback(self.__on_defect_image_deleted)
+                # defect_listの不良番号を振りなおす（番号が変わる不良のみ）
+                renumber = DefectImageRenamer.plan_renumber(self.defect_list)
+                default_ext = self.image_exporter.extension
+                if self.data_directory and renumber:
+                    # 画像ファイルを一括リネーム（出力時の拡張子を維持）
+                    pairs = []
+                    for item, old, new in renumber:
+                        ext = DefectImageRenamer.image_extension(item, default_ext)
+                        pairs.append(
+                            (
+                                DefectImageRenamer.image_path(
+                                    self.data_directory, item, old, ext
+                                ),
+                                DefectImageRenamer.image_path(
+                                    self.data_directory, item, new, ext
+                                ),
+                            )
+                        )
+                    # 出力・削除と同じ順序でNASに反映する
+                    self.image_exporter.after_exports(
+                        self.write_spool.put,
+                        "rename",
+                        self.data_directory,
+                        {"pairs": [list(p) for p in pairs]},
+                    ).add_done_callback(self.__on_image_rename_recorded)
+                positions = {id(item): i for i, item in enumerate(self.defect_list)}
+                for item, _, new in renumber:
+                    # defect_numberと画像パスを変更（送信待ちのスナップショットと
+                    # 共有しないよう複製に置き換える）
+                    changes = {"defect_number": new}
+                    if self.data_directory and item.image_path:
+                        changes["image_path"] = DefectImageRenamer.image_path(
+                            self.data_directory,
+                            item,
+                            new,
+                            DefectImageRenamer.image_extension(item, default_ext),
+                        )
+                    self.defect_list.replace(positions[id(item)], **changes)
+                # 削除IDリストに追加
+                self.delete_defect_ids.append(remove_id)
+                self.unmerged_deletes[remove_id] = defect_item.lot_number
+                # kintoneからレコードを削除
+                self.delete_kintone_record_async(defect_item.kintone_record_id)
+                # データベースから削除
+                self.__remove_defect_info_from_db_async(defect_item)
+                # キントーンにデータを更新
+                snapshot = self.defect_list.snapshot()
+                self.post_kintone_record_async(snapshot)
+                # sqlteデータベースを更新
+                self.__insert_defect_info_to_db_async(snapshot)
+                # ツリーのインデックスを振りなおす
+                index = 1
+                for item_id in self.defect_listbox.get_children():
+                    values = list(
+                        self.defect_listbox.item(item_id, "values")
+                    )  # タプル→リストに変換（変更しやすいように）
+                    values[0] = str(index)
+                    self.defect_listbox.item(item_id, values=values)
+                    index = index + 1
 
             messagebox.showinfo("Info", "不良情報を削除しました。")
         else:
@@ -1337,8 +2109,9 @@ class AOIView(tk.Tk):
             values[0] = idx
             self.defect_listbox.item(item, values=values)
         # self.defect_listのNo列を再設定
-        for idx, item in enumerate(self.defect_list, start=1):
-            item.defect_number = str(idx)
+        for idx, item in enumerate(self.defect_list):
+            if item.defect_number != str(idx + 1):
+                self.defect_list.replace(idx, defect_number=str(idx + 1))
 
     def on_canvas_click(self, event):
         # canvasに画像がない場合は何もしない
@@ -1356,6 +2129,11 @@ class AOIView(tk.Tk):
             messagebox.showinfo("Info", "画像内をクリックしてください。")
             return
 
+        # 既存の不良マーカー付近をクリックした場合はその不良を選択
+        position = self.hit_test_marker(event.x, event.y)
+        if position is not None and self.select_defect(self.defect_list[position].id):
+            return
+
         # 不具合情報を初期化
         self.rf_entry.delete(0, tk.END)
         self.defect_entry.delete(0, tk.END)
@@ -1383,6 +2161,8 @@ class AOIView(tk.Tk):
                     ],
                 )
         self.defect_number_update()
+        # 基板の切り替え・読み込み時に現在の基板のマーカーを表示する
+        self.redraw_coordinate_markers()
 
     def update_index(self):
         items = self.defect_list
@@ -1397,11 +2177,12 @@ class AOIView(tk.Tk):
 
     def prev_board(self):
         if self.current_board_index > 1:
-            self.current_board_index = self.current_board_index - 1
-            self.update_board_label()
-            # treeviewを初期化
-            self.update_defect_listbox()
-            self.defect_number_update()
+            with latency.measure("prev_board"):
+                self.current_board_index = self.current_board_index - 1
+                self.update_board_label()
+                # treeviewを初期化
+                self.update_defect_listbox()
+                self.defect_number_update()
         else:
             messagebox.showinfo("Info", "これ以上前の基板はありません。")
 
@@ -1411,27 +2192,50 @@ class AOIView(tk.Tk):
         if not self.current_image_filename:
             raise ValueError("Current image filename is not set.")
         # データディレクトリが有効か確認
-        if not self.exist_data_directory():
-            messagebox.showerror(
-                "Error",
-                "データディレクトリに接続できませんでした。ネットワークへの接続を確認してください",
-            )
+        if not self.__check_data_directory():
+            return
+        if not self.__check_lot_loaded():
             return
 
-        # データベースにアイテムを追加
-        self.__insert_defect_info_to_db_async(self.defect_list)
+        with latency.measure("next_board"):
+            # データベースにアイテムを追加
+            self.__insert_defect_info_to_db_async(self.defect_list.snapshot())
 
-        # 画面を更新
-        self.current_board_index = self.current_board_index + 1
-        self.total_boards = max(self.total_boards, self.current_board_index)
-        self.update_board_label()
-        # treeviewを初期化
-        self.update_defect_listbox()
-        self.defect_number_update()
+            # 画面を更新
+            self.current_board_index = self.current_board_index + 1
+            self.total_boards = max(self.total_boards, self.current_board_index)
+            self.update_board_label()
+            # treeviewを初期化
+            self.update_defect_listbox()
+            self.defect_number_update()
+
+    def __check_data_directory(self) -> bool:
+        """
+        保存・基板切り替え前にデータディレクトリの設定を確認
+
+        NASに接続できない場合も書き込みはスプールに記録されるため、
+        ネットワークには触れずに状態の表示のみ行い処理を続ける。
+
+        Returns:
+            bool: 処理を続けられる場合True
+        """
+        if not self.data_directory:
+            messagebox.showerror(
+                "Error",
+                "データディレクトリが設定されていません。設定を確認してください。",
+            )
+            return False
+        if self.share_health.is_down("data_directory"):
+            self.update_status(
+                "データディレクトリに接続できません。ローカルに保存し、接続回復後に送信します。"
+            )
+        return True
 
     def exist_data_directory(self):
-        """データディレクトリが存在するか確認"""
-        if not self.data_directory or not os.path.exists(self.data_directory):
+        """データディレクトリが存在するか確認（切断と判定済みの場合は確認しない）"""
+        if not self.data_directory or self.share_health.is_down("data_directory"):
+            return False
+        if not fs_cache.isdir(self.data_directory):
             return False
         return True
 
@@ -1443,6 +2247,8 @@ class AOIView(tk.Tk):
             bool: 保存処理の成功/失敗を返す
         """
         # 結果を格納する変数
+        from aoi_data_manager import FileManager
+
         result = {"success": False}
 
         def _defect_list_to_csv():
@@ -1457,13 +2263,12 @@ class AOIView(tk.Tk):
 
             for attempt in range(max_retries):
                 try:
-                    FileManager.save_defect_csv(self.defect_list, file_path)
+                    FileManager.save_defect_csv(
+                        self.defect_list.to_records(), file_path
+                    )
                     # 🔧 修正: 成功時はステータスを更新して終了
-                    self.after(
-                        0,
-                        lambda: self.safe_update_status(
-                            f"不良データを保存しました: {os.path.basename(file_path)}"
-                        ),
+                    self.safe_update_status(
+                        f"不良データを保存しました: {os.path.basename(file_path)}"
                     )
                     result["success"] = True
                     return
@@ -1473,7 +2278,7 @@ class AOIView(tk.Tk):
                         # 🔧 修正: リトライ時のメッセージ
                         message = f"ファイルが使用中です。{retry_delay}秒後に再試行します... ({attempt + 1}/{max_retries})"
                         print(message)
-                        self.after(0, lambda msg=message: self.safe_update_status(msg))
+                        self.safe_update_status(message)
                         time.sleep(retry_delay)
                         continue
                     else:
@@ -1482,17 +2287,11 @@ class AOIView(tk.Tk):
                             f"ファイルが他のアプリケーション（Excel等）で開かれています。\n"
                             f"ファイルを閉じてから再試行してください:\n{file_path}"
                         )
-                        self.after(
-                            0,
-                            lambda: messagebox.showerror(
-                                "ファイル保存エラー", error_msg
-                            ),
+                        self.ui.post(
+                            None, messagebox.showerror, "ファイル保存エラー", error_msg
                         )
-                        self.after(
-                            0,
-                            lambda: self.safe_update_status(
-                                "ファイル保存に失敗しました（ファイル使用中）"
-                            ),
+                        self.safe_update_status(
+                            "ファイル保存に失敗しました（ファイル使用中）"
                         )
                         result["success"] = False
                         return
@@ -1500,49 +2299,36 @@ class AOIView(tk.Tk):
                 except OSError as oe:
                     if oe.errno == 13:  # Permission denied
                         error_msg = f"ファイルアクセス権限がありません: {file_path}"
-                        self.after(
-                            0,
-                            lambda: messagebox.showerror(
-                                "アクセス権限エラー", error_msg
-                            ),
+                        self.ui.post(
+                            None, messagebox.showerror, "アクセス権限エラー", error_msg
                         )
                     else:
                         error_msg = f"ファイル保存中にOSエラーが発生しました: {oe}"
-                        self.after(
-                            0, lambda: messagebox.showerror("OSエラー", error_msg)
-                        )
-                    self.after(
-                        0,
-                        lambda: self.safe_update_status(
-                            "ファイル保存に失敗しました（OSエラー）"
-                        ),
-                    )
+                        self.ui.post(None, messagebox.showerror, "OSエラー", error_msg)
+                    self.safe_update_status("ファイル保存に失敗しました（OSエラー）")
                     result["success"] = False
                     return
 
                 except Exception as e:
                     error_msg = f"ファイル保存中に予期しないエラーが発生しました: {e}"
-                    self.after(0, lambda: messagebox.showerror("保存エラー", error_msg))
-                    self.after(
-                        0, lambda: self.safe_update_status("ファイル保存に失敗しました")
-                    )
+                    self.ui.post(None, messagebox.showerror, "保存エラー", error_msg)
+                    self.safe_update_status("ファイル保存に失敗しました")
                     result["success"] = False
                     return
 
-        # ThreadPoolExecutorを使用して結果を取得
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_defect_list_to_csv)
-            try:
-                # スレッドの完了を待機（タイムアウト設定可能）
-                future.result(timeout=30)  # 30秒でタイムアウト
-            except Exception as e:
-                self.after(
-                    0,
-                    lambda: messagebox.showerror(
-                        "保存エラー", f"保存処理がタイムアウトしました: {e}"
-                    ),
-                )
-                result["success"] = False
+        # 実行キューで実行して結果を取得
+        future = self.executor.submit(QUEUE_IO, _defect_list_to_csv, key="csv")
+        try:
+            # スレッドの完了を待機（タイムアウト設定可能）
+            future.result(timeout=30)  # 30秒でタイムアウト
+        except Exception as e:
+            self.ui.post(
+                None,
+                messagebox.showerror,
+                "保存エラー",
+                f"保存処理がタイムアウトしました: {e}",
+            )
+            result["success"] = False
 
         return result["success"]
 
@@ -1553,6 +2339,8 @@ class AOIView(tk.Tk):
 
     def read_csv_path(self):
         """指図に対応するCSVファイルのパスを取得"""
+        from aoi_data_manager import FileManager
+
         if not self.current_image_filename:
             raise ValueError("Current image filename is not set.")
         return FileManager.create_defect_csv_path(
@@ -1571,6 +2359,7 @@ class AOIView(tk.Tk):
             self.data_directory = new_settings[1]
             self.schedule_directory = new_settings[2]
             self.shared_directory = new_settings[3]
+            self.share_health.set_targets(self.share_targets())
             # 設定を読み込む
             self.__create_sqlite_db()
             self.__read_smt_schedule_async()
@@ -1614,6 +2403,14 @@ class AOIView(tk.Tk):
         else:
             messagebox.showinfo("Info", "設定の変更がキャンセルされました。")
 
+    def find_catalog_image(self, item_code: str):
+        """画像カタログから品目コードの画像ファイル名を取得（見つからない場合はNone）"""
+        try:
+            return self.image_catalog.find(self.image_directory, item_code)
+        except OSError as e:
+            print(f"画像カタログ検索エラー: {e}")
+            return None
+
     def __search_schedule_df_item(self, lot_number: str) -> dict:
         """SMTスケジュールから品目コードを検索"""
 
@@ -1632,32 +2429,44 @@ class AOIView(tk.Tk):
         """指図変更処理"""
 
         # ユーザーが未設定の場合は警告を表示して終了
+        from aoi_data_manager import FileManager
+
         if not self.is_set_user():
             messagebox.showwarning(
                 "Warning", "AOI担当が設定されていません。ユーザーを設定してください。"
             )
             return
 
-        # API送信
-        if len(self.defect_list) > 0:
-            try:
-                self.post_kintone_record_async(self.defect_list)
-            except ValueError as e:
-                print(e)
-                messagebox.showerror("送信エラー", f"API送信エラー:{e}")
+        # 前の指図の保存（ダイアログを除いた時間を記録する）
+        post_error = None
+        with latency.measure("change_lot_save"):
+            # API送信
+            snapshot = self.defect_list.snapshot()
+            if len(snapshot) > 0:
+                try:
+                    self.post_kintone_record_async(snapshot)
+                except ValueError as e:
+                    print(e)
+                    post_error = e
 
-        # SQLiteデータベース保存
-        if len(self.defect_list) > 0:
-            # データベースにアイテムを追加
-            self.__insert_defect_info_to_db_async(self.defect_list)
+            # SQLiteデータベース保存
+            if len(snapshot) > 0:
+                # データベースにアイテムを追加
+                self.__insert_defect_info_to_db_async(snapshot)
 
-        # すべての座標マーカーを削除
-        self.canvas.delete("all")
+            # 前の指図の結果の反映・未開始の先読みを止める（送信・保存は継続）
+            self.__start_lot_generation()
 
-        # データリストを事前に初期化
-        self.defect_list = []
-        self.repaird_list = []
-        self.current_coordinates = None
+            # すべての座標マーカーを削除
+            self.canvas.delete("all")
+
+            # データリストを事前に初期化
+            self.defect_list = DefectStore()
+            self.repaird_list = []
+            self.current_coordinates = None
+
+        if post_error is not None:
+            messagebox.showerror("送信エラー", f"API送信エラー:{post_error}")
 
         # 指図を入力するダイアログを表示
         dialog = LotChangeDialog(self)
@@ -1702,13 +2511,20 @@ class AOIView(tk.Tk):
 
         # 画像ディレクトリからitem_codeから始まる画像を探して表示
         try:
-            filename = FileManager.get_image_path(
-                self.image_directory, self.current_lot_number, self.current_item_code
-            )
+            # カタログで見つからない場合はディレクトリを検索する
+            filename = self.find_catalog_image(self.current_item_code)
+            if filename is None:
+                filename = FileManager.get_image_path(
+                    self.image_directory,
+                    self.current_lot_number,
+                    self.current_item_code,
+                )
             self.current_image_path = os.path.join(self.image_directory, filename)
 
             # 画像表示（defect_listが空であることを確認済み）
             self.open_select_image(self.current_image_path)
+            # 不良画像出力用に基板画像を先読み
+            self.image_exporter.prefetch(self.current_image_path)
         except FileNotFoundError as e:
             # 画像が見つからなかった場合
             if not self.current_image_path:
@@ -1743,41 +2559,38 @@ class AOIView(tk.Tk):
                 )
                 return
 
-        # 各ラベルを更新
-        self.line_label_value.delete(0, tk.END)
-        self.line_label_value.insert(0, self.current_line_name or "")
-        self.model_label_value.config(text=model_name)
-        self.board_label_value.config(text=board_name)
-        self.side_label_value.config(text=side_label)
-        self.lot_label_value.config(text=self.current_lot_number)
-
-        # ステータスバーの更新
-        self.update_status(
-            f"品目コード: {self.current_item_code}、指図: {self.current_lot_number} に変更されました。"
-        )
+        # 新しい指図の読み込み・表示の時間を記録する（入力ダイアログは除く）
+        with latency.measure("change_lot"):
+            # 各ラベルを更新
+            self.line_label_value.delete(0, tk.END)
+            self.line_label_value.insert(0, self.current_line_name or "")
+            self.model_label_value.config(text=model_name)
+            self.board_label_value.config(text=board_name)
+            self.side_label_value.config(text=side_label)
+            self.lot_label_value.config(text=self.current_lot_number)
+
+            # ステータスバーの更新
+            self.update_status(
+                f"品目コード: {self.current_item_code}、指図: {self.current_lot_number} に変更されました。"
+            )
 
-        try:
-            # csvパスの取得
-            csv_path = self.read_csv_path()
-            # csvパスが取得できたら不良リストを読み込み
-            if csv_path:
-                # 基板番号を初期化
-                self.current_board_index = 1
-                # データベースからdefectListを読み込む
-                self.read_defect_list_db()
-                # defectListからserial_dictを作成
-                self.create_serial_dict(self.defect_list)
+            try:
+                # csvパスの取得
+                csv_path = self.read_csv_path()
+                # csvパスが取得できたら不良リストを読み込み
+                if csv_path:
+                    # 基板番号を初期化
+                    self.current_board_index = 1
+                    # データベースからdefectListを読み込む（読み込み後に表示を更新）
+                    self.read_defect_list_db()
+            except FileNotFoundError as e:
+                # FileNotFoundExceptionの場合も明示的に空にする
+                self.defect_list = DefectStore()
+                self.repaird_list = []
+                self.update_defect_listbox()
                 self.update_index()
                 self.update_board_label()
                 self.defect_number_update()
-        except FileNotFoundError as e:
-            # FileNotFoundExceptionの場合も明示的に空にする
-            self.defect_list = []
-            self.repaird_list = []
-            self.update_defect_listbox()
-            self.update_index()
-            self.update_board_label()
-            self.defect_number_update()
 
         if not (self.current_lot_number and self.current_item_code):
             messagebox.showinfo(
@@ -1785,20 +2598,25 @@ class AOIView(tk.Tk):
             )
             return
 
-        # 差分を共有データベースにマージ
-        if self.sqlite_db_dir and self.shared_directory and self.db_name:
-            # マージ処理の実行
-            try:
-                SqlOperations.merge_target_database(
-                    self.sqlite_db_dir,
-                    self.shared_directory,
-                    self.db_name,
-                    delete_defect_ids=self.delete_defect_ids,
-                )
-            except Exception as e:
-                messagebox.showerror("Error", "ネットワーク接続を確認してください。")
+        # 差分を共有データベースにマージ（スプールを経由して反映）
+        self.spool_merge_database()
+
+    def __start_lot_generation(self):
+        """
+        指図の世代を更新する
 
-    def create_serial_dict(self, defect_list: List[DefectInfo]):
+        前の指図の非同期処理の結果（Kintone送信後の不良リスト等）は反映せず、
+        未開始の基板画像の先読みは取り消す。前の指図のKintone送信・SQLite
+        書き込み・マージは保存のため取り消さない。
+        """
+        self.lot_generation += 1
+        # 前の指図の読み込みの結果は反映しない
+        self.lot_loading = False
+        cancelled = self.image_exporter.cancel_prefetch()
+        if cancelled:
+            print(f"前の指図の先読みを取り消しました: {cancelled}件")
+
+    def create_serial_dict(self, defect_list: "List[DefectInfo]"):
         """defectListからシリアル辞書を作成する"""
         self.serial_dict = {}
         for item in defect_list:
@@ -1819,22 +2637,14 @@ class AOIView(tk.Tk):
             return
 
         user_id = dialog.result.upper()
-        user_csv_path = get_csv_file_path("user.csv")
 
         try:
-            df = FileManager.read_user_csv(str(user_csv_path))
-            user_ids = [str(uid) for uid in df["id"].tolist()]
-
-            if user_id not in user_ids:
+            user_name = self.reference_data.user_name(user_id)
+            if not user_name:
                 messagebox.showerror("Error", f"ユーザーID: {user_id} は存在しません。")
                 return
 
-            matching_rows = df.loc[df["id"] == user_id, "name"]
-            if matching_rows.empty:
-                messagebox.showerror("Error", f"ユーザーID: {user_id} は存在しません。")
-                return
-
-            self.user_name = matching_rows.values[0]
+            self.user_name = user_name
             self.aoi_user_label_value.config(text=self.user_name)
         except Exception as e:
             messagebox.showerror("Error", f"ユーザー情報の読み込みエラー: {e}")
@@ -1846,14 +2656,16 @@ class AOIView(tk.Tk):
 
     def on_serial_enter(self, event):
         """シリアルエントリでEnterキーが押されたときの処理"""
+        if not self.__check_lot_loaded():
+            return
         # 現在の基板インデックスを取得
         board_index = self.current_board_index
         serial = self.serial_entry.get()
         # defect_list内の該当基板インデックスのシリアルを更新
-        for item in self.defect_list:
+        for index, item in enumerate(self.defect_list):
             if item.current_board_index == board_index:
                 # シリアル番号を更新
-                item.serial = serial
+                self.defect_list.replace(index, serial=serial)
         # シリアルを保存
         self.serial_dict[self.current_board_index] = serial
         # シリアルエントリの内容をクリア
@@ -1861,9 +2673,10 @@ class AOIView(tk.Tk):
         # ステータスバーを更新
         self.update_status(f"シリアル番号を更新しました: {serial}")
         # キントーンを更新
-        self.post_kintone_record_async(self.defect_list)
+        snapshot = self.defect_list.snapshot()
+        self.post_kintone_record_async(snapshot)
         # データベースを更新
-        self.__insert_defect_info_to_db_async(self.defect_list)
+        self.__insert_defect_info_to_db_async(snapshot)
 
     def convert_defect_name(self):
         """不良項目名を変換する"""
@@ -1872,12 +2685,10 @@ class AOIView(tk.Tk):
             return
 
         defect_number = int(defect_number)
-        mapping_csv_path = PROJECT_DIR / "defect_mapping.csv"
 
         try:
-            df = FileManager.read_defect_mapping(str(mapping_csv_path))
-            if defect_number in df["no"].values:
-                standard_name = df.loc[df["no"] == defect_number, "name"].values[0]
+            standard_name = self.reference_data.defect_name(defect_number)
+            if standard_name:
                 self.defect_entry.delete(0, tk.END)
                 self.defect_entry.insert(0, standard_name)
         except Exception as e:
@@ -1885,20 +2696,8 @@ class AOIView(tk.Tk):
 
     def show_defect_mapping(self):
         """不良名一覧を表示する"""
-        mapping_csv_path = PROJECT_DIR / "defect_mapping.csv"
-        if not mapping_csv_path.exists():
-            raise FileNotFoundError(
-                f"defect_mapping.csv not found at {mapping_csv_path}"
-            )
-        df = pd.read_csv(mapping_csv_path, encoding="utf-8-sig")
-        df = df.dropna()
-        # dfのno列をfloatだった場合にintに変換
-        df["no"] = df["no"].apply(
-            lambda x: int(x) if isinstance(x, float) and x.is_integer() else x
-        )
-        mapping_text = "\n".join(
-            [f"{row['no']}: {row['name']}" for _, row in df.iterrows()]
-        )
+        mapping = self.reference_data.defect_mapping()
+        mapping_text = "\n".join([f"{no}: {name}" for no, name in mapping.items()])
         messagebox.showinfo("不良名一覧", mapping_text)
 
     def open_kintone_settings(self):
@@ -1910,8 +2709,14 @@ class AOIView(tk.Tk):
             self.init_kintone_client()
             self.kintone_connected_async()
 
-    def post_kintone_record_async(self, defect_list: List[DefectInfo]):
-        """Kintoneにレコードを送信する非同期処理"""
+    def post_kintone_record_async(self, snapshot: RecordSnapshot):
+        """
+        Kintoneにレコードを送信する非同期処理
+
+        ### Args:
+        - snapshot (RecordSnapshot): 送信する不良リストのスナップショット
+          （レコードの複製はワーカースレッドで作成する）
+        """
 
         # キントーンAPIに接続されていない場合は終了
         if self.is_kintone_connected is False:
@@ -1921,15 +2726,26 @@ class AOIView(tk.Tk):
             )
             return
 
+        generation = self.lot_generation
+
+        def _apply_result(defect_list: DefectStore):
+            """送信後の不良リストを反映（Tkスレッド。指図が変わっていれば破棄）"""
+            if generation != self.lot_generation:
+                return
+            self.defect_list = defect_list
+
         def _send_request():
             """Kintoneにレコードを送信する処理"""
             try:
                 # キントーンにレコードを送信
-                updated_defect_list = self.kintone_client.post_defect_records(
-                    defect_list
-                )
-                # 送信後のdefect_listを更新
-                self.defect_list = updated_defect_list
+                # 呼び出し時点の内容をDefectInfoのリストとして渡す
+                records = snapshot.records()
+                with latency.measure("kintone_post"):
+                    updated_defect_list = self.kintone_client.post_defect_records(
+                        records
+                    )
+                # 送信後のdefect_listを更新（前の指図の結果は反映しない）
+                self.ui.post(None, _apply_result, DefectStore(updated_defect_list))
                 # 成功したらステータスバーを更新
                 count = len(updated_defect_list)
                 # 🔧 修正: self.after()を使用してメインスレッドで実行
@@ -1943,21 +2759,16 @@ class AOIView(tk.Tk):
                 self.safe_update_status(error_msg)
                 print(error_msg)  # ログ出力のみ
 
-        # 別スレッドで非同期処理
-        thread = threading.Thread(target=_send_request, daemon=True)
-        thread.start()
+        # 同じ指図の送信・削除は登録順に実行する
+        self.executor.submit(QUEUE_KINTONE, _send_request, key=self.current_lot_number)
 
     def delete_kintone_record_async(self, record_id: str):
         """Kintoneレコードを削除"""
 
         # キントーンAPIに接続されていない場合は終了
         if self.is_kintone_connected is False:
-            # 🔧 修正: self.after()を使用してメインスレッドで実行
-            self.after(
-                0,
-                lambda: self.safe_update_status(
-                    "キントーンAPIに接続されていない為、レコードの削除が失敗しました。"
-                ),
+            self.safe_update_status(
+                "キントーンAPIに接続されていない為、レコードの削除が失敗しました。"
             )
             return
 
@@ -1965,7 +2776,8 @@ class AOIView(tk.Tk):
             """Kintoneレコードを削除する処理"""
             try:
                 # キントーンにレコードを削除
-                self.kintone_client.delete_record(record_id)
+                with latency.measure("kintone_delete"):
+                    self.kintone_client.delete_record(record_id)
                 # 🔧 修正: self.after()を使用してメインスレッドで実行
                 self.safe_update_status("キントーンアプリからレコードを削除しました。")
             except Exception as e:
@@ -1974,9 +2786,10 @@ class AOIView(tk.Tk):
                 self.safe_update_status(error_msg)
                 print(error_msg)  # ログ出力のみ
 
-        # 別スレッドで非同期処理
-        thread = threading.Thread(target=_delete_request, daemon=True)
-        thread.start()
+        # 同じ指図の送信・削除は登録順に実行する
+        self.executor.submit(
+            QUEUE_KINTONE, _delete_request, key=self.current_lot_number
+        )
 
     def remove_existing_defect_ids_from_delete_list(self):
         """
@@ -3,27 +3,50 @@ from tkinter import messagebox
 from tkinter import filedialog
 from tkinter import simpledialog
 from tkinter import ttk
-from PIL import Image, ImageTk
 import os
 from datetime import datetime, timezone
-from pandas import DataFrame
 from pathlib import Path
 import configparser
-import pandas as pd
 import re
+import threading
 from dataclasses import asdict
-from typing import List
-from aoi_data_manager import FileManager, KintoneClient, DefectInfo, RepairdInfo
+from typing import TYPE_CHECKING, Dict, List
 from .dialog import ChangeUserDialog, LotChangeDialog
-from .utils import get_project_dir, get_csv_file_path, get_config_file_path
+from .services import (
+    CsvJournal,
+    DebouncedWriter,
+    DefectStore,
+    ImageCatalog,
+    ReferenceData,
+    ShareHealthMonitor,
+    WriteSpool,
+    fs_cache,
+)
+from .utils import (
+    get_project_dir,
+    get_csv_file_path,
+    get_config_file_path,
+    parse_image_filename,
+)
+
+# pandas・PIL・aoi_data_managerは使用する機能の中でインポートする
+if TYPE_CHECKING:
+    from aoi_data_manager import DefectInfo, RepairdInfo
 
 PROJECT_DIR = get_project_dir()
 
+# 終了時に修理データのスプールへの記録を待つ最大時間（秒）
+REPAIRD_WRITER_CLOSE_TIMEOUT_S = 5.0
+# 終了時にスプールの反映を待つ最大時間（秒。残りは次回起動時に反映する）
+SPOOL_DRAIN_TIMEOUT_S = 2.0
+
 
 class RepairView(tk.Toplevel):
     def __init__(self, fillColor="white", master=None):
         super().__init__(master)
         self.title("AOI 製品経歴書")
+        # 閉じるボタン押下時の処理を設定
+        self.protocol("WM_DELETE_WINDOW", self.__before_close)
         # 最大化表示
         self.option_add("*Background", "white")
         self.option_add("*Entry.Background", "white")
@@ -38,7 +61,19 @@ class RepairView(tk.Toplevel):
         self.image_directory = None
         self.data_directory = None
 
+        # 不良名マッピング・ユーザー一覧（更新時のみ再読み込み）
+        self.reference_data = ReferenceData(
+            get_csv_file_path("defect_mapping.csv"), get_csv_file_path("user.csv")
+        )
+
+        # 基板画像カタログ（指図変更時の画像検索用）
+        self.image_catalog = ImageCatalog(
+            PROJECT_DIR / "image_catalog.json", parser=parse_image_filename
+        )
+
         # Kintoneクライアントの初期化
+        from aoi_data_manager import KintoneClient
+
         self.repaird_kintone_client = KintoneClient(
             subdomain="x7xhupqlzylc",
             app_id=27,
@@ -48,6 +83,18 @@ class RepairView(tk.Toplevel):
         # 設定読み込み
         self.__read_settings()
 
+        # 修理データのNASへの書き込みはスプールを経由する
+        # （接続できない間はローカルに記録し、接続回復後に記録順に反映）
+        self.share_health = ShareHealthMonitor({"data_directory": self.data_directory})
+        self.write_spool = WriteSpool(
+            PROJECT_DIR / "spool" / "repair",
+            is_available=lambda target: not self.share_health.is_down("data_directory"),
+        )
+        self.__register_spool_handlers()
+        self.share_health.add_listener(lambda *_: self.write_spool.kick())
+        self.share_health.start()
+        self.write_spool.start()
+
         # UI描画
         self.create_menu()
         self.create_header()
@@ -60,8 +107,20 @@ class RepairView(tk.Toplevel):
         self.current_coordinates = None
 
         # リスト
-        self.defect_list: List[DefectInfo] = []
-        self.repaird_list: List[RepairdInfo] = []
+        self.defect_list: DefectStore = DefectStore()
+        self.repaird_list: List["RepairdInfo"] = []
+
+        # 修理データの追記ジャーナル
+        self.repaird_journal: CsvJournal = None
+        # スプールに記録する前の修理データ（反映先のパス -> 行）
+        self._unspooled_repaird: Dict[str, list] = {}
+        self._unspooled_lock = threading.Lock()
+        # 修理データの遅延書き込み（タップ毎にネットワーク共有へ書き込まない）
+        self.repaird_writer = DebouncedWriter(
+            self,
+            self.__collect_repaird_snapshot,
+            self.__write_repaird_snapshot,
+        )
 
         # 基板番号
         self.current_board_index = 1
@@ -367,6 +426,8 @@ class RepairView(tk.Toplevel):
 
     def open_image(self):
         """画像を開くダイアログを表示し、選択された画像をcanvasに表示"""
+        from PIL import Image, ImageTk
+
         filepath = filedialog.askopenfilename(
             filetypes=[
                 ("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.gif"),
@@ -392,6 +453,8 @@ class RepairView(tk.Toplevel):
 
     def open_select_image(self, filepath: str):
         """指定されたファイルパスの画像をcanvasに表示"""
+        from PIL import Image, ImageTk
+
         if not filepath:
             return
         try:
@@ -449,7 +512,7 @@ class RepairView(tk.Toplevel):
         max_len = len(filter_defect_list)
         self.no_value.config(text=str(max_len + 1))
 
-    def defect_list_insert(self, item: DefectInfo):
+    def defect_list_insert(self, item: "DefectInfo"):
         self.defect_list.append(item)
         print(item)
         self.defect_listbox.insert(
@@ -475,14 +538,15 @@ class RepairView(tk.Toplevel):
 
     def read_defect_list_csv(self, filepath: str):
         """CSVファイルから不良リストを読み込み、defect_listに設定"""
+        from aoi_data_manager import FileManager
+
         try:
             # ライブラリを使用してデータを読み込み
-            self.defect_list = FileManager.read_defect_csv(filepath)
+            self.defect_list = DefectStore(FileManager.read_defect_csv(filepath))
 
-            repaird_path = FileManager.create_repaird_csv_path(
-                self.data_directory, self.current_lot_number
-            )
-            self.repaird_list = FileManager.read_repaird_csv(repaird_path)
+            # NASへの反映は待たず、未反映の修理データはローカルの記録から読み込む
+            self.repaird_journal = self.open_repaird_journal()
+            self.repaird_list = self.__load_repaird_list(self.repaird_journal)
 
             self.update_defect_listbox()
         except Exception as e:
@@ -573,6 +637,8 @@ class RepairView(tk.Toplevel):
         self.current_board_index = 1
 
     def prev_board(self):
+        # 未保存の修理データを書き込む
+        self.repaird_writer.flush()
         if self.current_board_index > 1:
             self.current_board_index = self.current_board_index - 1
             self.update_board_label()
@@ -583,6 +649,8 @@ class RepairView(tk.Toplevel):
             messagebox.showinfo("Info", "これ以上前の基板はありません。")
 
     def next_board(self):
+        # 未保存の修理データを書き込む
+        self.repaird_writer.flush()
         if self.current_board_index == self.total_boards:
             messagebox.showinfo("Info", "これ以上次の基板はありません。")
             return
@@ -597,21 +665,21 @@ class RepairView(tk.Toplevel):
         self.defect_number_update()
 
     def exist_data_directory(self):
-        """データディレクトリが存在するか確認"""
-        if not self.data_directory or not os.path.exists(self.data_directory):
+        """データディレクトリが存在するか確認（キャッシュを使用）"""
+        if not self.data_directory or not fs_cache.isdir(self.data_directory):
             return False
         return True
 
     def defect_list_to_csv(self):
         """defect_listをCSVファイルに保存"""
+        from pandas import DataFrame
+
         try:
             df = DataFrame([asdict(item) for item in self.defect_list])
             basename = self.create_csv_filename()
-            df.to_csv(
-                os.path.join(self.data_directory, basename),
-                index=False,
-                encoding="utf-8-sig",
-            )
+            file_path = os.path.join(self.data_directory, basename)
+            df.to_csv(file_path, index=False, encoding="utf-8-sig")
+            fs_cache.invalidate(file_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save defect list to CSV:\n{e}")
 
@@ -634,7 +702,7 @@ class RepairView(tk.Toplevel):
             raise ValueError("Current image filename is not set.")
         csv_filename = self.create_csv_filename()
         csv_path = os.path.join(self.data_directory, csv_filename)
-        if not os.path.exists(csv_path):
+        if not fs_cache.exists(csv_path):
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
         return csv_path
 
@@ -648,6 +716,7 @@ class RepairView(tk.Toplevel):
             # 新しい設定を適用
             self.image_directory = new_settings[0]
             self.data_directory = new_settings[1]
+            self.share_health.set_targets({"data_directory": self.data_directory})
             # 設定ファイルが存在しない場合は新規作成
             settings_path = get_config_file_path("settings.ini")
             if not settings_path.exists():
@@ -694,6 +763,9 @@ class RepairView(tk.Toplevel):
                 )
                 return
 
+        # 前の指図の修理データジャーナルをCSVに畳み込む
+        self.compact_repaird_journal()
+
         # 品目コードと指図を入力するダイアログを表示
         dialog = LotChangeDialog(self)
         if not hasattr(dialog, "result") or not dialog.result:
@@ -712,18 +784,21 @@ class RepairView(tk.Toplevel):
             return
 
         # リストの初期化
-        self.defect_list = []
+        self.defect_list = DefectStore()
         self.repaird_list = []
 
         # 画像ディレクトリからitem_codeから始まる画像を探して表示
         if self.image_directory and self.current_item_code:
-            for filename in os.listdir(self.image_directory):
-                if filename.startswith(self.current_item_code):
-                    self.current_image_path = os.path.join(
-                        self.image_directory, filename
-                    )
-                    self.open_select_image(self.current_image_path)
-                    break
+            try:
+                filename = self.image_catalog.find(
+                    self.image_directory, self.current_item_code
+                )
+            except OSError as e:
+                print(f"画像カタログ検索エラー: {e}")
+                filename = None
+            if filename:
+                self.current_image_path = os.path.join(self.image_directory, filename)
+                self.open_select_image(self.current_image_path)
             # 画像が見つからなかった場合
             if not self.current_image_path:
                 self.current_image_path = None
@@ -752,7 +827,7 @@ class RepairView(tk.Toplevel):
             self.current_image_path = None
             self.current_image_filename = None
             self.canvas.delete("all")
-            self.defect_list = []
+            self.defect_list = DefectStore()
             messagebox.showwarning(
                 "Warning",
                 "指定された品目コードと指図に対応するCSVファイルが見つかりません。",
@@ -779,7 +854,7 @@ class RepairView(tk.Toplevel):
                 self.create_repaird_list()
         except FileNotFoundError as e:
             # 不良リストを初期化
-            self.defect_list = []
+            self.defect_list = DefectStore()
             self.repaird_list = []
             self.update_defect_listbox()
             self.update_index()
@@ -793,6 +868,8 @@ class RepairView(tk.Toplevel):
             return
 
     def create_repaird_list(self):
+        from aoi_data_manager import RepairdInfo
+
         if len(self.defect_list) == 0:
             raise ValueError("Defect list is empty.")
         repaird_list_ids = [item.id for item in self.repaird_list]
@@ -819,24 +896,12 @@ class RepairView(tk.Toplevel):
             return
         user_id = dialog.result.upper()
 
-        # user.csvをDataFrameで読み込み
-        user_csv_path = get_csv_file_path("user.csv")
-        if not user_csv_path.exists():
-            raise FileNotFoundError(f"user.csv not found at {user_csv_path}")
-        df = pd.read_csv(user_csv_path, encoding="utf-8-sig")
-        user_ids = df["id"].tolist()
-        # user_ids内の要素を文字列に変換
-        user_ids = [str(uid) for uid in user_ids]
-        if user_id not in user_ids:
-            messagebox.showerror("Error", f"ユーザーID: {user_id} は存在しません。")
-            return
         # ユーザーIDに対応する名前を取得
-
-        matching_rows = df.loc[df["id"] == user_id, "name"]
-        if matching_rows.empty:
+        user_name = self.reference_data.user_name(user_id)
+        if not user_name:
             messagebox.showerror("Error", f"ユーザーID: {user_id} は存在しません。")
             return
-        self.user_name = matching_rows.values[0]
+        self.user_name = user_name
         # AOI担当ラベルを更新
         self.repair_user_label_value.config(text=self.user_name)
 
@@ -855,36 +920,16 @@ class RepairView(tk.Toplevel):
             print(f"[DEBUG] Defect number '{defect_number}' is not a valid integer.")
             return
         defect_number = int(defect_number)
-        # defect_mapping.csvをDataFrameで読み込み
-        mapping_csv_path = get_csv_file_path("defect_mapping.csv")
-        if not mapping_csv_path.exists():
-            raise FileNotFoundError(
-                f"defect_mapping.csv not found at {mapping_csv_path}"
-            )
-        df = pd.read_csv(mapping_csv_path, encoding="utf-8-sig")
-        # defect_numberがdfの'alias'列に存在するか確認
-        if defect_number in df["no"].values:
-            # 対応する'name'列の値を取得してエントリに設定
-            standard_name = df.loc[df["no"] == defect_number, "name"].values[0]
+        # 不良番号に対応する不良名を取得してエントリに設定
+        standard_name = self.reference_data.defect_name(defect_number)
+        if standard_name:
             self.defect_entry.delete(0, tk.END)
             self.defect_entry.insert(0, standard_name)
 
     def show_defect_mapping(self):
         """不良名一覧を表示する"""
-        mapping_csv_path = get_csv_file_path("defect_mapping.csv")
-        if not mapping_csv_path.exists():
-            raise FileNotFoundError(
-                f"defect_mapping.csv not found at {mapping_csv_path}"
-            )
-        df = pd.read_csv(mapping_csv_path, encoding="utf-8-sig")
-        df = df.dropna()
-        # dfのno列をfloatだった場合にintに変換
-        df["no"] = df["no"].apply(
-            lambda x: int(x) if isinstance(x, float) and x.is_integer() else x
-        )
-        mapping_text = "\n".join(
-            [f"{row['no']}: {row['name']}" for _, row in df.iterrows()]
-        )
+        mapping = self.reference_data.defect_mapping()
+        mapping_text = "\n".join([f"{no}: {name}" for no, name in mapping.items()])
         messagebox.showinfo("不良名一覧", mapping_text)
 
     def on_repaired(self):
@@ -922,11 +967,8 @@ class RepairView(tk.Toplevel):
                 )  # 登録日時
                 break
 
-        # ライブラリを使用してCSVに保存
-        repaird_path = FileManager.create_repaird_csv_path(
-            self.data_directory, self.current_lot_number
-        )
-        FileManager.save_repaird_csv(self.repaird_list, repaird_path)
+        # 変更分のみジャーナルに追記
+        self.save_repaird_list()
 
     def on_chip_button(self):
         """C/Rボタンが押されたときの処理"""
@@ -957,11 +999,8 @@ class RepairView(tk.Toplevel):
                 )  # 登録日時
                 break
 
-        # ライブラリを使用してCSVに保存
-        repaird_path = FileManager.create_repaird_csv_path(
-            self.data_directory, self.current_lot_number
-        )
-        FileManager.save_repaird_csv(self.repaird_list, repaird_path)
+        # 変更分のみジャーナルに追記
+        self.save_repaird_list()
 
     def on_other_button(self):
         """異形ボタンが押されたときの処理"""
@@ -992,13 +1031,119 @@ class RepairView(tk.Toplevel):
                 )  # 登録日時
                 break
 
-        # ライブラリを使用してCSVに保存
+        # 変更分のみジャーナルに追記
+        self.save_repaird_list()
+
+    def open_repaird_journal(self) -> CsvJournal:
+        """現在の指図に対応する修理データジャーナルを作成"""
+        from aoi_data_manager import FileManager, RepairdInfo
+
         repaird_path = FileManager.create_repaird_csv_path(
             self.data_directory, self.current_lot_number
         )
-        FileManager.save_repaird_csv(self.repaird_list, repaird_path)
+        return CsvJournal(
+            repaird_path,
+            RepairdInfo,
+            FileManager.read_repaird_csv,
+            FileManager.save_repaird_csv,
+        )
+
+    def save_repaird_list(self):
+        """repaird_listの変更を記録し、遅延書き込みを予約"""
+        self.repaird_writer.mark_dirty()
+
+    def __collect_repaird_snapshot(self):
+        """書き込み用にrepaird_listのスナップショットを作成（Tkスレッド）"""
+        if self.repaird_journal is None:
+            self.repaird_journal = self.open_repaird_journal()
+        journal = self.repaird_journal
+        rows = journal.to_rows(self.repaird_list)
+        with self._unspooled_lock:
+            self._unspooled_repaird[journal.base_path] = rows
+        return journal.base_path, rows
+
+    def __write_repaird_snapshot(self, snapshot):
+        """スナップショットをスプールに記録（バックグラウンド）"""
+        base_path, rows = snapshot
+        self.write_spool.put("repaird_sync", base_path, {"rows": rows})
+        with self._unspooled_lock:
+            # 後から作成したスナップショットは残す
+            if self._unspooled_repaird.get(base_path) is rows:
+                del self._unspooled_repaird[base_path]
+
+    def __load_repaird_list(self, journal: CsvJournal) -> "List[RepairdInfo]":
+        """
+        修理データを読み込む（Tkスレッド）
+
+        NASに未反映の記録がある場合は、その最新の内容（指図の修理データ全体）を
+        返し、NASへの反映を待たない。ない場合はNASのジャーナルを読み込む。
+        """
+        with self._unspooled_lock:
+            rows = self._unspooled_repaird.get(journal.base_path)
+        if rows is None:
+            entry = self.write_spool.latest("repaird_sync", journal.base_path)
+            rows = entry["args"]["rows"] if entry is not None else None
+        if rows is None:
+            return journal.load()
+        return journal.from_rows(rows)
+
+    def __register_spool_handlers(self):
+        """スプールの記録の種類毎の反映処理を登録（反映スレッドから呼ばれる）"""
+        from aoi_data_manager import FileManager, RepairdInfo
+
+        # 反映先のパス -> 差分検出用のジャーナル（反映スレッドのみが使用）
+        journals: Dict[str, CsvJournal] = {}
+
+        def _journal(path: str) -> CsvJournal:
+            if path not in journals:
+                journal = CsvJournal(
+                    path,
+                    RepairdInfo,
+                    FileManager.read_repaird_csv,
+                    FileManager.save_repaird_csv,
+                )
+                journal.load()
+                journals[path] = journal
+            return journals[path]
+
+        def _sync(entry):
+            _journal(entry["target"]).sync_rows(entry["args"]["rows"])
+
+        def _compact(entry):
+            _journal(entry["target"]).compact()
+            journals.pop(entry["target"], None)
+
+        self.write_spool.register("repaird_sync", _sync)
+        self.write_spool.register("repaird_compact", _compact)
+
+    def compact_repaird_journal(self):
+        """未保存分を書き込んだ後、修理データジャーナルをCSVに畳み込む"""
+        self.repaird_writer.flush()
+        if self.repaird_journal is None:
+            return
+        base_path = self.repaird_journal.base_path
+        # 書き込みと同じ順序でスプールに記録する
+        self.repaird_writer.submit(
+            lambda: self.write_spool.put("repaird_compact", base_path)
+        )
+        self.repaird_journal = None
+
+    def __before_close(self):
+        """閉じる前の処理"""
+        # 未保存の修理データを書き込み、完了を待ってから閉じる
+        self.compact_repaird_journal()
+        if not self.repaird_writer.close(timeout=REPAIRD_WRITER_CLOSE_TIMEOUT_S):
+            print("修理データの書き込みが完了する前にタイムアウトしました。")
+        # NASに反映できなかった記録は次回起動時に反映する
+        if not self.write_spool.drain(timeout=SPOOL_DRAIN_TIMEOUT_S):
+            print(
+                f"未送信の修理データが{self.write_spool.pending()}件あります（次回起動時に送信）"
+            )
+        self.write_spool.stop()
+        self.share_health.stop()
+        self.destroy()
 
-    def post_kintone_record(self, repaird_list: List[RepairdInfo]):
+    def post_kintone_record(self, repaird_list: "List[RepairdInfo]"):
         """修理レコードをKintoneに送信"""
         try:
             updated_repaird_list = self.repaird_kintone_client.post_repaird_records(
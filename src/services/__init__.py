@@ -0,0 +1,57 @@
+from .csv_journal import CsvJournal
+from .db_partitions import DbPartitions
+from .db_snapshot import DbSnapshotCache
+from .debounced_writer import DebouncedWriter
+from .defect_store import DefectStore, RecordSnapshot
+from .fs_cache import FsMetadataCache, fs_cache
+from .image_catalog import ImageCatalog
+from .image_exporter import BaseImageCache, DefectImageExporter, ImageEncodeOptions
+from .image_renamer import DefectImageRenamer, RenameResult
+from .latency import LatencyHistogram, LatencyRecorder, latency
+from .memory_budget import (
+    MemoryBudget,
+    compact_dataframe,
+    dataframe_nbytes,
+    records_nbytes,
+)
+from .reference_data import MtimeCachedFile, ReferenceData
+from .share_health import ShareHealthMonitor, ShareStatus
+from .shared_db_reader import SharedDbReader
+from .startup_timer import StartupTimer, startup_timer
+from .task_executor import TaskExecutor
+from .ui_dispatcher import UiDispatcher
+from .write_spool import WriteSpool
+
+__all__ = [
+    "BaseImageCache",
+    "CsvJournal",
+    "DbPartitions",
+    "DbSnapshotCache",
+    "DebouncedWriter",
+    "DefectStore",
+    "FsMetadataCache",
+    "ImageCatalog",
+    "DefectImageExporter",
+    "DefectImageRenamer",
+    "ImageEncodeOptions",
+    "LatencyHistogram",
+    "LatencyRecorder",
+    "MemoryBudget",
+    "MtimeCachedFile",
+    "RecordSnapshot",
+    "ReferenceData",
+    "RenameResult",
+    "ShareHealthMonitor",
+    "ShareStatus",
+    "SharedDbReader",
+    "StartupTimer",
+    "TaskExecutor",
+    "UiDispatcher",
+    "WriteSpool",
+    "compact_dataframe",
+    "dataframe_nbytes",
+    "fs_cache",
+    "latency",
+    "records_nbytes",
+    "startup_timer",
+]
@@ -0,0 +1,279 @@
+"""
+追記型CSVジャーナルモジュール
+
+保存のたびにCSV全体を書き直す代わりに、変更のあったレコードだけを
+ジャーナルファイルへ1行ずつ追記する。読み込み時はベースCSVに
+ジャーナルを畳み込み、ID毎の最新状態を復元する。
+
+コンパクション時はジャーナルを別名に変えてから畳み込むため、その間に
+他の端末が追記した行は新しいジャーナルに残る。
+"""
+
+import csv
+import os
+import threading
+import typing
+from dataclasses import MISSING, asdict, fields
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .fs_cache import fs_cache
+
+# ジャーナル行の操作種別を格納する列名
+OP_COLUMN = "journal_op"
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+class CsvJournal:
+    """ベースCSV + 追記ジャーナルでレコード一覧を永続化する"""
+
+    def __init__(
+        self,
+        base_path: str,
+        record_type: type,
+        reader: Callable[[str], list],
+        writer: Callable[[list, str], None],
+        compact_threshold: int = 200,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - base_path (str): ベースCSVファイルのパス
+        - record_type (type): レコードのdataclass型（DefectInfo, RepairdInfo等）
+        - reader (Callable): ベースCSVを読み込む関数（例: FileManager.read_repaird_csv）
+        - writer (Callable): ベースCSVを書き込む関数（例: FileManager.save_repaird_csv）
+        - compact_threshold (int): ジャーナル行数がこの値を超えたらコンパクションする
+        """
+        self.base_path = base_path
+        self.record_type = record_type
+        self.reader = reader
+        self.writer = writer
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._columns = [f.name for f in fields(record_type)]
+        self._field_types = self.__resolve_field_types(record_type)
+        self._field_defaults = {
+            f.name: f.default for f in fields(record_type) if f.default is not MISSING
+        }
+        # id -> 直近に書き込んだ行（差分検出用）
+        self._state: Dict[str, Dict[str, str]] = {}
+        self._journal_lines: Optional[int] = None
+
+    @staticmethod
+    def journal_path_for(base_path: str) -> str:
+        """ベースCSVに対応するジャーナルファイルのパスを返す"""
+        root, _ = os.path.splitext(base_path)
+        return f"{root}.journal.csv"
+
+    @staticmethod
+    def compacting_path_for(base_path: str) -> str:
+        """コンパクション中のジャーナルファイルのパスを返す"""
+        root, _ = os.path.splitext(base_path)
+        return f"{root}.journal.compacting.csv"
+
+    @staticmethod
+    def exists_for(base_path: str) -> bool:
+        """ベースCSVまたはジャーナルのいずれかが存在するか確認"""
+        return any(
+            fs_cache.exists(path)
+            for path in (
+                base_path,
+                CsvJournal.journal_path_for(base_path),
+                CsvJournal.compacting_path_for(base_path),
+            )
+        )
+
+    @property
+    def journal_path(self) -> str:
+        """ジャーナルファイルのパス"""
+        return self.journal_path_for(self.base_path)
+
+    @property
+    def compacting_path(self) -> str:
+        """コンパクション中のジャーナルファイルのパス"""
+        return self.compacting_path_for(self.base_path)
+
+    def load(self) -> list:
+        """ベースCSVとジャーナルを畳み込み、最新状態のレコード一覧を返す"""
+        with self._lock:
+            records: Dict[str, Any] = {}
+            if fs_cache.exists(self.base_path):
+                for record in self.reader(self.base_path) or []:
+                    records[str(record.id)] = record
+
+            lines = 0
+            for row in self.__read_journal_rows():
+                lines += 1
+                record_id = row.get("id", "")
+                if not record_id:
+                    continue
+                if row.get(OP_COLUMN) == OP_DELETE:
+                    records.pop(record_id, None)
+                else:
+                    records[record_id] = self.__row_to_record(row)
+
+            self._journal_lines = lines
+            self._state = {
+                record_id: self.__record_to_row(record)
+                for record_id, record in records.items()
+            }
+            return list(records.values())
+
+    def append(self, records: Iterable[Any]):
+        """レコードを追記する（変更の有無は問わない）"""
+        rows = [self.__record_to_row(record) for record in records]
+        with self._lock:
+            self.__write_rows([(OP_UPSERT, row) for row in rows])
+            for row in rows:
+                self._state[row["id"]] = row
+
+    def remove(self, record_ids: Iterable[str]):
+        """レコードの削除を追記する"""
+        ids = [str(record_id) for record_id in record_ids]
+        with self._lock:
+            self.__write_rows([(OP_DELETE, {"id": record_id}) for record_id in ids])
+            for record_id in ids:
+                self._state.pop(record_id, None)
+
+    def sync(self, records: Iterable[Any]) -> int:
+        """
+        レコード一覧と直近の状態を比較し、差分のみを追記する
+
+        Returns:
+            int: 追記した行数
+        """
+        return self.sync_rows(self.to_rows(records))
+
+    def to_rows(self, records: Iterable[Any]) -> list:
+        """レコードをCSV行（文字列の辞書）のリストに変換（スプールへの記録用）"""
+        return [self.__record_to_row(record) for record in records]
+
+    def from_rows(self, rows: Iterable[Dict[str, str]]) -> list:
+        """CSV行（スプールの記録）をレコードのリストに変換"""
+        return [self.__row_to_record(row) for row in rows]
+
+    def sync_rows(self, rows: Iterable[Dict[str, str]]) -> int:
+        """
+        CSV行の一覧と直近の状態を比較し、差分のみを追記する
+
+        Returns:
+            int: 追記した行数
+        """
+        with self._lock:
+            current = {}
+            for row in rows:
+                current[row["id"]] = row
+
+            entries = [
+                (OP_UPSERT, row)
+                for record_id, row in current.items()
+                if self._state.get(record_id) != row
+            ]
+            entries.extend(
+                (OP_DELETE, {"id": record_id})
+                for record_id in self._state
+                if record_id not in current
+            )
+            if entries:
+                self.__write_rows(entries)
+            self._state = current
+            return len(entries)
+
+    def compact(self):
+        """
+        ジャーナルをベースCSVに畳み込み、畳み込んだジャーナルを削除する
+
+        ジャーナルを別名に変えてから読み込むため、読み込み後に追記された行は
+        新しいジャーナルに残る（前回中断したコンパクションのファイルがある場合は
+        それを先に畳み込む）。
+        """
+        with self._lock:
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    return
+                os.replace(self.journal_path, self.compacting_path)
+                fs_cache.invalidate(self.journal_path)
+                fs_cache.invalidate(self.compacting_path)
+            records = self.load()
+            self.writer(records, self.base_path)
+            fs_cache.invalidate(self.base_path)
+            os.remove(self.compacting_path)
+            fs_cache.invalidate(self.compacting_path)
+            # 別名に変えた後の追記は新しいジャーナルに残っている
+            self._journal_lines = None
+
+    def __write_rows(self, entries: list):
+        """ジャーナルに行を追記し、必要ならコンパクションする"""
+        header = self._columns + [OP_COLUMN]
+        # ヘッダーの重複を避けるため、追記前はキャッシュを使わずに確認する
+        is_new = not os.path.exists(self.journal_path)
+        # 新規作成時のみBOM付きでヘッダーを書き込む
+        encoding = "utf-8-sig" if is_new else "utf-8"
+        with open(self.journal_path, "a", newline="", encoding=encoding) as f:
+            csv_writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
+            if is_new:
+                csv_writer.writeheader()
+            for op, row in entries:
+                csv_writer.writerow({**row, OP_COLUMN: op})
+        fs_cache.invalidate(self.journal_path)
+
+        if self._journal_lines is None:
+            self._journal_lines = sum(1 for _ in self.__read_journal_rows())
+        else:
+            self._journal_lines += len(entries)
+        if self._journal_lines >= self.compact_threshold:
+            self.compact()
+
+    def __read_journal_rows(self):
+        """ジャーナルの行を順番に返す（コンパクション中のものを先に返す）"""
+        for path in (self.compacting_path, self.journal_path):
+            if not fs_cache.exists(path):
+                continue
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                yield from csv.DictReader(f)
+
+    def __record_to_row(self, record: Any) -> Dict[str, str]:
+        """レコードをCSV行（文字列の辞書）に変換"""
+        data = asdict(record)
+        return {
+            column: "" if data.get(column) is None else str(data.get(column))
+            for column in self._columns
+        }
+
+    def __row_to_record(self, row: Dict[str, str]) -> Any:
+        """CSV行をレコードに変換"""
+        values = {}
+        for column in self._columns:
+            if column not in row:
+                continue
+            values[column] = self.__convert_value(column, row[column])
+        return self.record_type(**values)
+
+    def __convert_value(self, column: str, value: str) -> Any:
+        """フィールドの型注釈に従って文字列を変換"""
+        if value == "":
+            return self._field_defaults.get(column)
+        target = self._field_types.get(column)
+        try:
+            if target is int:
+                return int(float(value))
+            if target is float:
+                return float(value)
+        except ValueError:
+            pass
+        return value
+
+    @staticmethod
+    def __resolve_field_types(record_type: type) -> Dict[str, type]:
+        """Optional[...]を外したフィールド型の辞書を作成"""
+        try:
+            hints = typing.get_type_hints(record_type)
+        except Exception:
+            hints = {f.name: f.type for f in fields(record_type)}
+        resolved = {}
+        for name, hint in hints.items():
+            args = [a for a in typing.get_args(hint) if a is not type(None)]
+            resolved[name] = args[0] if len(args) == 1 else hint
+        return resolved
@@ -0,0 +1,387 @@
+"""
+共有データベースのパーティションモジュール
+
+共有ディレクトリの不良情報を月毎のファイル（aoi_data_YYYYMM.db）に分け、
+指図がどのファイルにあるかを小さなカタログ（aoi_data_catalog.db）に記録する。
+指図の不良情報は最初に登録した月のファイルにまとめて書き込むため、日常的に
+コピー・マージするのは当月（と直近）のファイルのみとなる。書き込みの終わった
+過去のファイルは変更されないものとして読み取り専用で開き、ページをキャッシュする。
+
+書き込みの終わったファイルには書き込まない。その指図への新しい書き込みは
+当月のファイルに行い（読み込み時は全てのファイルを合わせる）、そのファイルに
+ある不良情報の削除はカタログに記録して読み込み時に除外する。変更なしとして
+扱う1ヶ月前から書き込み先にしないため、未反映のマージはその間に反映される。
+
+分割前の aoi_data.db は旧データとして残し、カタログにない指図の検索に使う。
+圧縮スナップショット（DbSnapshotCache）を指定した場合、書き込みの終わった
+ファイルは圧縮したまま取得してローカルで展開したものを読む。取得は
+on_missing_snapshot でバックグラウンドに依頼し、展開されるまでは共有
+ディレクトリのファイルを読む。
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .db_snapshot import DbSnapshotCache
+from .fs_cache import fs_cache
+from .shared_db_reader import DEFAULT_CACHE_KIB, SharedDbReader, sqlite_readonly_uri
+
+DEFAULT_PREFIX = "aoi_data"
+# 当月を含めてこの月数より前のパーティションは書き込みが終わったものとする
+DEFAULT_OPEN_MONTHS = 3
+# ロック中のカタログを待つ時間（秒）
+DEFAULT_TIMEOUT_S = 5.0
+
+CATALOG_TABLE = "lot_partitions"
+# 削除した不良情報（書き込みの終わったファイルは変更しないため読み込み時に除外）
+DELETED_TABLE = "deleted_records"
+
+
+class DbPartitions:
+    """月毎に分割した共有データベースとカタログを扱う"""
+
+    def __init__(
+        self,
+        directory: str,
+        record_type: type,
+        prefix: str = DEFAULT_PREFIX,
+        open_months: int = DEFAULT_OPEN_MONTHS,
+        cache_kib: int = DEFAULT_CACHE_KIB,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        clock: Callable[[], datetime] = datetime.now,
+        snapshots: Optional[DbSnapshotCache] = None,
+        on_missing_snapshot: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        コンストラクタ（ネットワークには触れない）
+
+        ### Args:
+        - directory (str): 共有ディレクトリ（空の場合はカタログを参照しない）
+        - record_type (type): 行を変換するデータクラス（DefectInfo等）
+        - prefix (str): ファイル名の接頭辞
+        - open_months (int): 当月を含めて書き込みを受け付ける月数
+        - cache_kib (int): パーティション毎のページキャッシュのサイズ（KiB）
+        - timeout_s (float): ロック中のファイルを待つ時間（秒）
+        - clock (Callable): 現在日時を返す関数
+        - snapshots (DbSnapshotCache): 書き込みの終わったファイルの圧縮スナップショット
+          （Noneの場合は共有ディレクトリのファイルを直接読む）
+        - on_missing_snapshot (Callable): 展開済みのスナップショットがない場合に
+          共有ディレクトリのパスを渡して呼ばれる関数（バックグラウンドでの取得の
+          依頼に使用。ファイル毎に1回）
+        """
+        self.directory = str(directory or "")
+        self.record_type = record_type
+        self.prefix = prefix
+        self.open_months = max(1, open_months)
+        self.cache_kib = cache_kib
+        self.timeout_s = timeout_s
+        self.clock = clock
+        self.snapshots = snapshots
+        self.on_missing_snapshot = on_missing_snapshot
+        self.legacy_name = f"{prefix}.db"
+        self.catalog_name = f"{prefix}_catalog.db"
+        self._pattern = re.compile(rf"^{re.escape(prefix)}_(\d{{4}})(\d{{2}})\.db$")
+        # カタログから取得した指図のパーティション（変わらないためキャッシュする）
+        self._catalog: Dict[str, List[str]] = {}
+        # この端末で書き込み先に決めたパーティション（カタログ未登録を含む）
+        self._assigned: Dict[str, str] = {}
+        self._readers: Dict[str, SharedDbReader] = {}
+        # スナップショットの取得を依頼済みのファイル
+        self._snapshot_requested: set = set()
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        """共有ディレクトリ内のファイルのパス"""
+        return os.path.join(self.directory, name)
+
+    def partition_name(self, when: Optional[datetime] = None) -> str:
+        """
+        日時のパーティションのファイル名
+
+        ### Args:
+        - when (datetime): 日時（Noneの場合は現在）
+
+        Returns:
+            str: aoi_data_YYYYMM.db
+        """
+        when = when or self.clock()
+        return f"{self.prefix}_{when:%Y%m}.db"
+
+    def is_immutable(self, name: str) -> bool:
+        """
+        書き込みの終わったパーティションか（旧データ・カタログはFalse）
+
+        ### Args:
+        - name (str): ファイル名
+        """
+        age = self.__age(name)
+        return age is not None and age >= self.open_months
+
+    def is_writable(self, name: str) -> bool:
+        """
+        書き込み先にできるパーティションか（旧データはTrue）
+
+        変更なしとして扱う1ヶ月前から書き込み先にしない（当月は常に書き込める）。
+
+        ### Args:
+        - name (str): ファイル名
+        """
+        age = self.__age(name)
+        return age is None or age < max(1, self.open_months - 1)
+
+    def partitions_for_lot(self, lot_number: str) -> List[str]:
+        """
+        指図の不良情報があるパーティション（登録順）
+
+        カタログに接続できない場合は例外を送出する。
+
+        ### Args:
+        - lot_number (str): 指図
+
+        Returns:
+            List[str]: ファイル名のリスト（この端末で書き込み先に決めたものを含む）
+        """
+        with self._lock:
+            partitions = list(self._catalog.get(lot_number, []))
+            assigned = self._assigned.get(lot_number)
+        if not partitions and self.directory:
+            partitions = self.__query_catalog(lot_number)
+            if partitions:
+                with self._lock:
+                    self._catalog[lot_number] = list(partitions)
+        if assigned and assigned not in partitions:
+            partitions.append(assigned)
+        return partitions
+
+    def partition_for_lot(self, lot_number: str) -> str:
+        """
+        指図の書き込み先のパーティションを決める
+
+        カタログに登録済みの場合は書き込みを受け付ける最初のパーティション、
+        未登録で旧データにある場合は旧データ、それ以外（登録済みのパーティションが
+        全て書き込みの終わったものの場合を含む）は当月のパーティションとする。
+        カタログに接続できない場合も当月とし、読み込み時は全てのパーティションを
+        合わせる。
+
+        ### Args:
+        - lot_number (str): 指図
+
+        Returns:
+            str: ファイル名
+        """
+        with self._lock:
+            if lot_number in self._assigned:
+                return self._assigned[lot_number]
+        try:
+            partitions = self.partitions_for_lot(lot_number)
+            if not partitions and self.__in_legacy(lot_number):
+                partitions = [self.legacy_name]
+        except (sqlite3.Error, OSError) as e:
+            print(f"パーティションカタログ読み込みエラー: {e}")
+            partitions = []
+        writable = [name for name in partitions if self.is_writable(name)]
+        name = writable[0] if writable else self.partition_name()
+        with self._lock:
+            self._assigned.setdefault(lot_number, name)
+            return self._assigned[lot_number]
+
+    def get_by_lot(self, lot_number: str) -> List[Any]:
+        """
+        指図の不良情報を全てのパーティションから取得（同じIDは後のものを優先）
+
+        カタログにない指図は旧データから取得し、カタログに記録した削除は除外する。
+
+        ### Args:
+        - lot_number (str): 指図
+
+        Returns:
+            List[Any]: record_typeのリスト
+        """
+        if not self.directory:
+            return []
+        partitions = self.partitions_for_lot(lot_number)
+        with self._lock:
+            in_catalog = lot_number in self._catalog
+        if not in_catalog and self.legacy_name not in partitions:
+            partitions.insert(0, self.legacy_name)
+        records: Dict[Any, Any] = {}
+        for name in partitions:
+            if not fs_cache.exists(self.path(name)):
+                continue
+            for record in self.__read_lot(name, lot_number):
+                records.pop(record.id, None)
+                records[record.id] = record
+        for record_id in self.__query_deleted(lot_number):
+            records.pop(record_id, None)
+        return list(records.values())
+
+    def register(self, lots: Dict[str, str], deleted: Optional[Dict[str, str]] = None):
+        """
+        指図のパーティションと削除した不良情報をカタログに登録（共有ディレクトリへの書き込み）
+
+        ### Args:
+        - lots (Dict[str, str]): {指図: ファイル名}
+        - deleted (Dict[str, str]): 削除した不良情報 {ID: 指図}
+        """
+        deleted = deleted or {}
+        if not lots and not deleted:
+            return
+        registered_at = datetime.now().isoformat(timespec="seconds")
+        conn = sqlite3.connect(self.path(self.catalog_name), timeout=self.timeout_s)
+        try:
+            with conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} ("
+                    "lot_number TEXT NOT NULL, partition_name TEXT NOT NULL, "
+                    "registered_at TEXT NOT NULL, "
+                    "PRIMARY KEY (lot_number, partition_name))"
+                )
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {CATALOG_TABLE} "
+                    "(lot_number, partition_name, registered_at) VALUES (?, ?, ?)",
+                    [(lot, name, registered_at) for lot, name in lots.items()],
+                )
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {DELETED_TABLE} ("
+                    "id TEXT PRIMARY KEY, lot_number TEXT NOT NULL, "
+                    "deleted_at TEXT NOT NULL)"
+                )
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO {DELETED_TABLE} "
+                    "(id, lot_number, deleted_at) VALUES (?, ?, ?)",
+                    [(id_, lot, registered_at) for id_, lot in deleted.items()],
+                )
+        finally:
+            conn.close()
+        fs_cache.invalidate(self.path(self.catalog_name))
+        with self._lock:
+            for lot, name in lots.items():
+                partitions = self._catalog.setdefault(lot, [])
+                if name not in partitions:
+                    partitions.append(name)
+
+    def close(self):
+        """パーティションの接続を閉じる"""
+        with self._lock:
+            readers = list(self._readers.values())
+            self._readers.clear()
+        for reader in readers:
+            reader.close()
+
+    def __query_catalog(self, lot_number: str) -> List[str]:
+        """カタログから指図のパーティションを取得（カタログがない場合は空）"""
+        path = self.path(self.catalog_name)
+        if not fs_cache.exists(path):
+            return []
+        conn = sqlite3.connect(
+            sqlite_readonly_uri(path), uri=True, timeout=self.timeout_s
+        )
+        try:
+            rows = conn.execute(
+                f"SELECT partition_name FROM {CATALOG_TABLE} "
+                "WHERE lot_number = ? ORDER BY rowid",
+                (lot_number,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def __query_deleted(self, lot_number: str) -> List[str]:
+        """カタログから指図の削除した不良情報のIDを取得（記録がない場合は空）"""
+        path = self.path(self.catalog_name)
+        if not fs_cache.exists(path):
+            return []
+        conn = sqlite3.connect(
+            sqlite_readonly_uri(path), uri=True, timeout=self.timeout_s
+        )
+        try:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (DELETED_TABLE,),
+            ).fetchone():
+                return []
+            rows = conn.execute(
+                f"SELECT id FROM {DELETED_TABLE} WHERE lot_number = ?",
+                (lot_number,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def __age(self, name: str) -> Optional[int]:
+        """パーティションの当月からの経過月数（月毎のファイルでない場合はNone）"""
+        match = self._pattern.match(name)
+        if not match:
+            return None
+        now = self.clock()
+        return (now.year * 12 + now.month) - (
+            int(match.group(1)) * 12 + int(match.group(2))
+        )
+
+    def __in_legacy(self, lot_number: str) -> bool:
+        """旧データに指図の不良情報があるか"""
+        if not self.directory or not fs_cache.exists(self.path(self.legacy_name)):
+            return False
+        return bool(self.__read_lot(self.legacy_name, lot_number))
+
+    def __read_lot(self, name: str, lot_number: str) -> List[Any]:
+        """
+        パーティションから指図の行を読み込む
+
+        スナップショットを取得するまでは共有ディレクトリのファイルを都度開いて
+        読み、接続は残さない（取得後の読み込みでスナップショットに切り替える）。
+        """
+        reader = self.__reader(name)
+        if reader is not None:
+            return reader.get_by_lot(lot_number)
+        reader = self.__open_reader(self.path(name), immutable=True)
+        try:
+            return reader.get_by_lot(lot_number)
+        finally:
+            reader.close()
+
+    def __reader(self, name: str) -> Optional[SharedDbReader]:
+        """
+        パーティションの読み取り専用接続
+
+        書き込みの終わったものは変更なしとして開き、圧縮スナップショットを
+        使う場合はローカルに展開済みのものだけを読む。展開されていない場合は
+        バックグラウンドでの取得を依頼してNoneを返す（ここでは取得しない）。
+        """
+        with self._lock:
+            reader = self._readers.get(name)
+        if reader is not None:
+            return reader
+        path = self.path(name)
+        immutable = self.is_immutable(name)
+        if immutable and self.snapshots is not None:
+            path = self.snapshots.cached(path)
+            if path is None:
+                self.__request_snapshot(name)
+                return None
+        reader = self.__open_reader(path, immutable=immutable)
+        with self._lock:
+            reader = self._readers.setdefault(name, reader)
+        return reader
+
+    def __open_reader(self, path: str, immutable: bool) -> SharedDbReader:
+        """読み取り専用接続を作成（接続は最初の読み込みで開く）"""
+        return SharedDbReader(
+            path,
+            self.record_type,
+            cache_kib=self.cache_kib,
+            timeout_s=self.timeout_s,
+            immutable=immutable,
+        )
+
+    def __request_snapshot(self, name: str):
+        """スナップショットの取得を依頼（ファイル毎に1回）"""
+        with self._lock:
+            requested = name in self._snapshot_requested
+            self._snapshot_requested.add(name)
+        if not requested and self.on_missing_snapshot is not None:
+            self.on_missing_snapshot(self.path(name))
@@ -0,0 +1,171 @@
+"""
+共有データベースの圧縮スナップショットモジュール
+
+書き込みの終わったパーティション（aoi_data_YYYYMM.db）を圧縮したスナップショット
+（.xz / .zz）を共有ディレクトリに置き、各端末は圧縮したまま取得してローカルで
+展開・キャッシュする。SQLiteのファイルは文字列が多く圧縮が効くため、SMBを
+通るバイト数を大きく減らせる。スナップショットの作成は最初に必要になった端末が
+1回だけ行う（生のファイルを読むのはその1回のみ）。
+
+圧縮には標準ライブラリの lzma（既定、圧縮率重視）または zlib（速度重視）を使う。
+"""
+
+import lzma
+import os
+import shutil
+import threading
+import zlib
+from typing import Callable, Dict, Optional
+
+from .fs_cache import fs_cache
+
+# 読み書きの単位（バイト）
+CHUNK_SIZE = 1024 * 1024
+# SQLiteのファイルの先頭（展開結果の確認に使用）
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# 圧縮形式: (拡張子, 圧縮器の作成, 展開器の作成)
+CODECS: Dict[str, tuple] = {
+    "lzma": (
+        ".xz",
+        lambda: lzma.LZMACompressor(preset=6),
+        lambda: lzma.LZMADecompressor(),
+    ),
+    "zlib": (
+        ".zz",
+        lambda: zlib.compressobj(6),
+        lambda: zlib.decompressobj(),
+    ),
+}
+DEFAULT_CODEC = "lzma"
+
+
+def _transform(source: str, dest: str, make: Callable, compress: bool) -> int:
+    """
+    ファイルを圧縮・展開しながらコピーする（一時ファイルに書いてから置き換える）
+
+    ### Args:
+    - source (str): 読み込むファイル
+    - dest (str): 書き込むファイル
+    - make (Callable): 圧縮器・展開器を作成する関数
+    - compress (bool): 圧縮する場合True、展開する場合False
+
+    Returns:
+        int: 読み込んだバイト数
+    """
+    codec = make()
+    step = codec.compress if compress else codec.decompress
+    flush = getattr(codec, "flush", None)
+    temp_path = f"{dest}.tmp"
+    read = 0
+    try:
+        with open(source, "rb") as src, open(temp_path, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                read += len(chunk)
+                dst.write(step(chunk))
+            if flush is not None:
+                dst.write(flush())
+        if not compress and not codec.eof:
+            raise OSError(f"圧縮データが途中で終わっています: {source}")
+        os.replace(temp_path, dest)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return read
+
+
+class DbSnapshotCache:
+    """圧縮スナップショットの作成・取得とローカルのキャッシュ"""
+
+    def __init__(self, cache_dir: str, codec: str = DEFAULT_CODEC):
+        """
+        コンストラクタ
+
+        ### Args:
+        - cache_dir (str): 展開したファイルを置くローカルのディレクトリ
+        - codec (str): 圧縮形式（lzma / zlib）
+        """
+        if codec not in CODECS:
+            raise ValueError(f"未対応の圧縮形式です: {codec}")
+        self.cache_dir = str(cache_dir)
+        self.codec = codec
+        self.suffix, self._compressor, self._decompressor = CODECS[codec]
+        # ネットワーク越しに読み書きしたバイト数
+        self.bytes_transferred = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def snapshot_path(self, db_path: str) -> str:
+        """共有ディレクトリのスナップショットのパス"""
+        return f"{db_path}{self.suffix}"
+
+    def local_path(self, db_path: str) -> str:
+        """展開したファイルのローカルのパス"""
+        return os.path.join(self.cache_dir, os.path.basename(db_path))
+
+    def cached(self, db_path: str) -> Optional[str]:
+        """展開済みの場合はローカルのパス、なければNone（ネットワークには触れない）"""
+        local_path = self.local_path(db_path)
+        return local_path if os.path.exists(local_path) else None
+
+    def fetch(self, db_path: str) -> Optional[str]:
+        """
+        スナップショットを取得してローカルに展開する
+
+        ### Args:
+        - db_path (str): 共有ディレクトリのデータベースのパス
+
+        Returns:
+            Optional[str]: ローカルのパス（スナップショットがない場合はNone）
+        """
+        local_path = self.cached(db_path)
+        if local_path:
+            return local_path
+        snapshot_path = self.snapshot_path(db_path)
+        if not fs_cache.exists(snapshot_path):
+            return None
+        local_path = self.local_path(db_path)
+        # 圧縮したままローカルに取得してから展開する（SMBを通るのは圧縮後のみ）
+        compressed_path = f"{local_path}{self.suffix}"
+        with self._lock:
+            if os.path.exists(local_path):
+                return local_path
+            shutil.copyfile(snapshot_path, compressed_path)
+            try:
+                self.bytes_transferred += os.path.getsize(compressed_path)
+                _transform(compressed_path, local_path, self._decompressor, False)
+            finally:
+                os.remove(compressed_path)
+            with open(local_path, "rb") as f:
+                if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+                    os.remove(local_path)
+                    raise OSError(f"スナップショットが壊れています: {snapshot_path}")
+        return local_path
+
+    def publish(self, db_path: str) -> int:
+        """
+        データベースを圧縮したスナップショットを共有ディレクトリに作成
+
+        作成済みの場合は何もしない。
+
+        ### Args:
+        - db_path (str): 共有ディレクトリのデータベースのパス
+
+        Returns:
+            int: 作成したスナップショットのサイズ（作成済みの場合は0）
+        """
+        snapshot_path = self.snapshot_path(db_path)
+        if os.path.exists(snapshot_path):
+            return 0
+        with self._lock:
+            self.bytes_transferred += _transform(
+                db_path, snapshot_path, self._compressor, True
+            )
+            size = os.path.getsize(snapshot_path)
+            self.bytes_transferred += size
+        fs_cache.invalidate(snapshot_path)
+        return size
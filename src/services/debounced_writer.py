@@ -0,0 +1,111 @@
+"""
+遅延書き込みモジュール
+
+UI操作のたびに同期で保存する代わりに、変更をダーティとして記録し、
+短いタイマー経過後にまとめてバックグラウンドスレッドで書き込む。
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+
+class DebouncedWriter:
+    """Tkウィジェットのタイマーで変更をまとめ、専用スレッドで書き込む"""
+
+    def __init__(
+        self,
+        widget,
+        collect: Callable[[], Any],
+        write: Callable[[Any], None],
+        delay_ms: int = 800,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - widget (tk.Misc): タイマー（after）を登録するウィジェット
+        - collect (Callable): Tkスレッドで書き込み内容のスナップショットを作成する関数
+        - write (Callable): バックグラウンドでスナップショットを書き込む関数
+        - delay_ms (int): 最後の変更から書き込みまでの待ち時間
+        - on_error (Callable): 書き込み失敗時に呼ばれる関数（バックグラウンドスレッド）
+        """
+        self.widget = widget
+        self.collect = collect
+        self.write = write
+        self.delay_ms = delay_ms
+        self.on_error = on_error
+
+        self._dirty = False
+        self._after_id = None
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self.__worker, daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        """未書き込みの変更があるか"""
+        return self._dirty
+
+    def mark_dirty(self):
+        """変更を記録し、書き込みタイマーを（再）設定する"""
+        self._dirty = True
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        """未書き込みの変更があればスナップショットを作成して書き込みを依頼する"""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        payload = self.collect()
+        self._queue.put(lambda: self.write(payload))
+
+    def submit(self, task: Callable[[], None]):
+        """書き込みと同じ順序でバックグラウンド処理を実行する"""
+        self._queue.put(task)
+
+    def wait(self, timeout: float = 10.0) -> bool:
+        """
+        それまでに依頼した書き込みが全て完了するまで待機する
+
+        Returns:
+            bool: タイムアウトまでに完了したか
+        """
+        done = threading.Event()
+        self._queue.put(done.set)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """
+        残りの変更を書き込み、ワーカースレッドを終了する
+
+        Returns:
+            bool: タイムアウトまでに全ての書き込みが完了したか
+        """
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def __worker(self):
+        """キューに積まれた書き込みを順番に実行する"""
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+            try:
+                task()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"バックグラウンド書き込みエラー: {e}")
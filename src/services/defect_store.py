@@ -0,0 +1,176 @@
+"""
+不良レコードのストアモジュール
+
+DefectInfoは1件毎に15以上の文字列属性を持ち、model_code・lot_number・
+aoi_user等は指図内で同じ値になる。SQLite・CSVから読み込んだレコードは
+行毎に別の文字列オブジェクトを持つため、値の種類が少ない列（SHARED_FIELDS）
+のみ値を共有し、id・登録日時・画像パス等のレコード毎に異なる値は
+そのまま保持する。
+
+レコードはDefectInfoのままリストで保持するため、読み取りはリストと
+同じ速さで行える。外部ライブラリ（Kintone・SQLite）へ渡す場合は
+Tkスレッドで snapshot() により複製を取り、ワーカースレッドでは records() で
+その複製のリストを共有する。保持しているレコードの属性を変更する場合は
+replace() で複製に置き換え、version を進める。
+"""
+
+import copy
+import sys
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, List
+
+# 値の種類が少ない列（指図内で一定の列と、不良名・基板番号ラベル等の
+# 指図内でも繰り返し現れる列）。値を共有する
+SHARED_FIELDS = (
+    "line_name",
+    "defect_name",
+    "aoi_user",
+    "model_code",
+    "lot_number",
+    "model_label",
+    "board_label",
+    "board_number_label",
+)
+
+
+class RecordSnapshot:
+    """取得時点のレコードの複製（Kintone送信・SQLite書き込みで共有する）"""
+
+    def __init__(self, records: Iterable[Any]):
+        """
+        コンストラクタ（Tkスレッドで呼ぶ。その後のTk側の変更が混ざらないよう
+        ここで複製する）
+
+        ### Args:
+        - records (Iterable): レコード
+        """
+        self._records: List[Any] = [copy.copy(record) for record in records]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self) -> List[Any]:
+        """複製したレコードのリスト（外部ライブラリ用。ワーカースレッドで呼ぶ）"""
+        return self._records
+
+
+class DefectStore(MutableSequence):
+    """種類の少ない列の値を共有してDefectInfo等を保持するリスト互換のストア"""
+
+    def __init__(self, records: Iterable[Any] = ()):
+        """
+        コンストラクタ
+
+        ### Args:
+        - records (Iterable): 初期レコード
+        """
+        self._records: List[Any] = []
+        # 共有する値（種類の少ない列のため件数は少ない。clearで破棄する）
+        self._shared: Dict[str, str] = {}
+        # 追加・置換・削除のたびに増える番号（索引等のキャッシュの無効化に使う）
+        self.version = 0
+        self._records = [self.__share(record) for record in records]
+
+    # ---- リスト互換のインターフェース ----
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __setitem__(self, index, record):
+        if isinstance(index, slice):
+            raise TypeError("スライスへの代入には対応していません")
+        self._records[index] = self.__share(record)
+        self.version += 1
+
+    def __delitem__(self, index):
+        del self._records[index]
+        self.version += 1
+
+    def insert(self, index: int, record: Any):
+        """指定位置にレコードを追加"""
+        self._records.insert(index, self.__share(record))
+        self.version += 1
+
+    def clear(self):
+        """全レコードと共有している値を破棄"""
+        self._records = []
+        self._shared = {}
+        self.version += 1
+
+    def replace(self, index: int, **changes: Any) -> Any:
+        """
+        レコードを複製して属性を変更したものに置き換える
+
+        取得済みのスナップショット等と共有しないよう保持しているレコードは
+        直接変更せず、置き換えてversionを進める。
+
+        ### Args:
+        - index (int): 位置
+        - **changes: 変更する属性と値
+
+        Returns:
+            Any: 置き換えたレコード
+        """
+        record = copy.copy(self._records[index])
+        for name, value in changes.items():
+            setattr(record, name, value)
+        self[index] = record
+        return record
+
+    # ---- 外部ライブラリ用 ----
+
+    def snapshot(self) -> RecordSnapshot:
+        """現在のレコードを複製したスナップショット（Tkスレッドで呼ぶ）"""
+        return RecordSnapshot(self._records)
+
+    def to_records(self) -> List[Any]:
+        """複製したレコードのリストを作成して返す"""
+        return self.snapshot().records()
+
+    def nbytes(self, sample: int = 20) -> int:
+        """
+        おおよそのメモリ使用量（バイト）
+
+        先頭の数件の共有しない値の大きさから1件あたりの大きさを推定し、
+        共有している値は1回だけ数える。
+        """
+        total = sys.getsizeof(self._records)
+        total += sum(sys.getsizeof(value) for value in self._shared)
+        records = self._records[:sample]
+        if not records:
+            return total
+        size = 0
+        for record in records:
+            size += sys.getsizeof(record)
+            attributes = getattr(record, "__dict__", None)
+            if attributes is None:
+                continue
+            size += sys.getsizeof(attributes)
+            size += sum(
+                sys.getsizeof(value)
+                for name, value in attributes.items()
+                if name not in SHARED_FIELDS
+            )
+        return total + size * len(self._records) // len(records)
+
+    # ---- 内部処理 ----
+
+    def __share(self, record: Any) -> Any:
+        """種類の少ない列の文字列を共有の値に置き換える"""
+        shared = self._shared
+        for name in SHARED_FIELDS:
+            value = getattr(record, name, None)
+            if type(value) is not str:
+                continue
+            existing = shared.get(value)
+            if existing is None:
+                shared[value] = value
+            elif existing is not value:
+                setattr(record, name, existing)
+        return record
@@ -0,0 +1,189 @@
+"""
+ファイルシステムのメタデータキャッシュモジュール
+
+NAS（UNCパス）上のデータディレクトリや指図毎の出力フォルダに対する
+exists/stat/listdir は1回毎にネットワークの往復が発生する。結果を短い期限で
+保持し、同じパスへの繰り返しの確認をメモリ上で済ませる。自分で書き込んだ
+パスは invalidate() で破棄し、次回の確認で最新の状態を取得する。
+"""
+
+import os
+import stat as stat_module
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+# stat結果（存在する場合）の保持期間（秒）
+DEFAULT_TTL = 2.0
+# 存在しない・接続できない結果の保持期間（秒）
+DEFAULT_NEGATIVE_TTL = 1.0
+# listdir結果の保持期間（秒）
+DEFAULT_LISTDIR_TTL = 5.0
+# 保持するパスの最大数
+DEFAULT_MAX_ENTRIES = 4096
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class FsMetadataCache:
+    """exists/stat/listdir の結果を短い期限で保持するキャッシュ"""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        listdir_ttl: float = DEFAULT_LISTDIR_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - ttl (float): stat結果の保持期間（秒、0の場合は保持しない）
+        - negative_ttl (float): 存在しない・接続できない結果の保持期間（秒）
+        - listdir_ttl (float): listdir結果の保持期間（秒）
+        - max_entries (int): 保持するパスの最大数
+        - clock (Callable): 現在時刻（秒）を返す関数
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.listdir_ttl = listdir_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        # パス -> (期限, stat結果 or 発生した例外)
+        self._stats: Dict[str, Tuple[float, Union[os.stat_result, OSError]]] = {}
+        # パス -> (期限, ファイル名の一覧)
+        self._listings: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path: PathLike) -> str:
+        """キャッシュのキー（区切り文字・大文字小文字を正規化したパス）"""
+        return os.path.normcase(os.path.normpath(os.fspath(path)))
+
+    def stat(self, path: PathLike) -> os.stat_result:
+        """
+        os.stat の結果を返す（期限内の場合は保持した結果）
+
+        ### Args:
+        - path (PathLike): パス
+
+        Returns:
+            os.stat_result: stat結果
+
+        Raises:
+            OSError: 存在しない・接続できない場合（保持した例外を再送出）
+        """
+        key = self.key(path)
+        now = self.clock()
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                result = entry[1]
+            else:
+                result = None
+                self.misses += 1
+        if result is None:
+            # ネットワークの往復中はロックを保持しない
+            try:
+                result = os.stat(path)
+                ttl = self.ttl
+            except OSError as e:
+                result = e
+                ttl = self.negative_ttl
+            self.__store(self._stats, key, result, ttl)
+        if isinstance(result, OSError):
+            raise result
+        return result
+
+    def exists(self, path: PathLike) -> bool:
+        """os.path.exists 相当（接続できない場合もFalse）"""
+        try:
+            self.stat(path)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def isdir(self, path: PathLike) -> bool:
+        """os.path.isdir 相当"""
+        try:
+            return stat_module.S_ISDIR(self.stat(path).st_mode)
+        except (OSError, ValueError):
+            return False
+
+    def isfile(self, path: PathLike) -> bool:
+        """os.path.isfile 相当"""
+        try:
+            return stat_module.S_ISREG(self.stat(path).st_mode)
+        except (OSError, ValueError):
+            return False
+
+    def listdir(self, path: PathLike) -> List[str]:
+        """os.listdir の結果を返す（返すリストは呼び出し側で変更してよい）"""
+        key = self.key(path)
+        now = self.clock()
+        with self._lock:
+            entry = self._listings.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        names = os.listdir(path)
+        self.__store(self._listings, key, names, self.listdir_ttl)
+        return list(names)
+
+    def makedirs(self, path: PathLike):
+        """
+        ディレクトリを作成する（作成済みと分かっている場合は何もしない）
+
+        ### Args:
+        - path (PathLike): ディレクトリのパス
+        """
+        if self.isdir(path):
+            return
+        os.makedirs(path, exist_ok=True)
+        self.invalidate(path)
+
+    def invalidate(self, path: PathLike):
+        """
+        自分で書き込んだ（作成・更新・削除・リネーム）パスの結果を破棄する
+
+        親ディレクトリの一覧・更新日時も変わるため合わせて破棄する。
+
+        ### Args:
+        - path (PathLike): 書き込んだパス
+        """
+        key = self.key(path)
+        parent = os.path.dirname(key)
+        with self._lock:
+            for target in (key, parent):
+                self._stats.pop(target, None)
+                self._listings.pop(target, None)
+
+    def clear(self):
+        """全ての結果を破棄する"""
+        with self._lock:
+            self._stats.clear()
+            self._listings.clear()
+
+    def __store(self, table: dict, key: str, value, ttl: float):
+        """結果を保持する（上限を超えた場合は期限切れを破棄）"""
+        if ttl <= 0:
+            return
+        now = self.clock()
+        with self._lock:
+            if len(table) >= self.max_entries:
+                expired = [k for k, (expires, _) in table.items() if expires <= now]
+                for k in expired:
+                    del table[k]
+                if len(table) >= self.max_entries:
+                    table.clear()
+            table[key] = (now + ttl, value)
+
+
+# アプリケーション全体で共有するキャッシュ
+fs_cache = FsMetadataCache()
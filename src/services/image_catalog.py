@@ -0,0 +1,259 @@
+"""
+基板画像カタログモジュール
+
+画像ディレクトリ（NAS上に数千ファイル）を指図変更のたびに一覧する代わりに、
+ファイル名を品目コード（ファイル名の先頭）毎の辞書として保持する。
+ディレクトリの更新日時が変わった場合のみ os.scandir で読み直し、
+既存のファイルは解析済みの内容を再利用する。カタログはファイルに保存し、
+次回起動時にディレクトリが更新されていなければ読み直さずに使う。
+見つからない品目コードでの読み直しはディレクトリ毎に一定間隔に制限し、
+ファイル一覧が変わらなければカタログを保存し直さない。
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# カタログファイルの形式のバージョン
+CATALOG_VERSION = 1
+
+# カタログに含める画像の拡張子
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+# 見つからない場合に更新日時によらず読み直す最小間隔（秒。ディレクトリ毎）
+DEFAULT_MIN_RESCAN_INTERVAL_S = 30.0
+
+# 画像ファイル名の解析結果（機種名, 基板名, 面）
+ImageInfo = Tuple[str, str, str]
+
+
+class ImageCatalog:
+    """画像ディレクトリのファイル名を品目コード毎に保持するカタログ"""
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        parser: Optional[Callable[[str], tuple]] = None,
+        min_rescan_interval_s: float = DEFAULT_MIN_RESCAN_INTERVAL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - cache_path (str): カタログの保存先（Noneの場合は保存しない）
+        - parser (Callable): 拡張子を除いたファイル名を(機種名, 基板名, 面)に
+          解析する関数（例: FileManager.parse_image_filename）
+        - min_rescan_interval_s (float): 見つからない場合に読み直す最小間隔（秒）
+        - clock (Callable): 経過時間の計測に使う関数
+        """
+        self.cache_path = str(cache_path) if cache_path else None
+        self.parser = parser
+        self.min_rescan_interval_s = min_rescan_interval_s
+        self.clock = clock
+        self.directory: Optional[str] = None
+        self._mtime_ns: Optional[int] = None
+        # ファイル名 -> 解析結果（解析できない場合はNone）。挿入順は一覧の順
+        self._files: Dict[str, Optional[ImageInfo]] = {}
+        # 品目コード -> ファイル名（一覧の順）
+        self._by_item_code: Dict[str, List[str]] = {}
+        # (機種名, 基板名, 面) -> ファイル名（一覧の順）
+        self._by_info: Dict[ImageInfo, List[str]] = {}
+        # ディレクトリ -> 見つからないために読み直した時刻（clockの値）
+        self._forced_at: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._loaded_cache = False
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def find(self, directory: str, item_code: str) -> Optional[str]:
+        """
+        品目コードから始まる画像のファイル名を返す
+
+        ファイル名の先頭（最初の"_"まで）が品目コードと一致するものを優先し、
+        ない場合は品目コードから始まるファイル名を返す。見つからない場合は
+        更新日時の精度による取りこぼしに備えて一度だけ読み直す（ディレクトリ毎に
+        min_rescan_interval_s に1回まで）。
+
+        ### Args:
+        - directory (str): 画像ディレクトリ
+        - item_code (str): 品目コード
+
+        Returns:
+            Optional[str]: ファイル名（見つからない場合はNone）
+        """
+        if not directory or not item_code:
+            return None
+        with self._lock:
+            rescanned = self.refresh(directory)
+            name = self.__lookup(item_code)
+            if name is None and not rescanned and self.__may_rescan(directory):
+                self.refresh(directory, force=True)
+                name = self.__lookup(item_code)
+            return name
+
+    def __may_rescan(self, directory: str) -> bool:
+        """見つからない場合の読み直しを行うか（間隔内の2回目以降はFalse）"""
+        now = self.clock()
+        forced_at = self._forced_at.get(directory)
+        if forced_at is not None and now - forced_at < self.min_rescan_interval_s:
+            return False
+        self._forced_at[directory] = now
+        return True
+
+    def __lookup(self, item_code: str) -> Optional[str]:
+        """カタログから品目コードの画像を検索"""
+        names = self._by_item_code.get(item_code)
+        if names:
+            return names[0]
+        for name in self._files:
+            if name.startswith(item_code):
+                return name
+        return None
+
+    def find_by_info(
+        self, directory: str, model: str, board: str, side: str
+    ) -> Optional[str]:
+        """機種名・基板名・面から画像のファイル名を返す（見つからない場合はNone）"""
+        with self._lock:
+            self.refresh(directory)
+            names = self._by_info.get((model, board, side))
+            return names[0] if names else None
+
+    def info(self, filename: str) -> Optional[ImageInfo]:
+        """ファイル名の解析結果（機種名, 基板名, 面）を返す"""
+        with self._lock:
+            return self._files.get(filename)
+
+    def refresh(self, directory: str, force: bool = False) -> bool:
+        """
+        ディレクトリの更新日時が変わっていればカタログを読み直す
+
+        ### Args:
+        - directory (str): 画像ディレクトリ
+        - force (bool): 更新日時によらず読み直す
+
+        Returns:
+            bool: 読み直した場合True
+        """
+        with self._lock:
+            if not self._loaded_cache:
+                self._loaded_cache = True
+                self.__load_cache(directory)
+            if directory != self.directory:
+                self.__reset(directory)
+            mtime_ns = os.stat(directory).st_mtime_ns
+            if not force and mtime_ns == self._mtime_ns:
+                return False
+            changed = self.__scan(directory)
+            if changed or mtime_ns != self._mtime_ns:
+                self._mtime_ns = mtime_ns
+                self.__save_cache()
+            return True
+
+    def refresh_async(self, directory: str) -> threading.Thread:
+        """カタログの更新をバックグラウンドで行う（起動時の先読み用）"""
+
+        def _refresh():
+            try:
+                self.refresh(directory)
+            except OSError as e:
+                print(f"画像カタログ更新エラー: {e}")
+
+        thread = threading.Thread(target=_refresh, daemon=True, name="image-catalog")
+        thread.start()
+        return thread
+
+    def __reset(self, directory: str):
+        """別のディレクトリ用にカタログを空にする"""
+        self.directory = directory
+        self._mtime_ns = None
+        self._files = {}
+        self._by_item_code = {}
+        self._by_info = {}
+
+    def __scan(self, directory: str) -> bool:
+        """
+        ディレクトリを一覧し、追加・削除されたファイルのみ反映する
+
+        Returns:
+            bool: ファイル一覧が変わった場合True
+        """
+        previous = self._files
+        files: Dict[str, Optional[ImageInfo]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if not entry.is_file():
+                    continue
+                files[name] = previous[name] if name in previous else self.__parse(name)
+        if files.keys() == previous.keys():
+            return False
+        self.__set_files(files)
+        return True
+
+    def __set_files(self, files: Dict[str, Optional[ImageInfo]]):
+        """ファイル一覧と品目コードの索引を設定"""
+        by_item_code: Dict[str, List[str]] = {}
+        by_info: Dict[ImageInfo, List[str]] = {}
+        for name, info in files.items():
+            by_item_code.setdefault(name.split("_", 1)[0], []).append(name)
+            if info is not None:
+                by_info.setdefault(info, []).append(name)
+        self._files = files
+        self._by_item_code = by_item_code
+        self._by_info = by_info
+
+    def __parse(self, name: str) -> Optional[ImageInfo]:
+        """ファイル名を解析（解析できない場合はNone）"""
+        if self.parser is None:
+            return None
+        try:
+            parts = self.parser(os.path.splitext(name)[0])
+            return (str(parts[0]), str(parts[1]), str(parts[2]))
+        except Exception:
+            return None
+
+    def __load_cache(self, directory: str):
+        """保存したカタログを読み込む（同じディレクトリの場合のみ）"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"画像カタログ読み込みエラー: {e}")
+            return
+        if data.get("version") != CATALOG_VERSION or data.get("directory") != directory:
+            return
+        self.directory = directory
+        self._mtime_ns = data.get("mtime_ns")
+        self.__set_files(
+            {
+                name: tuple(info) if info else None
+                for name, info in data.get("files", [])
+            }
+        )
+
+    def __save_cache(self):
+        """カタログをファイルに保存（一時ファイルに書いてから置き換える）"""
+        if not self.cache_path:
+            return
+        data = {
+            "version": CATALOG_VERSION,
+            "directory": self.directory,
+            "mtime_ns": self._mtime_ns,
+            "files": [[name, info] for name, info in self._files.items()],
+        }
+        temp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"画像カタログ保存エラー: {e}")
@@ -0,0 +1,471 @@
+"""
+不良画像出力モジュール
+
+基板画像に不良座標マーカーと不良情報テキストを描画した画像を
+バックグラウンドのスレッドプールで出力する。デコード済みの基板画像は
+キャッシュし、同じ指図の保存では再デコードしない。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
+
+from .fs_cache import fs_cache
+from .task_executor import QUEUE_EXPORT
+from .write_spool import KIND_DELETE
+
+# PILは起動時間短縮のため使用時にインポートする
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from .task_executor import TaskExecutor
+    from .write_spool import WriteSpool
+
+# 日本語を描画できるフォントの候補（見つからない場合は既定フォント）
+FONT_CANDIDATES = (
+    "meiryo.ttc",
+    "YuGothM.ttc",
+    "msgothic.ttc",
+    "NotoSansCJK-Regular.ttc",
+    "DejaVuSans.ttf",
+)
+
+# 出力形式と拡張子・PILのフォーマット名の対応
+IMAGE_FORMATS = {
+    "png": ("png", "PNG"),
+    "jpeg": ("jpg", "JPEG"),
+    "jpg": ("jpg", "JPEG"),
+    "webp": ("webp", "WEBP"),
+}
+
+
+@dataclass
+class ImageEncodeOptions:
+    """不良画像のエンコード設定"""
+
+    format: str = "png"
+    png_compress_level: int = 1
+    quality: int = 85
+
+    @classmethod
+    def from_config(cls, section) -> "ImageEncodeOptions":
+        """
+        settings.iniの[IMAGE_EXPORT]セクションから設定を作成
+
+        ### Args:
+        - section (configparser.SectionProxy): 設定セクション（Noneの場合は既定値）
+        """
+        options = cls()
+        if section is None:
+            return options
+        image_format = section.get("format", options.format).strip().lower()
+        if image_format in IMAGE_FORMATS:
+            options.format = image_format
+        options.png_compress_level = min(
+            9, max(0, section.getint("png_compress_level", options.png_compress_level))
+        )
+        options.quality = min(100, max(1, section.getint("quality", options.quality)))
+        return options
+
+    @property
+    def pil_format(self) -> str:
+        """PILに渡すフォーマット名（WebP非対応環境ではPNG）"""
+        from PIL import features
+
+        pil_format = IMAGE_FORMATS.get(self.format, IMAGE_FORMATS["png"])[1]
+        if pil_format == "WEBP" and not features.check("webp"):
+            return "PNG"
+        return pil_format
+
+    @property
+    def extension(self) -> str:
+        """出力ファイルの拡張子"""
+        return {"PNG": "png", "JPEG": "jpg", "WEBP": "webp"}[self.pil_format]
+
+    def save_kwargs(self) -> dict:
+        """Image.saveに渡すエンコードパラメータ"""
+        if self.pil_format == "PNG":
+            return {"compress_level": self.png_compress_level}
+        if self.pil_format == "JPEG":
+            return {"quality": self.quality, "optimize": False}
+        return {"quality": self.quality, "method": 0}
+
+    def encode(self, image: "Image.Image", path: str):
+        """画像を設定に従ってエンコードして保存"""
+        image.save(path, format=self.pil_format, **self.save_kwargs())
+
+
+class BaseImageCache:
+    """出力サイズに縮小済みの基板画像を保持するキャッシュ"""
+
+    def __init__(self, max_entries: int = 4):
+        """
+        コンストラクタ
+
+        ### Args:
+        - max_entries (int): 保持する画像の最大数
+        """
+        self.max_entries = max_entries
+        self._images: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image_path: str, max_size: Tuple[int, int]) -> "Image.Image":
+        """
+        縮小済みの基板画像を取得（未キャッシュ・更新時はデコードする）
+
+        返す画像は共有されるため、描画する場合はcopy()すること。
+        """
+        from PIL import Image
+
+        stat = fs_cache.stat(image_path)
+        key = (image_path, stat.st_mtime, stat.st_size, tuple(max_size))
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+
+        with Image.open(image_path) as source:
+            image = source.convert("RGB")
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        with self._lock:
+            # 同じパスの古い版は破棄
+            for old_key in [k for k in self._images if k[0] == image_path]:
+                del self._images[old_key]
+            self._images[key] = image
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return image
+
+    def nbytes(self) -> int:
+        """保持している画像のおおよそのバイト数"""
+        with self._lock:
+            images = list(self._images.values())
+        return sum(
+            image.size[0] * image.size[1] * len(image.getbands()) for image in images
+        )
+
+    def clear(self):
+        """キャッシュを破棄"""
+        with self._lock:
+            self._images.clear()
+
+
+class DefectImageExporter:
+    """マーカー付き不良画像をバックグラウンドで出力するクラス"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        marker_size: int = 20,
+        font_size: int = 12,
+        max_image_size: Tuple[int, int] = (800, 600),
+        text_area_width: int = 160,
+        cache: Optional[BaseImageCache] = None,
+        encode_options: Optional[ImageEncodeOptions] = None,
+        spool: Optional["WriteSpool"] = None,
+        executor: Optional["TaskExecutor"] = None,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - max_workers (int): 出力を並列実行するスレッド数
+        - marker_size (int): マーカーの直径（px）
+        - font_size (int): テキストのフォントサイズ
+        - max_image_size (Tuple[int, int]): 基板画像の最大サイズ
+        - text_area_width (int): 右側のテキスト領域の幅（px）
+        - cache (BaseImageCache): 基板画像キャッシュ
+        - encode_options (ImageEncodeOptions): 出力形式の設定
+        - spool (WriteSpool): 出力・削除を記録するスプール（Noneの場合は直接書き込む）
+        - executor (TaskExecutor): 出力を実行する共通の実行キュー（exportキュー）。
+          Noneの場合は専用のスレッドプール（max_workers）で実行する
+        """
+        self.marker_size = marker_size
+        self.font_size = font_size
+        self.max_image_size = max_image_size
+        self.text_area_width = text_area_width
+        self.cache = cache or BaseImageCache()
+        self.encode_options = encode_options or ImageEncodeOptions()
+        self.spool = spool
+
+        self.executor = executor
+        self._executor = (
+            None
+            if executor is not None
+            else ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="export"
+            )
+        )
+        self._pending: "set[Future]" = set()
+        # 先読み中の基板画像（指図の切り替え時に未開始のものを取り消す）
+        self._prefetches: "set[Future]" = set()
+        self._lock = threading.Lock()
+        self._font = None
+
+    @property
+    def extension(self) -> str:
+        """出力ファイルの拡張子"""
+        return self.encode_options.extension
+
+    def output_path(self, output_dir: str, filename: str) -> str:
+        """出力ファイルのパスを返す"""
+        return os.path.join(output_dir, f"{filename}.{self.extension}")
+
+    def delete(self, output_dir: str, filename: str) -> str:
+        """
+        出力済みの不良画像を削除する（出力形式の変更前の画像も対象）
+
+        Returns:
+            str: 結果メッセージ
+        """
+        extensions = {ext for ext, _ in IMAGE_FORMATS.values()}
+        if self.spool is not None:
+            # 出力と同じ順序でNASに反映する（存在しない場合は何もしない）
+            for ext in sorted(extensions):
+                path = os.path.join(output_dir, f"{filename}.{ext}")
+                self.spool.put(KIND_DELETE, path)
+            return f"画像の削除を登録しました: {filename}"
+        deleted = []
+        for ext in sorted(extensions):
+            path = os.path.join(output_dir, f"{filename}.{ext}")
+            if fs_cache.exists(path):
+                os.remove(path)
+                fs_cache.invalidate(path)
+                deleted.append(path)
+        if not deleted:
+            raise ValueError(f"削除する画像が見つかりません: {filename}")
+        return f"画像を削除しました: {', '.join(deleted)}"
+
+    def prefetch(self, image_path: str) -> Optional[Future]:
+        """基板画像をバックグラウンドでデコードしてキャッシュしておく"""
+        if not image_path:
+            return None
+        future = self.__submit(self.cache.get, image_path, self.max_image_size)
+        with self._lock:
+            self._prefetches.add(future)
+        future.add_done_callback(self.__discard_prefetch)
+        return future
+
+    def cancel_prefetch(self) -> int:
+        """
+        未開始の基板画像の先読みを取り消す（指図の切り替え時）
+
+        Returns:
+            int: 取り消した先読みの数
+        """
+        with self._lock:
+            prefetches = list(self._prefetches)
+        return sum(1 for future in prefetches if future.cancel())
+
+    def __discard_prefetch(self, future: Future):
+        with self._lock:
+            self._prefetches.discard(future)
+
+    def submit(
+        self,
+        defect: Any,
+        image_path: str,
+        output_dir: str,
+        filename: str,
+        on_done: Optional[Callable[[str, Optional[Exception]], None]] = None,
+    ) -> str:
+        """
+        不良画像の出力をキューに登録し、出力予定のパスを即座に返す
+
+        ### Args:
+        - defect (DefectInfo): 不良情報（呼び出し後に変更しないこと）
+        - image_path (str): 基板画像のパス
+        - output_dir (str): 出力ディレクトリ
+        - filename (str): 拡張子なしの出力ファイル名
+        - on_done (Callable): 完了時に (出力パス, 例外 or None) で呼ばれる（ワーカースレッド）
+
+        Returns:
+            str: 出力予定のファイルパス
+        """
+        if not image_path:
+            raise ValueError("基板画像が選択されていません。")
+        path = self.output_path(output_dir, filename)
+
+        def _task():
+            try:
+                self.export(defect, image_path, output_dir, filename)
+            except Exception as e:
+                if on_done:
+                    on_done(path, e)
+                else:
+                    print(f"不良画像出力エラー: {e}")
+                return
+            if on_done:
+                on_done(path, None)
+
+        self.__submit(_task)
+        return path
+
+    def export(self, defect: Any, image_path: str, output_dir: str, filename: str):
+        """不良画像を同期で出力する"""
+        image = self.render(defect, image_path)
+        path = self.output_path(output_dir, filename)
+        if self.spool is not None:
+            # ローカルのスプールに書き込み、NASへの反映はスプールが行う
+            self.spool.put_file(
+                path,
+                lambda local_path: self.encode_options.encode(image, local_path),
+                suffix=f".{self.extension}",
+            )
+            return path
+        # 指図毎の出力フォルダは作成済みなら確認をキャッシュで済ませる
+        fs_cache.makedirs(output_dir)
+        self.encode_options.encode(image, path)
+        fs_cache.invalidate(path)
+        return path
+
+    def render(self, defect: Any, image_path: str) -> "Image.Image":
+        """基板画像にマーカーとテキスト領域を描画した画像を作成"""
+        from PIL import Image, ImageDraw
+
+        base = self.cache.get(image_path, self.max_image_size)
+        width, height = base.size
+
+        canvas = Image.new("RGB", (width + self.text_area_width, height), "white")
+        canvas.paste(base, (0, 0))
+        draw = ImageDraw.Draw(canvas)
+
+        # 不良座標マーカー（相対座標 0.0～1.0）
+        if defect.x is not None and defect.y is not None:
+            cx = float(defect.x) * width
+            cy = float(defect.y) * height
+            r = self.marker_size / 2
+            draw.ellipse((cx - r, cy - r, cx + r, cy + r), outline="red", width=3)
+
+        # 不良情報テキスト
+        font = self.__get_font()
+        lines = [
+            f"指図: {defect.lot_number}",
+            f"基板: {defect.current_board_index}",
+            f"No: {defect.defect_number}",
+            f"RF: {defect.reference}",
+            f"不良: {defect.defect_name}",
+            f"S/N: {defect.serial or ''}",
+            f"AOI: {defect.aoi_user or ''}",
+        ]
+        y = 10
+        for line in lines:
+            draw.text((width + 10, y), line, fill="black", font=font)
+            y += self.font_size + 8
+        draw.line((width, 0, width, height), fill="gray", width=1)
+        return canvas
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        登録済みの出力が全て完了するまで待機する
+
+        Returns:
+            bool: タイムアウトまでに完了したか
+        """
+        with self._lock:
+            pending = list(self._pending)
+        if not pending:
+            return True
+        _, not_done = wait_futures(pending, timeout=timeout)
+        return not not_done
+
+    def after_exports(self, func: Callable, *args) -> Future:
+        """
+        登録済みの出力が全て完了した後に処理を実行する（完了を待たずに戻る）
+
+        出力中の画像の削除・リネームを出力の後にスプールへ記録するために使う。
+        前に登録した処理の後に実行し、最後に完了した出力のスレッドで実行する。
+
+        ### Args:
+        - func (Callable): 実行する処理
+        - *args: 処理に渡す引数
+
+        Returns:
+            Future: 処理の結果
+        """
+        result: Future = Future()
+        with self._lock:
+            pending = [f for f in self._pending if f not in self._prefetches]
+            self._pending.add(result)
+        remaining = {"count": len(pending) + 1}
+
+        def _run(_=None):
+            with self._lock:
+                remaining["count"] -= 1
+                if remaining["count"]:
+                    return
+            if not result.set_running_or_notify_cancel():
+                return
+            try:
+                result.set_result(func(*args))
+            except Exception as e:
+                result.set_exception(e)
+
+        def _done(f):
+            with self._lock:
+                self._pending.discard(f)
+
+        result.add_done_callback(_done)
+        for future in pending:
+            future.add_done_callback(_run)
+        _run()
+        return result
+
+    def pending_count(self) -> int:
+        """未完了の出力数"""
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        スレッドプールを終了する（共通の実行キューの場合は出力の完了を待つのみ）
+
+        ### Args:
+        - wait (bool): 登録済みの出力の完了を待つか
+        - timeout (float): 最大待ち時間（秒、Noneの場合は完了まで待つ）
+
+        Returns:
+            bool: タイムアウトまでに全ての出力が完了したか
+        """
+        completed = self.wait(timeout) if wait else True
+        if self._executor is not None:
+            # 待ち切れなかった出力はスレッドプールで続けて実行する
+            self._executor.shutdown(wait=False)
+        return completed
+
+    def __submit(self, func: Callable, *args) -> Future:
+        """出力をスレッドプールに登録し、未完了の出力として記録する"""
+        if self._executor is None:
+            future = self.executor.submit(QUEUE_EXPORT, func, *args)
+        else:
+            future = self._executor.submit(func, *args)
+        with self._lock:
+            self._pending.add(future)
+
+        def _done(f):
+            with self._lock:
+                self._pending.discard(f)
+
+        future.add_done_callback(_done)
+        return future
+
+    def __get_font(self):
+        """描画用フォントを取得"""
+        from PIL import ImageFont
+
+        if self._font is None:
+            for name in FONT_CANDIDATES:
+                try:
+                    self._font = ImageFont.truetype(name, self.font_size)
+                    break
+                except OSError:
+                    continue
+            else:
+                self._font = ImageFont.load_default()
+        return self._font
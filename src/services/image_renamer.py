@@ -0,0 +1,135 @@
+"""
+不良画像リネームモジュール
+
+不良削除時の番号振り直しで、実際に番号が変わる画像のみを
+一時ファイル名経由の2段階でまとめてリネームする。
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from .fs_cache import fs_cache
+
+
+@dataclass
+class RenameResult:
+    """リネーム結果"""
+
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class DefectImageRenamer:
+    """不良画像の番号振り直しを行うクラス"""
+
+    def __init__(self, max_workers: int = 8):
+        """
+        コンストラクタ
+
+        ### Args:
+        - max_workers (int): リネームを並列実行するスレッド数
+        """
+        self.max_workers = max_workers
+
+    @staticmethod
+    def plan_renumber(defect_list: List[Any]) -> List[Tuple[Any, str, str]]:
+        """
+        基板毎に不良番号を1から振り直し、番号が変わる不良のみを返す
+
+        Returns:
+            List[Tuple[Any, str, str]]: (不良情報, 旧番号, 新番号) のリスト
+        """
+        counters: Dict[Any, int] = {}
+        changes = []
+        for item in defect_list:
+            board_index = item.current_board_index
+            counters[board_index] = counters.get(board_index, 0) + 1
+            new_number = str(counters[board_index])
+            old_number = str(item.defect_number)
+            if old_number != new_number:
+                changes.append((item, old_number, new_number))
+        return changes
+
+    @staticmethod
+    def image_path(
+        data_directory: str, item: Any, defect_number: str, ext: str = "png"
+    ) -> str:
+        """不良画像のファイルパスを生成"""
+        filename = f"{item.lot_number}_{item.current_board_index}_{defect_number}.{ext}"
+        return os.path.join(data_directory, item.lot_number, filename)
+
+    @staticmethod
+    def image_extension(item: Any, default: str = "png") -> str:
+        """出力済み画像パスの拡張子を返す（未設定の場合は既定値）"""
+        ext = os.path.splitext(getattr(item, "image_path", "") or "")[1]
+        return ext.lstrip(".") or default
+
+    def rename_all(self, pairs: List[Tuple[str, str]]) -> RenameResult:
+        """
+        一時ファイル名を経由して複数ファイルを並列にリネームする
+
+        旧名と新名が重なる（2→1, 3→2 等）場合でも上書きしないよう、
+        全ファイルを一時名に退避してから新しい名前に変更する。
+
+        ### Args:
+        - pairs (List[Tuple[str, str]]): (旧パス, 新パス) のリスト
+
+        Returns:
+            RenameResult: リネーム結果
+        """
+        result = RenameResult()
+        if not pairs:
+            return result
+
+        token = uuid.uuid4().hex[:8]
+        staged = [(old, f"{old}.{token}.tmp", new) for old, new in pairs]
+
+        def _stage(entry):
+            old, tmp, _ = entry
+            try:
+                os.rename(old, tmp)
+                return entry, None
+            except FileNotFoundError:
+                return entry, FileNotFoundError(old)
+            except OSError as e:
+                return entry, e
+
+        def _commit(entry):
+            old, tmp, new = entry
+            try:
+                os.replace(tmp, new)
+                return entry, None
+            except OSError as e:
+                # 新しい名前にできない場合は元の名前に戻す
+                try:
+                    os.rename(tmp, old)
+                except OSError:
+                    pass
+                return entry, e
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rename"
+        ) as executor:
+            to_commit = []
+            for entry, error in executor.map(_stage, staged):
+                if error is None:
+                    to_commit.append(entry)
+                elif isinstance(error, FileNotFoundError):
+                    result.missing.append(entry[0])
+                else:
+                    result.errors.append((entry[0], str(error)))
+
+            for entry, error in executor.map(_commit, to_commit):
+                if error is None:
+                    result.renamed.append((entry[0], entry[2]))
+                else:
+                    result.errors.append((entry[0], str(error)))
+
+        for old, new in pairs:
+            fs_cache.invalidate(old)
+            fs_cache.invalidate(new)
+        return result
@@ -0,0 +1,41 @@
+"""
+JSON行ログモジュール
+
+計測結果等を1行1レコードのJSONとしてサイズ上限付きで
+ローテーションするファイルに出力する。
+"""
+
+import json
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+
+
+def get_jsonl_logger(
+    path: str, max_bytes: int = 256 * 1024, backup_count: int = 3
+) -> logging.Logger:
+    """
+    JSON行をそのまま出力するローテーション付きロガーを取得
+
+    ### Args:
+    - path (str): ログファイルのパス
+    - max_bytes (int): ローテーションするファイルサイズ
+    - backup_count (int): 保持する世代数
+    """
+    path = os.path.abspath(path)
+    logger = logging.getLogger(f"jsonl.{path}")
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def write_jsonl(path: str, record: dict, **kwargs):
+    """1レコードをJSON行として出力"""
+    get_jsonl_logger(path, **kwargs).info(json.dumps(record, ensure_ascii=False))
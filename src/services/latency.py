@@ -0,0 +1,204 @@
+"""
+操作レイテンシ計測モジュール
+
+保存・指図切り替え・基板切り替え等の操作やKintone/SQLiteの非同期処理の
+処理時間を、対数間隔のバケットによるヒストグラムとしてメモリ上に集計する。
+集計結果（p50/p95/p99）は一定間隔でJSON行としてローカルファイルに出力する。
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .jsonl_log import write_jsonl
+
+
+def _bucket_bounds(
+    min_ms: float = 1.0, max_ms: float = 120_000.0, growth: float = 1.1
+) -> List[float]:
+    """対数間隔のバケット上限（ms）を作成"""
+    bounds = []
+    bound = min_ms
+    while bound < max_ms:
+        bounds.append(round(bound, 3))
+        bound *= growth
+    bounds.append(max_ms)
+    return bounds
+
+
+# 全ヒストグラムで共有するバケット上限（1ms～120s、10%刻み）
+BUCKET_BOUNDS_MS = _bucket_bounds()
+
+
+class LatencyHistogram:
+    """処理時間のヒストグラム（メモリ使用量は件数によらず一定）"""
+
+    def __init__(self, bounds: List[float] = BUCKET_BOUNDS_MS):
+        """
+        コンストラクタ
+
+        ### Args:
+        - bounds (List[float]): バケット上限（ms、昇順）
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float):
+        """処理時間を追加"""
+        self.counts[bisect.bisect_left(self.bounds, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, p: float) -> float:
+        """
+        パーセンタイル値（ms）を返す
+
+        該当バケットの上限を返すため、実測値より最大10%大きくなる。
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index >= len(self.bounds):
+                    return self.max_ms
+                return min(self.bounds[index], self.max_ms)
+        return self.max_ms
+
+    def count_over(self, threshold_ms: float) -> int:
+        """閾値を超えたおおよその件数（閾値を含むバケットより上の件数）"""
+        index = bisect.bisect_left(self.bounds, threshold_ms)
+        return sum(self.counts[index + 1 :])
+
+    def summary(self, target_ms: Optional[float] = None) -> dict:
+        """集計結果を辞書で返す"""
+        result = {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+        if target_ms is not None:
+            result["over_target"] = self.count_over(target_ms)
+        return result
+
+
+class LatencyRecorder:
+    """操作名毎の処理時間を集計し、定期的にファイルへ出力するクラス"""
+
+    def __init__(self, target_ms: float = 200.0):
+        """
+        コンストラクタ
+
+        ### Args:
+        - target_ms (float): 目標応答時間（超過件数を集計する）
+        """
+        self.target_ms = target_ms
+        self.log_path: Optional[str] = None
+        self._total: Dict[str, LatencyHistogram] = {}
+        self._window: Dict[str, LatencyHistogram] = {}
+        self._window_start = datetime.now()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, name: str, elapsed_ms: float):
+        """処理時間を記録"""
+        with self._lock:
+            for histograms in (self._total, self._window):
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = LatencyHistogram()
+                histogram.add(elapsed_ms)
+
+    @contextmanager
+    def measure(self, name: str):
+        """withブロックの処理時間を記録する（例外時も記録）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def summary(self) -> Dict[str, dict]:
+        """起動からの操作名毎の集計結果"""
+        with self._lock:
+            return {
+                name: histogram.summary(self.target_ms)
+                for name, histogram in sorted(self._total.items())
+            }
+
+    def dump(self, path: Optional[str] = None) -> int:
+        """
+        前回出力以降の集計結果を操作名毎に1行ずつ出力し、区間の集計をリセットする
+
+        Returns:
+            int: 出力した行数
+        """
+        path = path or self.log_path
+        now = datetime.now()
+        with self._lock:
+            window, self._window = self._window, {}
+            window_start, self._window_start = self._window_start, now
+        if not path or not window:
+            return 0
+        for name, histogram in sorted(window.items()):
+            record = {
+                "timestamp": now.isoformat(timespec="seconds"),
+                "since": window_start.isoformat(timespec="seconds"),
+                "name": name,
+                "target_ms": self.target_ms,
+                **histogram.summary(self.target_ms),
+            }
+            write_jsonl(path, record, max_bytes=1024 * 1024)
+        return len(window)
+
+    def start(self, path: str, interval_s: float = 60.0):
+        """
+        集計結果の定期出力を開始する
+
+        ### Args:
+        - path (str): 出力先（JSON行、ローテーションあり）
+        - interval_s (float): 出力間隔（秒）
+        """
+        self.log_path = str(path)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(interval_s):
+                try:
+                    self.dump()
+                except OSError as e:
+                    print(f"レイテンシログの書き込みエラー: {e}")
+
+        self._thread = threading.Thread(target=_loop, daemon=True, name="latency")
+        self._thread.start()
+
+    def stop(self):
+        """定期出力を停止し、残りの集計結果を出力する"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        try:
+            self.dump()
+        except OSError as e:
+            print(f"レイテンシログの書き込みエラー: {e}")
+
+
+# アプリケーション全体で共有するレコーダー
+latency = LatencyRecorder()
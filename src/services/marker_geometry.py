@@ -0,0 +1,176 @@
+"""
+座標マーカーの座標変換モジュール
+
+不良座標（画像に対する相対座標 0.0～1.0）からCanvas座標への変換を
+NumPy配列でまとめて行う。基板毎の全マーカーの描画位置の計算や、
+クリック位置に最も近いマーカーの判定（格子索引）に使用する。
+"""
+
+import math
+import numbers
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+# NumPyは起動時間短縮のため使用時にインポートする
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def relative_to_canvas(
+    xs: "np.ndarray",
+    ys: "np.ndarray",
+    displayed_size: Tuple[int, int],
+    offset: Tuple[int, int],
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    相対座標の配列をCanvas座標の配列に変換
+
+    ### Args:
+    - xs, ys (np.ndarray): 相対座標（0.0～1.0）
+    - displayed_size (Tuple[int, int]): 表示中の画像サイズ（幅, 高さ）
+    - offset (Tuple[int, int]): Canvas内の画像の左上位置
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Canvas座標（x, y）
+    """
+    import numpy as np
+
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    return (
+        xs * displayed_size[0] + offset[0],
+        ys * displayed_size[1] + offset[1],
+    )
+
+
+def board_coordinates(
+    defects: Sequence, board_index: int
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    指定した基板の座標が設定されている不良の位置と相対座標を取得
+
+    ### Args:
+    - defects (Sequence): 不良リスト（DefectStoreまたはDefectInfoのリスト）
+    - board_index (int): 基板番号
+
+    Returns:
+        Tuple: (不良リスト内の位置, 基板内の順番, x, y)
+    """
+    import numpy as np
+
+    boards = np.array([_as_int(d.current_board_index) for d in defects], dtype=np.int64)
+    xs = np.array([_as_float(d.x) for d in defects], dtype=np.float64)
+    ys = np.array([_as_float(d.y) for d in defects], dtype=np.float64)
+
+    on_board = boards == board_index
+    # 基板内の順番（座標のない不良も数える）
+    ranks = np.cumsum(on_board) - 1
+    valid = on_board & ~np.isnan(xs) & ~np.isnan(ys)
+    positions = np.flatnonzero(valid)
+    return positions, ranks[positions], xs[positions], ys[positions]
+
+
+class MarkerGrid:
+    """
+    1枚の基板の不良座標の格子索引
+
+    相対座標の空間を一定の大きさのセルに分け、セル毎に不良の位置を保持する。
+    クリック位置の周囲のセルだけを調べるため、不良数によらず判定が速い。
+    """
+
+    def __init__(self, cell_size: float = 0.02):
+        """
+        コンストラクタ
+
+        ### Args:
+        - cell_size (float): セルの大きさ（相対座標）
+        """
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._xs: List[float] = []
+        self._ys: List[float] = []
+        self._positions: List[int] = []
+
+    @classmethod
+    def build(
+        cls,
+        positions: "np.ndarray",
+        xs: "np.ndarray",
+        ys: "np.ndarray",
+        cell_size: float = 0.02,
+    ) -> "MarkerGrid":
+        """
+        不良の位置と相対座標から索引を作成
+
+        ### Args:
+        - positions (np.ndarray): 不良リスト内の位置
+        - xs, ys (np.ndarray): 相対座標
+        - cell_size (float): セルの大きさ（相対座標）
+        """
+        import numpy as np
+
+        grid = cls(cell_size)
+        grid._positions = np.asarray(positions).tolist()
+        grid._xs = np.asarray(xs, dtype=np.float64).tolist()
+        grid._ys = np.asarray(ys, dtype=np.float64).tolist()
+        cell_xs = np.floor(np.asarray(xs) / cell_size).astype(np.int64).tolist()
+        cell_ys = np.floor(np.asarray(ys) / cell_size).astype(np.int64).tolist()
+        for i, cell in enumerate(zip(cell_xs, cell_ys)):
+            grid._cells.setdefault(cell, []).append(i)
+        return grid
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        radius_x: float,
+        radius_y: float,
+    ) -> Optional[int]:
+        """
+        相対座標の位置から楕円（表示上の円）の範囲内で最も近い不良を返す
+
+        表示中の画像は縦横で縮尺が異なるため、半径は相対座標の
+        x方向・y方向それぞれで指定する。
+
+        ### Args:
+        - x, y (float): クリック位置（相対座標）
+        - radius_x, radius_y (float): 判定する半径（相対座標）
+
+        Returns:
+            Optional[int]: 不良リスト内の位置（該当なしの場合はNone）
+        """
+        if radius_x <= 0 or radius_y <= 0:
+            return None
+        size = self.cell_size
+        best, best_distance = None, 1.0
+        for cell_x in range(
+            math.floor((x - radius_x) / size), math.floor((x + radius_x) / size) + 1
+        ):
+            for cell_y in range(
+                math.floor((y - radius_y) / size),
+                math.floor((y + radius_y) / size) + 1,
+            ):
+                for i in self._cells.get((cell_x, cell_y), ()):
+                    # 半径で正規化した距離（1以下が範囲内）
+                    distance = ((self._xs[i] - x) / radius_x) ** 2 + (
+                        (self._ys[i] - y) / radius_y
+                    ) ** 2
+                    if distance <= best_distance:
+                        best, best_distance = i, distance
+        return None if best is None else self._positions[best]
+
+
+def _as_float(value) -> float:
+    """座標値をfloatに変換（Noneや数値でない場合はNaN）"""
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+def _as_int(value) -> int:
+    """基板番号をintに変換（整数でない場合は-1）"""
+    if isinstance(value, numbers.Integral) and not isinstance(value, bool):
+        return int(value)
+    return -1
@@ -0,0 +1,318 @@
+"""
+メモリ予算モジュール
+
+32bit版は1プロセスあたり約2GBのアドレス空間しか使えないため、
+基板画像・SMTスケジュール・不良リスト等の主要なキャッシュの使用量を
+集計し、予算に近づいた場合は画像の縮小版等の再作成できるものから破棄する。
+プロセス全体の使用量（取得できる環境のみ）も合わせて判定する。
+"""
+
+import ctypes
+import os
+import struct
+import sys
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from PIL import Image
+
+MB = 1024 * 1024
+
+# 32bit版の既定の予算（2GBのアドレス空間からTk・DLL等の分を除く）
+DEFAULT_BUDGET_32BIT_MB = 1400
+
+# 警告表示・破棄開始の閾値（予算に対する割合）
+DEFAULT_WARN_RATIO = 0.8
+
+# 状態
+LEVEL_OK = "ok"
+LEVEL_WARNING = "warning"
+LEVEL_CRITICAL = "critical"
+
+
+def is_32bit() -> bool:
+    """32bitのPythonで実行されているか"""
+    return struct.calcsize("P") * 8 == 32
+
+
+def image_nbytes(image: Optional["Image.Image"]) -> int:
+    """PIL画像のピクセルデータのおおよそのバイト数"""
+    if image is None:
+        return 0
+    width, height = image.size
+    return width * height * max(1, len(image.getbands()))
+
+
+def process_memory_bytes() -> Optional[int]:
+    """
+    プロセスのメモリ使用量（Windowsはコミット済みのプライベートメモリ）
+
+    Returns:
+        Optional[int]: バイト数（取得できない環境ではNone）
+    """
+    try:
+        if sys.platform == "win32":
+            return _windows_private_bytes()
+        with open("/proc/self/statm", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def _windows_private_bytes() -> Optional[int]:
+    """GetProcessMemoryInfoでプライベートメモリ量を取得"""
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS_EX(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+            ("PrivateUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS_EX()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(
+        process, ctypes.byref(counters), counters.cb
+    ):
+        return None
+    return counters.PrivateUsage
+
+
+def compact_dataframe(df: "DataFrame", category_ratio: float = 0.5) -> "DataFrame":
+    """
+    DataFrameの列を省メモリな型に変換する
+
+    - 整数・浮動小数点の列は値が収まる最小の型に変換
+    - 文字列の列は値の種類が少ない場合（行数に対する割合がcategory_ratio未満）にcategory型へ変換
+
+    ### Args:
+    - df (DataFrame): 変換するDataFrame（変更しない）
+    - category_ratio (float): category型に変換する種類数の割合の上限
+
+    Returns:
+        DataFrame: 変換後のDataFrame
+    """
+    import pandas as pd
+
+    result = df.copy()
+    rows = len(result)
+    for column in result.columns:
+        series = result[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            result[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            result[column] = pd.to_numeric(series, downcast="float")
+        elif pd.api.types.is_object_dtype(series) and rows > 0:
+            if series.nunique(dropna=False) < rows * category_ratio:
+                result[column] = series.astype("category")
+    return result
+
+
+def dataframe_nbytes(df: Optional["DataFrame"]) -> int:
+    """DataFrameのメモリ使用量（文字列の中身を含む）"""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def records_nbytes(records: list, sample: int = 20) -> int:
+    """
+    データクラスのリストのおおよそのメモリ使用量
+
+    先頭の数件の属性値の大きさから1件あたりの大きさを推定する。
+    """
+    if not records:
+        return 0
+    sizes = []
+    for record in records[:sample]:
+        size = sys.getsizeof(record)
+        attributes = getattr(record, "__dict__", None)
+        if attributes is not None:
+            size += sys.getsizeof(attributes)
+            size += sum(sys.getsizeof(value) for value in attributes.values())
+        sizes.append(size)
+    return sum(sizes) * len(records) // len(sizes) + sys.getsizeof(records)
+
+
+class _Consumer:
+    """予算の対象となるキャッシュ"""
+
+    def __init__(
+        self,
+        name: str,
+        sizer: Callable[[], int],
+        evict: Optional[Callable[[], None]],
+        priority: int,
+    ):
+        self.name = name
+        self.sizer = sizer
+        self.evict = evict
+        self.priority = priority
+
+
+class MemoryBudget:
+    """主要なキャッシュのメモリ使用量を集計し、予算を超えないよう破棄するクラス"""
+
+    def __init__(
+        self,
+        budget_mb: Optional[float] = None,
+        warn_ratio: float = DEFAULT_WARN_RATIO,
+        process_probe: Callable[[], Optional[int]] = process_memory_bytes,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - budget_mb (float): 予算（MB、0以下は無制限、Noneは32bit版のみ既定値）
+        - warn_ratio (float): 警告表示・破棄を開始する予算に対する割合
+        - process_probe (Callable): プロセス全体の使用量（バイト）を返す関数
+        """
+        if budget_mb is None:
+            budget_mb = DEFAULT_BUDGET_32BIT_MB if is_32bit() else 0
+        self.budget_bytes = int(budget_mb * MB) if budget_mb > 0 else 0
+        self.warn_ratio = warn_ratio
+        self.process_probe = process_probe
+        self.level = LEVEL_OK
+        self.last_used_bytes = 0
+        self._consumers: List[_Consumer] = []
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, section) -> "MemoryBudget":
+        """
+        settings.iniの[MEMORY]セクションから作成
+
+        budget_mb が auto または未設定の場合は32bit版のみ既定の予算を設定する。
+
+        ### Args:
+        - section (configparser.SectionProxy): 設定セクション（Noneの場合は既定値）
+        """
+        if section is None:
+            return cls()
+        value = section.get("budget_mb", "auto").strip().lower()
+        try:
+            budget_mb = None if value in ("", "auto") else float(value)
+        except ValueError:
+            budget_mb = None
+        warn_ratio = min(
+            0.99, max(0.1, section.getfloat("warn_ratio", DEFAULT_WARN_RATIO))
+        )
+        return cls(budget_mb, warn_ratio)
+
+    @property
+    def enabled(self) -> bool:
+        """予算が設定されているか"""
+        return self.budget_bytes > 0
+
+    @property
+    def budget_mb(self) -> float:
+        """予算（MB）"""
+        return self.budget_bytes / MB
+
+    def register(
+        self,
+        name: str,
+        sizer: Callable[[], int],
+        evict: Optional[Callable[[], None]] = None,
+        priority: int = 100,
+    ):
+        """
+        予算の対象となるキャッシュを登録
+
+        ### Args:
+        - name (str): 表示名
+        - sizer (Callable[[], int]): 現在の使用量（バイト）を返す関数
+        - evict (Callable[[], None]): 破棄する関数（破棄できない場合はNone）
+        - priority (int): 破棄の優先度（小さいものから破棄する）
+        """
+        with self._lock:
+            self._consumers.append(_Consumer(name, sizer, evict, priority))
+            self._consumers.sort(key=lambda c: c.priority)
+
+    def add_listener(self, listener: Callable[[str, int], None]):
+        """状態が変わった際に呼ばれる関数を登録（引数は状態と使用量）"""
+        self._listeners.append(listener)
+
+    def usage(self) -> Dict[str, int]:
+        """キャッシュ毎の使用量（バイト）"""
+        with self._lock:
+            consumers = list(self._consumers)
+        result = {}
+        for consumer in consumers:
+            try:
+                result[consumer.name] = int(consumer.sizer())
+            except Exception:
+                result[consumer.name] = 0
+        return result
+
+    def used_bytes(self) -> int:
+        """
+        判定に使う使用量（集計した使用量とプロセス全体の大きい方）
+        """
+        accounted = sum(self.usage().values())
+        process = self.process_probe() if self.process_probe else None
+        return max(accounted, process or 0)
+
+    def check(self) -> str:
+        """
+        使用量を判定し、警告の閾値を超えている場合は優先度順に破棄する
+
+        Returns:
+            str: 破棄後の状態（ok / warning / critical）
+        """
+        if not self.enabled:
+            return LEVEL_OK
+        used = self.used_bytes()
+        if used >= self.budget_bytes * self.warn_ratio:
+            used = self._evict_until(self.budget_bytes * self.warn_ratio)
+        self.last_used_bytes = used
+        level = self._level_of(used)
+        if level != self.level:
+            self.level = level
+            for listener in list(self._listeners):
+                listener(level, used)
+        return level
+
+    def _evict_until(self, target_bytes: float) -> int:
+        """使用量が目標を下回るまで破棄可能なキャッシュを破棄する"""
+        with self._lock:
+            consumers = [c for c in self._consumers if c.evict is not None]
+        used = self.used_bytes()
+        for consumer in consumers:
+            if used < target_bytes:
+                break
+            try:
+                consumer.evict()
+            except Exception as e:
+                print(f"キャッシュ破棄エラー({consumer.name}): {e}")
+            used = self.used_bytes()
+        return used
+
+    def _level_of(self, used: int) -> str:
+        """使用量に対する状態"""
+        if used >= self.budget_bytes:
+            return LEVEL_CRITICAL
+        if used >= self.budget_bytes * self.warn_ratio:
+            return LEVEL_WARNING
+        return LEVEL_OK
+
+    def report(self) -> str:
+        """使用量の内訳（ステータス表示・ログ用）"""
+        parts = [f"{name} {size / MB:.0f}MB" for name, size in self.usage().items()]
+        return ", ".join(parts)
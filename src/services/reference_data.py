@@ -0,0 +1,109 @@
+"""
+参照データモジュール
+
+defect_mapping.csv（不良名マッピング）とuser.csv（ユーザー一覧）を
+一度だけ辞書に読み込み、ファイルの更新日時が変わった場合のみ再読み込みする。
+"""
+
+import csv
+import os
+import threading
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class MtimeCachedFile(Generic[T]):
+    """更新日時とサイズが変わるまで読み込み結果を保持するキャッシュ"""
+
+    def __init__(self, path: str, loader: Callable[[str], T]):
+        """
+        コンストラクタ
+
+        ### Args:
+        - path (str): ファイルパス
+        - loader (Callable): ファイルを読み込んで結果を返す関数
+        """
+        self.path = str(path)
+        self.loader = loader
+        self._signature: Optional[Tuple[float, int]] = None
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """読み込み結果を取得（ファイルが更新されていれば再読み込み）"""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"{os.path.basename(self.path)} not found at {self.path}"
+            )
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            if signature != self._signature:
+                self._value = self.loader(self.path)
+                self._signature = signature
+            return self._value
+
+    def invalidate(self):
+        """キャッシュを破棄し、次回取得時に再読み込みさせる"""
+        with self._lock:
+            self._signature = None
+            self._value = None
+
+
+def load_defect_mapping(path: str) -> Dict[int, str]:
+    """defect_mapping.csvを {不良番号: 不良名} の辞書に読み込む"""
+    mapping: Dict[int, str] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            no = (row.get("no") or "").strip()
+            name = (row.get("name") or "").strip()
+            if not no or not name:
+                continue
+            try:
+                mapping[int(float(no))] = name
+            except ValueError:
+                continue
+    return mapping
+
+
+def load_users(path: str) -> Dict[str, str]:
+    """user.csvを {ユーザーID: 氏名} の辞書に読み込む"""
+    users: Dict[str, str] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            user_id = (row.get("id") or "").strip()
+            if user_id:
+                users[user_id] = (row.get("name") or "").strip()
+    return users
+
+
+class ReferenceData:
+    """不良名マッピングとユーザー一覧の参照用レジストリ"""
+
+    def __init__(self, defect_mapping_path: str, user_csv_path: str):
+        """
+        コンストラクタ
+
+        ### Args:
+        - defect_mapping_path (str): defect_mapping.csvのパス
+        - user_csv_path (str): user.csvのパス
+        """
+        self._defect_mapping = MtimeCachedFile(defect_mapping_path, load_defect_mapping)
+        self._users = MtimeCachedFile(user_csv_path, load_users)
+
+    def defect_mapping(self) -> Dict[int, str]:
+        """{不良番号: 不良名} の辞書を取得"""
+        return self._defect_mapping.get()
+
+    def defect_name(self, defect_number: int) -> Optional[str]:
+        """不良番号に対応する不良名を取得（存在しない場合はNone）"""
+        return self._defect_mapping.get().get(defect_number)
+
+    def user_name(self, user_id: str) -> Optional[str]:
+        """ユーザーIDに対応する氏名を取得（存在しない場合はNone）"""
+        return self._users.get().get(user_id)
+
+    def has_user(self, user_id: str) -> bool:
+        """ユーザーIDが存在するか確認"""
+        return user_id in self._users.get()
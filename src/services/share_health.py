@@ -0,0 +1,272 @@
+"""
+NAS接続状態の監視モジュール
+
+画像・データ・計画表・共有DBの各ディレクトリをバックグラウンドで定期的に
+確認し、応答時間から正常／遅延／切断の状態を判定する。判定結果は保持して
+おき、UIや各処理はネットワークに触れずに参照できる。確認はディレクトリ毎の
+デーモンスレッドで行い、SMBのタイムアウトで応答がない場合も他の確認や
+アプリケーションの終了を妨げない。
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# 状態
+STATE_UNKNOWN = "unknown"
+STATE_HEALTHY = "healthy"
+STATE_DEGRADED = "degraded"
+STATE_DOWN = "down"
+
+# 全体の状態を決める際の重み（大きいほど悪い）
+_SEVERITY = {STATE_UNKNOWN: 0, STATE_HEALTHY: 1, STATE_DEGRADED: 2, STATE_DOWN: 3}
+
+DEFAULT_INTERVAL_S = 15.0
+DEFAULT_DEGRADED_MS = 500.0
+DEFAULT_TIMEOUT_S = 5.0
+
+
+@dataclass
+class ShareStatus:
+    """1つのディレクトリの確認結果"""
+
+    name: str
+    path: str
+    state: str = STATE_UNKNOWN
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    error: str = ""
+
+
+def probe_directory(path: str):
+    """ディレクトリの存在を確認する（存在しない・接続できない場合はOSError）"""
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"ディレクトリが見つかりません: {path}")
+
+
+class ShareHealthMonitor:
+    """共有ディレクトリの接続状態を定期的に確認する"""
+
+    def __init__(
+        self,
+        targets: Optional[Dict[str, str]] = None,
+        interval_s: float = DEFAULT_INTERVAL_S,
+        degraded_ms: float = DEFAULT_DEGRADED_MS,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        prober: Callable[[str], None] = probe_directory,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - targets (Dict[str, str]): {名前: ディレクトリ}（空のパスは対象外）
+        - interval_s (float): 確認の間隔（秒）
+        - degraded_ms (float): この応答時間（ms）を超えたら遅延とする
+        - timeout_s (float): この時間（秒）応答がなければ切断とする
+        - prober (Callable): ディレクトリを確認する関数（失敗時は例外）
+        """
+        self.interval_s = interval_s
+        self.degraded_ms = degraded_ms
+        self.timeout_s = timeout_s
+        self.prober = prober
+        self._statuses: Dict[str, ShareStatus] = {}
+        # 応答待ちの確認（名前 -> スレッド）
+        self._pending: Dict[str, threading.Thread] = {}
+        self._listeners: List[Callable[[str, Dict[str, ShareStatus]], None]] = []
+        self._state = STATE_UNKNOWN
+        # 直近に通知した各ディレクトリの状態
+        self._published: tuple = ()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.set_targets(targets or {})
+
+    @classmethod
+    def from_config(
+        cls, section, targets: Optional[Dict[str, str]] = None
+    ) -> "ShareHealthMonitor":
+        """
+        settings.iniの[NETWORK]セクションから作成
+
+        ### Args:
+        - section (configparser.SectionProxy): 設定セクション（Noneの場合は既定値）
+        - targets (Dict[str, str]): {名前: ディレクトリ}
+        """
+        if section is None:
+            return cls(targets)
+        return cls(
+            targets,
+            interval_s=max(
+                1.0, section.getfloat("probe_interval_s", DEFAULT_INTERVAL_S)
+            ),
+            degraded_ms=section.getfloat("degraded_ms", DEFAULT_DEGRADED_MS),
+            timeout_s=max(0.5, section.getfloat("probe_timeout_s", DEFAULT_TIMEOUT_S)),
+        )
+
+    def set_targets(self, targets: Dict[str, str]):
+        """確認するディレクトリを設定（パスが変わったものは状態を初期化）"""
+        with self._lock:
+            statuses = {}
+            for name, path in targets.items():
+                if not path:
+                    continue
+                current = self._statuses.get(name)
+                if current is not None and current.path == path:
+                    statuses[name] = current
+                else:
+                    statuses[name] = ShareStatus(name, path)
+            self._statuses = statuses
+        self.__publish()
+
+    def add_listener(self, listener: Callable[[str, Dict[str, ShareStatus]], None]):
+        """
+        いずれかのディレクトリの状態が変わったときに呼ばれる関数を登録
+
+        関数は監視スレッドから呼ばれるため、UIの更新はafterで行うこと。
+
+        ### Args:
+        - listener (Callable): (全体の状態, {名前: ShareStatus}) を受け取る関数
+        """
+        self._listeners.append(listener)
+
+    @property
+    def state(self) -> str:
+        """全体の状態（最も悪いディレクトリの状態）"""
+        return self._state
+
+    def statuses(self) -> Dict[str, ShareStatus]:
+        """各ディレクトリの確認結果（コピー）"""
+        with self._lock:
+            return {
+                name: ShareStatus(**vars(status))
+                for name, status in self._statuses.items()
+            }
+
+    def status(self, name: str) -> Optional[ShareStatus]:
+        """指定したディレクトリの確認結果（対象外の場合はNone）"""
+        with self._lock:
+            status = self._statuses.get(name)
+            return ShareStatus(**vars(status)) if status else None
+
+    def is_down(self, name: str) -> bool:
+        """
+        指定したディレクトリが切断と判定されているか（ネットワークには触れない）
+
+        未確認・対象外の場合はFalseを返し、呼び出し側の通常の処理に任せる。
+        """
+        with self._lock:
+            status = self._statuses.get(name)
+            return status is not None and status.state == STATE_DOWN
+
+    def start(self):
+        """定期確認を開始"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.__run, daemon=True, name="share-health"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """定期確認を停止（応答待ちの確認は待たない）"""
+        self._stop.set()
+
+    def check_now(self) -> str:
+        """
+        全てのディレクトリを確認し、結果を反映する（監視スレッドから呼ばれる）
+
+        Returns:
+            str: 全体の状態
+        """
+        with self._lock:
+            targets = [
+                (name, status.path)
+                for name, status in self._statuses.items()
+                if name not in self._pending
+            ]
+        threads = [self.__probe_async(name, path) for name, path in targets]
+        deadline = time.monotonic() + self.timeout_s
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        # 時間内に応答がなかったものは切断とする
+        now = time.time()
+        with self._lock:
+            for name, thread in self._pending.items():
+                status = self._statuses.get(name)
+                if status is not None and thread.is_alive():
+                    status.state = STATE_DOWN
+                    status.latency_ms = None
+                    status.checked_at = now
+                    status.error = f"{self.timeout_s:.0f}秒以内に応答がありません"
+        return self.__publish()
+
+    def __run(self):
+        """監視スレッドの処理"""
+        while not self._stop.is_set():
+            try:
+                self.check_now()
+            except Exception as e:
+                print(f"NAS接続確認エラー: {e}")
+            self._stop.wait(self.interval_s)
+
+    def __probe_async(self, name: str, path: str) -> threading.Thread:
+        """1つのディレクトリの確認をデーモンスレッドで開始"""
+
+        def _probe():
+            start = time.perf_counter()
+            error = ""
+            try:
+                self.prober(path)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            latency_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._pending.pop(name, None)
+                status = self._statuses.get(name)
+                # 確認中に対象が変更された場合は反映しない
+                if status is None or status.path != path:
+                    return
+                status.checked_at = time.time()
+                status.latency_ms = latency_ms
+                status.error = error
+                if error:
+                    status.state = STATE_DOWN
+                elif latency_ms > self.degraded_ms:
+                    status.state = STATE_DEGRADED
+                else:
+                    status.state = STATE_HEALTHY
+
+        thread = threading.Thread(
+            target=_probe, daemon=True, name=f"share-health-{name}"
+        )
+        with self._lock:
+            self._pending[name] = thread
+        thread.start()
+        return thread
+
+    def __publish(self) -> str:
+        """全体の状態を更新し、いずれかの状態が変わった場合はリスナーに通知"""
+        with self._lock:
+            state = max(
+                (status.state for status in self._statuses.values()),
+                key=_SEVERITY.get,
+                default=STATE_UNKNOWN,
+            )
+            published = tuple(
+                (name, status.state) for name, status in self._statuses.items()
+            )
+            changed = published != self._published
+            self._state = state
+            self._published = published
+        if changed:
+            statuses = self.statuses()
+            for listener in list(self._listeners):
+                try:
+                    listener(state, statuses)
+                except Exception as e:
+                    print(f"NAS接続状態の通知エラー: {e}")
+        return state
@@ -0,0 +1,165 @@
+"""
+共有データベースの読み取り専用クエリモジュール
+
+共有ディレクトリの aoi_data.db をファイルごとローカルにコピーせず、
+読み取り専用（mode=ro）で直接開いて指図の不良情報だけを取得する。
+SQLiteはページ単位で読み込むため、ネットワークを通るのは索引と対象の
+指図のページのみとなる。接続は開いたまま再利用し、ページキャッシュを
+大きめに取ることで同じ指図の再読み込みや索引の読み込みを減らす。
+
+他の端末がマージで書き込むファイルには immutable=1 を使わない（変更が
+検出されず壊れたページを読む可能性がある）。読み取りトランザクション毎に
+SQLiteがファイルの変更を確認し、変更があった場合のみキャッシュを破棄する。
+書き込みの終わった過去のパーティションは immutable=1 で開き、ロックと
+変更確認を省いてキャッシュしたページをそのまま使う。
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import fields
+from typing import Any, List, Optional
+from urllib.parse import quote
+
+# ページキャッシュの既定サイズ（KiB）
+DEFAULT_CACHE_KIB = 16 * 1024
+# ロック中の共有DBを待つ時間（秒）
+DEFAULT_TIMEOUT_S = 5.0
+
+
+def sqlite_readonly_uri(path: str, immutable: bool = False) -> str:
+    """
+    読み取り専用で開くためのSQLiteのURIを作成
+
+    Windowsのドライブ（C:/...）・UNCパス（//server/share/...）にも対応する。
+
+    ### Args:
+    - path (str): データベースファイルのパス
+    - immutable (bool): 変更されないファイルとして開くか（ロック・変更確認を省く）
+
+    Returns:
+        str: file: 形式のURI
+    """
+    normalized = os.path.abspath(str(path)).replace("\\", "/")
+    if not normalized.startswith("/"):
+        # ドライブレターは file:///C:/... とする
+        normalized = "/" + normalized
+    # UNCパスは file:////server/share/... となる
+    uri = f"file://{quote(normalized, safe='/:')}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+
+class SharedDbReader:
+    """共有データベースを読み取り専用で開き、指図の不良情報を取得する"""
+
+    def __init__(
+        self,
+        db_path: str,
+        record_type: type,
+        table: Optional[str] = None,
+        cache_kib: int = DEFAULT_CACHE_KIB,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        immutable: bool = False,
+    ):
+        """
+        コンストラクタ（接続は最初のクエリで開く）
+
+        ### Args:
+        - db_path (str): 共有データベースのパス
+        - record_type (type): 行を変換するデータクラス（DefectInfo等）
+        - table (str): テーブル名（Noneの場合はlot_numberとidの列を持つテーブルを探す）
+        - cache_kib (int): ページキャッシュのサイズ（KiB）
+        - timeout_s (float): ロック中の共有DBを待つ時間（秒）
+        - immutable (bool): 書き込みの終わったファイルとして開くか
+        """
+        self.db_path = str(db_path)
+        self.record_type = record_type
+        self.table = table
+        self.cache_kib = cache_kib
+        self.timeout_s = timeout_s
+        self.immutable = immutable
+        self._fields = [f.name for f in fields(record_type)]
+        self._columns: List[str] = []
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get_by_lot(self, lot_number: str) -> List[Any]:
+        """
+        指図の不良情報を取得
+
+        失敗した場合は接続を閉じて例外を送出する（次回のクエリで開き直す）。
+
+        ### Args:
+        - lot_number (str): 指図
+
+        Returns:
+            List[Any]: record_typeのリスト
+        """
+        with self._lock:
+            try:
+                conn = self.__connect()
+                columns = ", ".join(f'"{c}"' for c in self._columns)
+                cursor = conn.execute(
+                    f'SELECT {columns} FROM "{self.table}" WHERE lot_number = ?',
+                    (lot_number,),
+                )
+                rows = cursor.fetchall()
+            except sqlite3.Error:
+                self.__close()
+                raise
+        return [self.record_type(**dict(zip(self._columns, row))) for row in rows]
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self.__close()
+
+    def __connect(self) -> sqlite3.Connection:
+        """読み取り専用で接続し、対象のテーブルと列を確定する"""
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(
+            sqlite_readonly_uri(self.db_path, self.immutable),
+            uri=True,
+            timeout=self.timeout_s,
+            check_same_thread=False,
+        )
+        try:
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute(f"PRAGMA cache_size = -{int(self.cache_kib)}")
+            table = self.table or self.__find_table(conn)
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            self._columns = [name for name in self._fields if name in columns]
+            if "lot_number" not in self._columns:
+                raise sqlite3.OperationalError(
+                    f"指図の列がありません: {table}({', '.join(columns)})"
+                )
+        except Exception:
+            conn.close()
+            raise
+        self.table = table
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def __find_table(conn: sqlite3.Connection) -> str:
+        """lot_numberとidの列を持つテーブルを探す"""
+        names = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+            )
+        ]
+        for name in names:
+            columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')}
+            if {"lot_number", "id"} <= columns:
+                return name
+        raise sqlite3.OperationalError("不良情報のテーブルが見つかりません")
+
+    def __close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
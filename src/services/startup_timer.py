@@ -0,0 +1,254 @@
+"""
+起動時間計測モジュール
+
+プロセス開始から操作可能になるまでの各段階（インポート、設定読み込み、
+UI作成、初回描画、DB準備、Kintone接続確認、SMTスケジュール読み込み）の
+経過時間を記録し、バージョン付きのJSON行としてローテーションログに出力する。
+起動直後にインポートされるため、標準ライブラリのみを使用する。
+
+バージョン間の比較:
+    python main.py --startup-report
+"""
+
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .jsonl_log import write_jsonl
+
+# 起動完了とみなす段階（全て記録された時点でログを出力する）
+STARTUP_PHASES = (
+    "imports",
+    "settings_read",
+    "ui_built",
+    "first_paint",
+    "db_ready",
+    "kintone_ready",
+    "schedule_ready",
+)
+
+
+class StartupTimer:
+    """起動の各段階の経過時間を記録するクラス"""
+
+    def __init__(self, expected: Iterable[str] = STARTUP_PHASES):
+        """
+        コンストラクタ
+
+        ### Args:
+        - expected (Iterable[str]): 起動完了とみなす段階名
+        """
+        self.origin = time.perf_counter()
+        self.expected = tuple(expected)
+        self.marks: Dict[str, float] = {}
+        self.durations: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.log_path: Optional[str] = None
+        self.version = "unknown"
+        self._listeners: List[Callable[[str, float], None]] = []
+        self._reported = False
+        self._lock = threading.Lock()
+
+    def configure(self, log_path: str, version: str = "unknown"):
+        """
+        ログの出力先とアプリケーションのバージョンを設定する
+
+        ### Args:
+        - log_path (str): ローテーションログのパス
+        - version (str): アプリケーションのバージョン
+        """
+        self.log_path = str(log_path)
+        self.version = version
+        self.__write_if_complete()
+
+    def add_listener(self, listener: Callable[[str, float], None]):
+        """段階が記録されるたびに (段階名, 経過秒数) で呼ばれる関数を登録する"""
+        self._listeners.append(listener)
+
+    def mark(self, name: str) -> float:
+        """
+        段階の完了を記録する（同じ段階の2回目以降は無視）
+
+        ### Args:
+        - name (str): 段階名
+
+        Returns:
+            float: 起動からの経過秒数
+        """
+        elapsed = time.perf_counter() - self.origin
+        with self._lock:
+            if name in self.marks:
+                return self.marks[name]
+            self.marks[name] = elapsed
+        for listener in list(self._listeners):
+            try:
+                listener(name, elapsed)
+            except Exception as e:
+                print(f"起動時間リスナーエラー: {e}")
+        self.__write_if_complete()
+        return elapsed
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        処理時間を計測し、終了時に段階の完了として記録する
+
+        例外が発生した場合もエラーとして記録し、例外はそのまま送出する。
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.errors.setdefault(name, str(e))
+            raise
+        finally:
+            with self._lock:
+                self.durations.setdefault(name, time.perf_counter() - start)
+            self.mark(name)
+
+    def elapsed(self, name: str) -> Optional[float]:
+        """段階の起動からの経過秒数（未記録の場合はNone）"""
+        with self._lock:
+            return self.marks.get(name)
+
+    def record(self) -> dict:
+        """ログに出力する内容を作成"""
+        with self._lock:
+            marks = dict(sorted(self.marks.items(), key=lambda item: item[1]))
+            durations = dict(self.durations)
+            errors = dict(self.errors)
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "version": self.version,
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "total": round(max(marks.values(), default=0.0), 3),
+            "marks": {name: round(value, 3) for name, value in marks.items()},
+            "durations": {name: round(value, 3) for name, value in durations.items()},
+            "missing": [name for name in self.expected if name not in marks],
+            "errors": errors,
+        }
+
+    def report(self) -> str:
+        """段階毎の経過時間と前段階からの差分を整形したレポートを返す"""
+        return format_record(self.record())
+
+    def write_report(self, path: Optional[str] = None) -> bool:
+        """
+        記録済みの段階をローテーションログに出力する（1プロセスにつき1回のみ）
+
+        未完了の段階は "missing" として出力される。
+
+        Returns:
+            bool: 出力したか
+        """
+        path = path or self.log_path
+        if not path:
+            return False
+        with self._lock:
+            if self._reported:
+                return False
+            self._reported = True
+        record = self.record()
+        print(format_record(record))
+        try:
+            write_jsonl(path, record)
+        except OSError as e:
+            print(f"起動時間ログの書き込みエラー: {e}")
+        return True
+
+    def __write_if_complete(self):
+        """全ての段階が記録されていればログを出力する"""
+        with self._lock:
+            complete = all(name in self.marks for name in self.expected)
+        if complete and self.log_path:
+            self.write_report()
+
+
+def format_record(record: dict) -> str:
+    """ログの1レコードを人が読める形式に整形"""
+    lines = [f"起動時間レポート {record['timestamp']} (v{record['version']})"]
+    previous = 0.0
+    for name, elapsed in record["marks"].items():
+        line = f"  {name:<16} {elapsed:8.3f}s (+{elapsed - previous:.3f}s)"
+        if name in record.get("durations", {}):
+            line += f" 処理 {record['durations'][name]:.3f}s"
+        if name in record.get("errors", {}):
+            line += f" エラー: {record['errors'][name]}"
+        lines.append(line)
+        previous = elapsed
+    if record.get("missing"):
+        lines.append(f"  未完了: {', '.join(record['missing'])}")
+    return "\n".join(lines)
+
+
+def read_records(path: str) -> List[dict]:
+    """ローテーション済みのファイルを含めてログのレコードを古い順に読み込む"""
+    paths = [f"{path}.{i}" for i in range(9, 0, -1)] + [path]
+    records = []
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def compare_versions(
+    records: Iterable[dict], phases: Iterable[str] = STARTUP_PHASES
+) -> Dict[str, Tuple[int, Dict[str, float]]]:
+    """
+    バージョン毎に各段階の経過時間の中央値を集計する
+
+    Returns:
+        Dict[str, Tuple[int, Dict[str, float]]]: {バージョン: (起動回数, {段階名: 中央値})}
+    """
+    by_version: Dict[str, List[dict]] = {}
+    for record in records:
+        by_version.setdefault(record.get("version", "unknown"), []).append(record)
+
+    result = {}
+    for version, version_records in by_version.items():
+        medians = {}
+        for name in list(phases) + ["total"]:
+            values = [
+                r["total"] if name == "total" else r["marks"][name]
+                for r in version_records
+                if name == "total" or name in r.get("marks", {})
+            ]
+            if values:
+                medians[name] = statistics.median(values)
+        result[version] = (len(version_records), medians)
+    return result
+
+
+def print_comparison(log_path: str):
+    """ログをバージョン毎に集計して表示する"""
+    print(format_comparison(compare_versions(read_records(log_path))))
+
+
+def format_comparison(comparison: Dict[str, Tuple[int, Dict[str, float]]]) -> str:
+    """バージョン比較結果を表形式に整形"""
+    columns = list(STARTUP_PHASES) + ["total"]
+    header = f"{'version':<12}{'runs':>5}" + "".join(f"{c:>15}" for c in columns)
+    lines = [header]
+    for version, (count, medians) in comparison.items():
+        cells = "".join(
+            f"{medians[c]:>14.3f}s" if c in medians else f"{'-':>15}" for c in columns
+        )
+        lines.append(f"{version:<12}{count:>5}{cells}")
+    return "\n".join(lines)
+
+
+# プロセス全体で共有する起動タイマー（最初のインポート時点を起点とする）
+startup_timer = StartupTimer()
@@ -0,0 +1,245 @@
+"""
+バックグラウンド処理の実行モジュール
+
+Kintone送信・SQLite書き込み・スケジュール読み込み等の処理毎にスレッドを
+作成する代わりに、名前付きのキュー毎に同時実行数を制限したワーカーで実行する。
+同じキーを指定した処理は登録順に1つずつ実行し（キーが異なれば並列に実行）、
+未開始の処理は取り消せる。キュー毎の待ち・実行中の件数を監視用に返す。
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+# キュー（UIの応答に関わる読み込み・接続確認）
+QUEUE_IO = "io"
+# キュー（ローカルのSQLite）
+QUEUE_DB = "db"
+# キュー（Kintone API）
+QUEUE_KINTONE = "kintone"
+# キュー（不良画像の出力）
+QUEUE_EXPORT = "export"
+
+# キュー毎の同時実行数
+DEFAULT_QUEUES = {QUEUE_IO: 2, QUEUE_DB: 1, QUEUE_KINTONE: 2, QUEUE_EXPORT: 2}
+
+
+@dataclass
+class _Task:
+    """キューに登録された処理"""
+
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+    key: Optional[Hashable]
+    name: str
+    future: Future = field(default_factory=Future)
+
+
+class _Queue:
+    """1つのキューの状態（TaskExecutorのロック内で操作する）"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.tasks: Deque[_Task] = deque()
+        # 実行中の処理とそのキー
+        self.active: List[_Task] = []
+        self.busy_keys: set = set()
+        self.workers: List[threading.Thread] = []
+
+    def next_task(self) -> Optional[_Task]:
+        """実行できる最初の処理を取り出す（同じキーの処理が実行中のものは飛ばす）"""
+        for task in self.tasks:
+            if task.key is None or task.key not in self.busy_keys:
+                self.tasks.remove(task)
+                return task
+        return None
+
+
+class TaskExecutor:
+    """名前付きのキュー毎に同時実行数を制限してバックグラウンド処理を実行する"""
+
+    def __init__(self, queues: Optional[Dict[str, int]] = None):
+        """
+        コンストラクタ
+
+        ### Args:
+        - queues (Dict[str, int]): {キュー名: 同時実行数}（Noneの場合は既定のキュー）
+        """
+        self._queues: Dict[str, _Queue] = {
+            name: _Queue(name, workers)
+            for name, workers in (queues or DEFAULT_QUEUES).items()
+        }
+        self._lock = threading.Condition()
+        self._shutdown = False
+
+    def submit(
+        self,
+        queue: str,
+        func: Callable[..., Any],
+        *args,
+        key: Optional[Hashable] = None,
+        name: str = "",
+        **kwargs,
+    ) -> Future:
+        """
+        処理をキューに登録
+
+        ### Args:
+        - queue (str): キュー名
+        - func (Callable): 実行する関数
+        - key (Hashable): 順序を保つキー（同じキーの処理は登録順に1つずつ実行）
+        - name (str): 処理名（ログ用）
+
+        Returns:
+            Future: 処理の結果（未開始であればcancel()で取り消せる）
+        """
+        task = _Task(func, args, kwargs, key, name or getattr(func, "__name__", ""))
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("TaskExecutorは終了しています")
+            state = self._queues.get(queue)
+            if state is None:
+                raise KeyError(f"キューがありません: {queue}")
+            state.tasks.append(task)
+            if len(state.workers) < state.max_workers and len(state.tasks) > (
+                len(state.workers) - len(state.active)
+            ):
+                self.__start_worker(state)
+            self._lock.notify_all()
+        return task.future
+
+    def pending(self, queue: Optional[str] = None) -> int:
+        """
+        待ち・実行中の処理数
+
+        ### Args:
+        - queue (str): キュー名（Noneの場合は全てのキューの合計）
+        """
+        with self._lock:
+            states = (
+                [self._queues[queue]] if queue is not None else self._queues.values()
+            )
+            return sum(len(state.tasks) + len(state.active) for state in states)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """キュー毎の待ち（queued）・実行中（running）の件数（監視用）"""
+        with self._lock:
+            return {
+                name: {"queued": len(state.tasks), "running": len(state.active)}
+                for name, state in self._queues.items()
+            }
+
+    def cancel(
+        self, queue: Optional[str] = None, key: Optional[Hashable] = None
+    ) -> int:
+        """
+        未開始の処理を取り消す（実行中の処理は取り消さない）
+
+        ### Args:
+        - queue (str): キュー名（Noneの場合は全てのキュー）
+        - key (Hashable): キー（Noneの場合はキューの全ての処理）
+
+        Returns:
+            int: 取り消した処理数
+        """
+        cancelled = []
+        with self._lock:
+            for name, state in self._queues.items():
+                if queue is not None and name != queue:
+                    continue
+                for task in list(state.tasks):
+                    if key is None or task.key == key:
+                        state.tasks.remove(task)
+                        cancelled.append(task)
+            self._lock.notify_all()
+        for task in cancelled:
+            task.future.cancel()
+        return len(cancelled)
+
+    def wait(self, queue: Optional[str] = None, timeout: float = 10.0) -> bool:
+        """
+        それまでに登録した処理が全て完了するまで待機する
+
+        ### Args:
+        - queue (str): キュー名（Noneの場合は全てのキュー）
+        - timeout (float): 最大待ち時間（秒）
+
+        Returns:
+            bool: タイムアウトまでに完了したか
+        """
+        with self._lock:
+            names = [queue] if queue is not None else list(self._queues)
+            futures = [
+                task.future
+                for name in names
+                for task in (*self._queues[name].tasks, *self._queues[name].active)
+            ]
+        if not futures:
+            return True
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return not not_done
+
+    def shutdown(self, wait: bool = True, timeout: float = 10.0) -> bool:
+        """
+        新しい処理の登録を止め、登録済みの処理の完了を待ってワーカーを終了する
+
+        ### Args:
+        - wait (bool): 登録済みの処理の完了を待つか（Falseの場合は未開始の処理を取り消す）
+        - timeout (float): 最大待ち時間（秒）
+
+        Returns:
+            bool: タイムアウトまでに全ての処理が完了したか
+        """
+        if wait:
+            completed = self.wait(timeout=timeout)
+        else:
+            self.cancel()
+            completed = True
+        with self._lock:
+            self._shutdown = True
+            self._lock.notify_all()
+        return completed
+
+    def __start_worker(self, state: _Queue):
+        """キューのワーカーを追加（ロック内で呼ぶ）"""
+        thread = threading.Thread(
+            target=self.__worker,
+            args=(state,),
+            daemon=True,
+            name=f"{state.name}-{len(state.workers) + 1}",
+        )
+        state.workers.append(thread)
+        thread.start()
+
+    def __worker(self, state: _Queue):
+        """キューの処理を順番に実行する"""
+        while True:
+            with self._lock:
+                task = state.next_task()
+                while task is None:
+                    if self._shutdown:
+                        state.workers.remove(threading.current_thread())
+                        return
+                    self._lock.wait()
+                    task = state.next_task()
+                if task.key is not None:
+                    state.busy_keys.add(task.key)
+                state.active.append(task)
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        task.future.set_result(task.func(*task.args, **task.kwargs))
+                    except BaseException as e:
+                        task.future.set_exception(e)
+                        print(f"バックグラウンド処理エラー（{task.name}）: {e}")
+            finally:
+                with self._lock:
+                    state.active.remove(task)
+                    if task.key is not None:
+                        state.busy_keys.discard(task.key)
+                    self._lock.notify_all()
@@ -0,0 +1,106 @@
+"""
+UI更新の一括反映モジュール
+
+ワーカースレッドからのUI更新（ステータスバー等）を、更新毎にTkのafterを
+登録する代わりにスレッドセーフなキューに積み、Tkスレッドの定期処理
+（既定30ms毎）でまとめて反映する。同じキー（ウィジェット）への更新は
+最新の値のみを反映し、バースト時にTkのイベントキューが溢れないようにする。
+ワーカースレッドからはTkを一切呼ばない。
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+DEFAULT_INTERVAL_MS = 30
+
+
+class UiDispatcher:
+    """ワーカースレッドからのUI更新をまとめてTkスレッドで反映する"""
+
+    def __init__(self, widget, interval_ms: int = DEFAULT_INTERVAL_MS):
+        """
+        コンストラクタ
+
+        ### Args:
+        - widget (tk.Misc): 定期処理（after）を登録するウィジェット
+        - interval_ms (int): 反映の間隔（ms）
+        """
+        self.widget = widget
+        self.interval_ms = interval_ms
+        # 反映待ちの更新（キー -> (関数, 引数)）。キーなしの更新は連番のキー
+        self._pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._after_id = None
+        # 同じキーの更新で上書きされた件数
+        self.coalesced = 0
+
+    def post(self, key: Optional[Hashable], func: Callable[..., Any], *args):
+        """
+        UI更新を登録（どのスレッドからも呼べる）
+
+        ### Args:
+        - key (Hashable): 更新先を表すキー（同じキーの未反映の更新は置き換える）。
+          Noneの場合は置き換えずに全て反映する（ダイアログ表示等）
+        - func (Callable): Tkスレッドで呼ぶ関数
+        """
+        with self._lock:
+            if key is None:
+                key = ("once", next(self._sequence))
+            elif key in self._pending:
+                # 最新の値を最後に反映する
+                del self._pending[key]
+                self.coalesced += 1
+            self._pending[key] = (func, args)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def start(self):
+        """定期処理を開始（Tkスレッドから呼ぶ）"""
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self.__tick)
+
+    def stop(self):
+        """定期処理を停止（Tkスレッドから呼ぶ。反映待ちの更新は破棄する）"""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        with self._lock:
+            self._pending.clear()
+
+    def drain(self) -> int:
+        """
+        反映待ちの更新を登録順に反映する（Tkスレッドから呼ぶ）
+
+        Returns:
+            int: 反映した更新数
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, OrderedDict()
+        for func, args in pending.values():
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"UI更新エラー: {e}")
+        return len(pending)
+
+    def __tick(self):
+        """定期処理（反映後に次回を登録）"""
+        self._after_id = None
+        try:
+            self.drain()
+        finally:
+            try:
+                self._after_id = self.widget.after(self.interval_ms, self.__tick)
+            except Exception:
+                # ウィンドウが破棄された場合は終了
+                self._after_id = None
@@ -0,0 +1,400 @@
+"""
+ローカルスプールモジュール
+
+NAS（データディレクトリ・共有DB）への書き込みを一旦ローカルのスプール
+ディレクトリに記録し、専用スレッドが記録順にNASへ反映する。NASに接続
+できない間は記録だけを行い、接続が回復したら順番に再送する。記録は
+ファイルとして残るため、アプリケーションを終了しても次回起動時に再送する。
+
+反映処理のOSError（接続断・ロック等の一時的な失敗）は間隔を延ばしながら
+反映できるまで再試行し、それ以外の例外（内容の不整合等）の記録のみを
+failedディレクトリに移す。
+
+各記録は連番のJSONファイル（種類・反映先・引数）と、必要な場合はその
+内容のファイルで構成する。種類毎の反映処理は register() で登録する。
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .fs_cache import fs_cache
+
+# 内容のファイルをそのまま反映先にコピーする記録の種類
+KIND_FILE = "file"
+# 反映先のファイルを削除する記録の種類
+KIND_DELETE = "delete"
+
+DEFAULT_RETRY_INTERVAL_S = 5.0
+# 一時的な失敗が続いた場合の再試行間隔の上限（秒）
+DEFAULT_MAX_RETRY_INTERVAL_S = 300.0
+
+# 記録の反映処理（記録の辞書を受け取り、一時的な失敗時はOSError）
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class WriteSpool:
+    """NASへの書き込みをローカルに記録し、記録順に反映する"""
+
+    def __init__(
+        self,
+        spool_dir: str,
+        is_available: Optional[Callable[[str], bool]] = None,
+        retry_interval_s: float = DEFAULT_RETRY_INTERVAL_S,
+        max_retry_interval_s: float = DEFAULT_MAX_RETRY_INTERVAL_S,
+    ):
+        """
+        コンストラクタ
+
+        ### Args:
+        - spool_dir (str): スプールディレクトリ（ローカル）
+        - is_available (Callable): 反映先のパスに接続できるか返す関数
+          （ネットワークに触れずに判定できること。Noneの場合は常に反映を試みる）
+        - retry_interval_s (float): 反映に失敗した場合の再試行間隔（秒）
+        - max_retry_interval_s (float): 失敗が続いた場合の再試行間隔の上限（秒）
+        """
+        self.spool_dir = str(spool_dir)
+        self.failed_dir = os.path.join(self.spool_dir, "failed")
+        self.is_available = is_available or (lambda target: True)
+        self.retry_interval_s = retry_interval_s
+        self.max_retry_interval_s = max_retry_interval_s
+        self._handlers: Dict[str, Handler] = {
+            KIND_FILE: self.__replay_file,
+            KIND_DELETE: self.__replay_delete,
+        }
+        self._listeners: List[Callable[[int], None]] = []
+        # 未反映の記録（連番順）
+        self._entries: List[Dict[str, Any]] = []
+        # 内容を書き込み中の記録の連番（これより後の記録は反映を待つ）
+        self._reserved: set = set()
+        self._seq = 0
+        # failedディレクトリに移した記録数
+        self._failed = 0
+        self._lock = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.__load()
+
+    def register(self, kind: str, handler: Handler):
+        """
+        記録の種類毎の反映処理を登録
+
+        ### Args:
+        - kind (str): 記録の種類
+        - handler (Callable): 記録の辞書（kind, target, args, payload）を受け取る関数。
+          NASに接続できない等の一時的な失敗の場合はOSErrorを送出する（再試行する）。
+          それ以外の例外の記録はfailedディレクトリに移す
+        """
+        self._handlers[kind] = handler
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """未反映の記録数が変わったときに呼ばれる関数を登録（各スレッドから呼ばれる）"""
+        self._listeners.append(listener)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def pending(self, kind: Optional[str] = None) -> int:
+        """未反映の記録数（種類を指定した場合はその種類のみ）"""
+        with self._lock:
+            if kind is None:
+                return len(self._entries)
+            return sum(1 for entry in self._entries if entry["kind"] == kind)
+
+    def failed(self) -> int:
+        """反映できずにfailedディレクトリに移した記録数"""
+        with self._lock:
+            return self._failed
+
+    def latest(self, kind: str, target: str) -> Optional[Dict[str, Any]]:
+        """
+        指定した種類・反映先の最新の未反映の記録（ローカルの状態のみ参照する）
+
+        Returns:
+            Optional[Dict[str, Any]]: 記録（ない場合はNone）
+        """
+        target = str(target)
+        with self._lock:
+            for entry in reversed(self._entries):
+                if entry["kind"] == kind and entry["target"] == target:
+                    return entry
+        return None
+
+    def put(
+        self, kind: str, target: str, args: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        書き込みを記録する
+
+        ### Args:
+        - kind (str): 記録の種類（register()で登録したもの）
+        - target (str): 反映先のパス（接続確認に使用）
+        - args (Dict[str, Any]): 反映処理に渡す引数（JSONに変換できること）
+
+        Returns:
+            Dict[str, Any]: 記録
+        """
+        return self.__commit(kind, target, args or {}, None)
+
+    def put_file(
+        self, target: str, write: Callable[[str], None], suffix: str = ""
+    ) -> Dict[str, Any]:
+        """
+        ファイルの書き込みを記録する（内容はスプールに書き、反映時にコピーする）
+
+        ### Args:
+        - target (str): 反映先のファイルパス
+        - write (Callable): 渡されたローカルのパスに内容を書き込む関数
+        - suffix (str): 内容のファイルの拡張子
+
+        Returns:
+            Dict[str, Any]: 記録
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._reserved.add(seq)
+        payload = f"{seq:010d}.payload{suffix}"
+        payload_path = os.path.join(self.spool_dir, payload)
+        try:
+            write(payload_path)
+        except Exception:
+            with self._lock:
+                self._reserved.discard(seq)
+            if os.path.exists(payload_path):
+                os.remove(payload_path)
+            raise
+        return self.__commit(KIND_FILE, target, {}, payload, seq)
+
+    def start(self):
+        """反映スレッドを開始"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.__run, daemon=True, name="write-spool"
+        )
+        self._thread.start()
+
+    def kick(self):
+        """反映を直ちに試みる（接続状態が回復したとき等。再試行の待ちも解除する）"""
+        with self._lock:
+            for entry in self._entries:
+                entry.pop("retry_at", None)
+        self._wake.set()
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """
+        未反映の記録が全て反映されるまで待機する
+
+        Returns:
+            bool: タイムアウトまでに全て反映されたか
+        """
+        deadline = time.monotonic() + timeout
+        self.kick()
+        with self._lock:
+            while self._entries:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+            return True
+
+    def stop(self):
+        """反映スレッドを停止（未反映の記録は次回起動時に反映する）"""
+        self._stop.set()
+        self._wake.set()
+
+    def replay(self) -> int:
+        """
+        接続できる間、未反映の記録を順番に反映する（反映スレッドから呼ばれる）
+
+        先頭の記録を反映できない場合は、順序を保つため以降の記録も反映しない。
+        一時的な失敗（OSError）は再試行間隔を倍に延ばしながら（上限あり）
+        再試行し、それ以外の例外の記録はfailedディレクトリに移して後続を反映する。
+
+        Returns:
+            int: 反映した記録数
+        """
+        replayed = 0
+        while not self._stop.is_set():
+            with self._lock:
+                if not self._entries:
+                    break
+                entry = self._entries[0]
+                if self._reserved and min(self._reserved) < entry["seq"]:
+                    break
+                if entry.get("retry_at", 0) > time.time():
+                    break
+            if not self.is_available(entry["target"]):
+                break
+            handler = self._handlers.get(entry["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"反映処理が登録されていません: {entry['kind']}")
+                handler(entry)
+            except OSError as e:
+                entry["attempts"] = entry.get("attempts", 0) + 1
+                print(f"スプール反映エラー（{entry['attempts']}回目）: {e}")
+                delay = min(
+                    self.retry_interval_s * 2 ** (entry["attempts"] - 1),
+                    self.max_retry_interval_s,
+                )
+                entry["retry_at"] = time.time() + delay
+                self.__write_meta(entry)
+                break
+            except Exception as e:
+                print(f"スプール反映エラー（破棄）: {e}")
+                self.__discard(entry, failed=True)
+                continue
+            self.__discard(entry)
+            replayed += 1
+        return replayed
+
+    def __run(self):
+        """反映スレッドの処理"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.replay()
+            except Exception as e:
+                print(f"スプール反映エラー: {e}")
+            self._wake.wait(self.retry_interval_s)
+
+    def __commit(
+        self,
+        kind: str,
+        target: str,
+        args: Dict[str, Any],
+        payload: Optional[str],
+        seq: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """記録をファイルに書き込み、未反映の一覧に加える"""
+        with self._lock:
+            if seq is None:
+                self._seq += 1
+                seq = self._seq
+            entry = {
+                "seq": seq,
+                "kind": kind,
+                "target": str(target),
+                "args": args,
+                "payload": payload,
+                "created": time.time(),
+            }
+            self.__write_meta(entry)
+            self._reserved.discard(seq)
+            self._entries.append(entry)
+            # put_fileは内容の書き込み中に後の連番が記録されることがある
+            self._entries.sort(key=lambda e: e["seq"])
+            count = len(self._entries)
+        self.__notify(count)
+        self._wake.set()
+        return entry
+
+    def __write_meta(self, entry: Dict[str, Any]):
+        """記録をJSONファイルに書き込む（一時ファイルに書いてから置き換える）"""
+        path = self.__meta_path(entry["seq"])
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
+
+    def __discard(self, entry: Dict[str, Any], failed: bool = False):
+        """反映済み（または諦めた）記録を一覧とスプールから取り除く"""
+        files = [self.__meta_path(entry["seq"])]
+        if entry.get("payload"):
+            files.append(os.path.join(self.spool_dir, entry["payload"]))
+        for path in files:
+            try:
+                if failed:
+                    os.makedirs(self.failed_dir, exist_ok=True)
+                    os.replace(
+                        path, os.path.join(self.failed_dir, os.path.basename(path))
+                    )
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if entry in self._entries:
+                self._entries.remove(entry)
+            if failed:
+                self._failed += 1
+            count = len(self._entries)
+            self._lock.notify_all()
+        self.__notify(count)
+
+    def __load(self):
+        """
+        前回までの未反映の記録を読み込む
+
+        記録のない内容のファイルと、書き込み途中で終了した一時ファイルは削除する。
+        """
+        entries = []
+        payloads = set()
+        leftovers = []
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            if name.endswith(".json.tmp"):
+                leftovers.append(name)
+            elif name.endswith(".json"):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        entries.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    print(f"スプール読み込みエラー: {name}: {e}")
+            elif ".payload" in name:
+                payloads.add(name)
+        entries.sort(key=lambda e: e["seq"])
+        referenced = {entry.get("payload") for entry in entries}
+        for name in leftovers + sorted(payloads - referenced):
+            try:
+                os.remove(os.path.join(self.spool_dir, name))
+            except OSError:
+                pass
+        self._entries = entries
+        if os.path.isdir(self.failed_dir):
+            self._failed = sum(
+                1 for name in os.listdir(self.failed_dir) if name.endswith(".json")
+            )
+        self._seq = max(
+            [entry["seq"] for entry in entries]
+            + [int(name.split(".", 1)[0]) for name in payloads if name[:1].isdigit()]
+            + [0]
+        )
+
+    def __meta_path(self, seq: int) -> str:
+        return os.path.join(self.spool_dir, f"{seq:010d}.json")
+
+    def __notify(self, count: int):
+        for listener in list(self._listeners):
+            try:
+                listener(count)
+            except Exception as e:
+                print(f"スプール通知エラー: {e}")
+
+    def __replay_file(self, entry: Dict[str, Any]):
+        """内容のファイルを反映先にコピーする（一時ファイルを経由して置き換える）"""
+        source = os.path.join(self.spool_dir, entry["payload"])
+        target = entry["target"]
+        fs_cache.makedirs(os.path.dirname(target))
+        temp_path = f"{target}.spool.tmp"
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+        fs_cache.invalidate(target)
+
+    @staticmethod
+    def __replay_delete(entry: Dict[str, Any]):
+        """反映先のファイルを削除する（存在しない場合は何もしない）"""
+        try:
+            os.remove(entry["target"])
+        except FileNotFoundError:
+            pass
+        fs_cache.invalidate(entry["target"])
@@ -1,8 +1,6 @@
 import tkinter as tk
 from pathlib import Path
 
-from aoi_data_manager import FileManager
-
 
 class KintoneSettings(tk.Toplevel):
     """キントーン設定ウィンドウ"""
@@ -86,6 +84,8 @@ class KintoneSettings(tk.Toplevel):
     def on_ok(self):
         """OKボタンがクリックされたときの処理"""
         # 入力された設定を取得
+        from aoi_data_manager import FileManager
+
         api_token = self.api_token_entry.get()
         subdomain = self.subdomain_entry.get()
         app_id = self.app_id_entry.get()
@@ -122,6 +122,8 @@ class KintoneSettings(tk.Toplevel):
 
     def init_input_fields(self):
         """既存の設定を読み込み、入力フィールドに初期値を設定"""
+        from aoi_data_manager import FileManager
+
         project_root = Path(__file__).resolve().parent.parent.parent
         config_path = project_root / "kintone_settings.ini"
         config = FileManager.load_kintone_settings_file(config_path)
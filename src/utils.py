@@ -68,6 +68,45 @@ def get_config_file_path(filename):
         return project_dir / filename
 
 
+_app_version = None
+
+
+def get_app_version():
+    """
+    アプリケーションのバージョンを取得する
+
+    pyproject.toml（実行ファイルでは埋め込まれたもの）の[project].versionを返す
+
+    Returns:
+        str: バージョン（取得できない場合は "unknown"）
+    """
+    global _app_version
+    if _app_version is None:
+        try:
+            import tomllib
+
+            with open(get_config_file_path("pyproject.toml"), "rb") as f:
+                _app_version = str(tomllib.load(f)["project"]["version"])
+        except (OSError, KeyError, ValueError):
+            _app_version = "unknown"
+    return _app_version
+
+
+def parse_image_filename(name):
+    """
+    画像ファイル名を解析する（画像カタログ用）
+
+    Args:
+        name (str): 拡張子を除いた画像ファイル名
+
+    Returns:
+        tuple: (機種名, 基板名, 面)
+    """
+    from aoi_data_manager import FileManager
+
+    return FileManager.parse_image_filename(name)
+
+
 class Utils:
     @staticmethod
     def create_repaird_csv_path(data_directory: str, current_lot_number: str) -> str:
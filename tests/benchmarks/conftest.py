@@ -0,0 +1,158 @@
+"""
+アプリケーションのホットパス・ベンチマーク用の設定
+
+ベンチマークは時間がかかるため、環境変数 AOI_BENCH=1 の場合のみ実行します。
+各ベンチマークの中央値を baseline.json の同じPython実行環境の値と比較し、
+許容倍率（既定1.5倍、AOI_BENCH_TOLERANCE）を超えた場合は失敗とします。
+ベースラインが未登録のベンチマークは警告とし、AOI_BENCH_STRICT=1 の場合は
+失敗とします。AOI_BENCH_UPDATE=1 の場合は実行結果で baseline.json を更新します。
+
+実行方法:
+    AOI_BENCH=1 uv run pytest tests/benchmarks -v
+    AOI_BENCH=1 AOI_BENCH_UPDATE=1 uv run pytest tests/benchmarks
+    AOI_BENCH=1 AOI_BENCH_STRICT=1 uv run pytest tests/benchmarks
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import struct
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils import get_app_version
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# baseline.jsonの形式のバージョン（形式を変えた場合は上げる）
+BASELINE_SCHEMA = 1
+
+
+def environment_key() -> str:
+    """ベースラインを区別する実行環境（例: CPython-3.11-64bit）"""
+    bits = struct.calcsize("P") * 8
+    version = ".".join(platform.python_version_tuple()[:2])
+    return f"{platform.python_implementation()}-{version}-{bits}bit"
+
+
+def load_baseline() -> dict:
+    """baseline.jsonを読み込む（形式が異なる場合は空のベースライン）"""
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("schema") == BASELINE_SCHEMA:
+            return data
+    return {"schema": BASELINE_SCHEMA, "environments": {}}
+
+
+class BenchmarkSession:
+    """セッション中のベンチマーク結果を集計し、ベースラインと比較するクラス"""
+
+    def __init__(self):
+        self.baseline = load_baseline()
+        self.environment = environment_key()
+        self.tolerance = float(os.environ.get("AOI_BENCH_TOLERANCE", "1.5"))
+        self.update = os.environ.get("AOI_BENCH_UPDATE") == "1"
+        self.strict = os.environ.get("AOI_BENCH_STRICT") == "1"
+        self.results = {}
+
+    def expected_ms(self, name: str):
+        """ベースラインの中央値（未登録の場合はNone）"""
+        env = self.baseline["environments"].get(self.environment, {})
+        entry = env.get("benchmarks", {}).get(name)
+        return entry["median_ms"] if entry else None
+
+    def save(self):
+        """実行結果でベースラインを更新する"""
+        env = self.baseline["environments"].setdefault(
+            self.environment, {"benchmarks": {}}
+        )
+        env["app_version"] = get_app_version()
+        env["updated"] = time.strftime("%Y-%m-%d")
+        env["benchmarks"].update(self.results)
+        env["benchmarks"] = dict(sorted(env["benchmarks"].items()))
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(self.baseline, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("AOI_BENCH") == "1":
+        return
+    skip = pytest.mark.skip(reason="ベンチマークは AOI_BENCH=1 の場合のみ実行")
+    benchmark_dir = Path(__file__).parent
+    for item in items:
+        if benchmark_dir in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def bench_session():
+    session = BenchmarkSession()
+    yield session
+    if session.update and session.results:
+        session.save()
+
+
+@pytest.fixture
+def bench(request, bench_session):
+    """
+    pytest-benchmark風の計測フィクスチャ
+
+    bench(func, *args, rounds=5, setup=None) で func を rounds 回実行し、
+    中央値をベースラインと比較する。setup は各回の前に計測外で呼ばれ、
+    戻り値（タプル）が func の引数になる。
+    """
+    name = request.node.name
+
+    def run(func, *args, rounds: int = 5, setup=None, warmup: int = 1):
+        timings = []
+        result = None
+        for i in range(warmup + rounds):
+            call_args = setup() if setup else args
+            gc.collect()
+            start = time.perf_counter()
+            result = func(*call_args)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            if i >= warmup:
+                timings.append(elapsed)
+
+        median = statistics.median(timings)
+        run.last_median_ms = median
+        bench_session.results[name] = {
+            "median_ms": round(median, 3),
+            "min_ms": round(min(timings), 3),
+            "rounds": rounds,
+        }
+        print(f"\n{name}: median {median:.3f}ms (min {min(timings):.3f}ms)")
+
+        if bench_session.update:
+            return result
+        expected = bench_session.expected_ms(name)
+        if expected is None:
+            message = (
+                f"{name}: {bench_session.environment} のベースラインがありません"
+                "（AOI_BENCH_UPDATE=1 で登録してください）"
+            )
+            if bench_session.strict:
+                pytest.fail(message)
+            warnings.warn(message)
+        else:
+            # 数ms以下の計測はばらつきが大きいため絶対値の余裕も持たせる
+            limit = max(expected * bench_session.tolerance, expected + 2.0)
+            if median > limit:
+                pytest.fail(
+                    f"{name}: {median:.3f}ms がベースライン {expected:.3f}ms の"
+                    f" {bench_session.tolerance}倍を超えました"
+                )
+        return result
+
+    return run
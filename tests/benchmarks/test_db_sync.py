@@ -0,0 +1,70 @@
+"""
+共有データベース同期の転送量・処理時間のベンチマーク
+
+合成した不良データのSQLiteファイルについて、従来の生ファイルのコピー
+（shutil.copy）と、圧縮スナップショット（lzma / zlib）の取得・展開の
+処理時間と転送バイト数を比較します。SMBの帯域は再現しないため、
+転送量の比はネットワーク上での短縮の目安として出力します。
+"""
+
+import shutil
+import sqlite3
+from dataclasses import astuple, fields
+
+import pytest
+
+from src.services import DbSnapshotCache
+from tests.support.synthetic import SCENARIOS, DefectInfo, make_defects
+
+# 1ファイルに含める指図数（月毎のパーティション相当）
+LOTS_PER_PARTITION = 10
+
+
+@pytest.fixture(scope="module", params=["small", "typical"])
+def partition_db(request, tmp_path_factory):
+    """指図10件分の不良情報を持つパーティション相当のSQLiteファイル"""
+    shared = tmp_path_factory.mktemp("shared")
+    path = shared / "aoi_data_202501.db"
+    columns = [f.name for f in fields(DefectInfo)]
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE defect_info ({', '.join(columns)}, PRIMARY KEY (id))")
+    conn.execute("CREATE INDEX idx_defect_info_lot ON defect_info (lot_number)")
+    for seed in range(LOTS_PER_PARTITION):
+        defects = make_defects(*SCENARIOS[request.param], seed=seed)
+        conn.executemany(
+            f"INSERT INTO defect_info VALUES ({', '.join('?' * len(columns))})",
+            [astuple(d) for d in defects],
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_db_sync_raw_copy(bench, tmp_path, partition_db):
+    """従来の生ファイルのコピー"""
+    target = tmp_path / "local"
+    target.mkdir()
+    bench(shutil.copy, str(partition_db), str(target), rounds=5)
+    size = partition_db.stat().st_size
+    print(f"  転送 {size / 1024:.0f}KiB / {bench.last_median_ms:.1f}ms")
+
+
+@pytest.mark.parametrize("codec", ["lzma", "zlib"])
+def test_db_sync_snapshot_fetch(bench, tmp_path, partition_db, codec):
+    """圧縮スナップショットの取得・展開（作成は1回のみのため計測外）"""
+    DbSnapshotCache(tmp_path / "publisher", codec).publish(str(partition_db))
+    caches = []
+
+    def fresh_cache():
+        cache = DbSnapshotCache(tmp_path / f"station{len(caches)}", codec)
+        caches.append(cache)
+        return (str(partition_db),)
+
+    bench(lambda path: caches[-1].fetch(path), setup=fresh_cache, rounds=5)
+    raw = partition_db.stat().st_size
+    transferred = caches[-1].bytes_transferred
+    print(
+        f"  転送 {transferred / 1024:.0f}KiB（元 {raw / 1024:.0f}KiB の"
+        f" {transferred / raw:.1%}） / {bench.last_median_ms:.1f}ms"
+    )
+    assert 0 < transferred < raw
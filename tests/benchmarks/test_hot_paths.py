@@ -0,0 +1,218 @@
+"""
+アプリケーションのホットパス・ベンチマーク
+
+実際のアプリケーションコード（AOIViewのメソッド、サービス、aoi_data_manager）を
+合成した指図データで計測します。Tkが必要なものは画面のない環境では、
+aoi_data_managerが必要なものは未インストールの環境ではスキップします。
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from types import SimpleNamespace
+
+import pytest
+
+from src.aoi_view import AOIView
+from src.services import CsvJournal, DefectImageExporter, DefectStore, MemoryBudget
+from src.services.marker_geometry import board_coordinates, relative_to_canvas
+from tests.support.synthetic import (
+    SCENARIOS,
+    DefectInfo,
+    RepairdInfo,
+    make_board_image,
+    make_defects,
+    make_repairds,
+    make_schedule_df,
+)
+
+SCENARIO_IDS = list(SCENARIOS)
+
+
+@pytest.fixture(scope="module")
+def board_image(tmp_path_factory):
+    """AOIの基板画像相当（2448×2048 JPEG）"""
+    path = tmp_path_factory.mktemp("images") / "Y8470722R_20_CN-SNDDJ0CJ_411CA_S面.jpg"
+    return make_board_image(str(path))
+
+
+@pytest.fixture(scope="module")
+def headless_view():
+    """画面を表示せずにAOIViewの描画系メソッドを呼び出すためのビュー"""
+
+    class HeadlessAOIView(AOIView):
+        def __init__(self):
+            tk.Tk.__init__(self)
+            self.withdraw()
+            self.fillColor = "red"
+            self.defect_list = []
+            self.current_board_index = 1
+            self.original_image_size = None
+            self.displayed_image_size = None
+            self.image_offset = None
+            self.current_image_path = None
+            self.photo_image = None
+            self.memory_budget = MemoryBudget(0)
+            self.canvas = tk.Canvas(self, width=800, height=400)
+            self.canvas.pack()
+            self.no_value = tk.Label(self)
+            self.defect_listbox = ttk.Treeview(
+                self, columns=("No", "RF", "不良項目"), show="headings"
+            )
+
+    try:
+        view = HeadlessAOIView()
+    except tk.TclError as e:
+        pytest.skip(f"Tkを初期化できません: {e}")
+    yield view
+    view.destroy()
+
+
+def sample_defect():
+    """画像出力用の不良1件"""
+    return DefectInfo(
+        current_board_index=1,
+        defect_number="1",
+        reference="R101",
+        defect_name="ショート",
+        x=0.5,
+        y=0.5,
+        lot_number="1234567-10",
+    )
+
+
+def busiest_board(defects):
+    """不良数が最も多い基板番号"""
+    counts = {}
+    for defect in defects:
+        counts[defect.current_board_index] = (
+            counts.get(defect.current_board_index, 0) + 1
+        )
+    return max(counts, key=counts.get) if counts else 1
+
+
+class TestViewHotPaths:
+    """AOIViewの描画系ホットパス"""
+
+    def test_open_select_image(self, bench, headless_view, board_image):
+        bench(headless_view.open_select_image, board_image, rounds=5)
+        assert headless_view.displayed_image_size is not None
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_redraw_coordinate_markers(
+        self, bench, headless_view, board_image, scenario
+    ):
+        headless_view.open_select_image(board_image)
+        headless_view.defect_list = make_defects(*SCENARIOS[scenario])
+        headless_view.current_board_index = busiest_board(headless_view.defect_list)
+        bench(headless_view.redraw_coordinate_markers, rounds=10)
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_update_defect_listbox(self, bench, headless_view, scenario):
+        headless_view.defect_list = make_defects(*SCENARIOS[scenario])
+        headless_view.current_board_index = busiest_board(headless_view.defect_list)
+        bench(headless_view.update_defect_listbox, rounds=10)
+
+
+class TestMarkerPlacement:
+    """現在の基板のマーカー位置の計算（Tk不要）"""
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_board_marker_coords(self, bench, scenario):
+        defects = DefectStore(make_defects(*SCENARIOS[scenario]))
+        board = busiest_board(defects)
+
+        def place():
+            _, _, xs, ys = board_coordinates(defects, board)
+            return relative_to_canvas(xs, ys, (800, 669), (0, 0))
+
+        bench(place, rounds=20)
+
+
+class TestScheduleLookup:
+    """SMTスケジュールからの指図検索"""
+
+    @pytest.mark.parametrize("lots", [100, 5000])
+    def test_search_schedule(self, bench, lots):
+        schedule_df = make_schedule_df(lots)
+        view = SimpleNamespace(is_read_schedule=True, schedule_df=schedule_df)
+        lot_number = schedule_df["lot_number"].iloc[-1]
+        search = AOIView._AOIView__search_schedule_df_item
+
+        result = bench(search, view, lot_number, rounds=20)
+        assert result["lot_number"] == lot_number
+
+
+class TestPersistence:
+    """不良データの保存"""
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_repaird_journal_sync_one_change(self, bench, tmp_path, scenario):
+        """修理データを1件変更した場合の追記ジャーナル同期（スプール反映1回分）"""
+        repairds = make_repairds(make_defects(*SCENARIOS[scenario]))
+        if not repairds:
+            pytest.skip("修理データなし")
+        journal = CsvJournal(
+            str(tmp_path / "lot_repaird_list.csv"),
+            RepairdInfo,
+            reader=lambda path: [],
+            writer=lambda records, path: None,
+            compact_threshold=10**9,
+        )
+        journal.sync(repairds)
+
+        def change_one():
+            repairds[0].is_repaird = (
+                "異形" if repairds[0].is_repaird == "修理済み" else "修理済み"
+            )
+            return (journal.to_rows(repairds),)
+
+        bench(journal.sync_rows, setup=change_one, rounds=10)
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_save_defect_csv(self, bench, tmp_path, scenario):
+        manager = pytest.importorskip("aoi_data_manager")
+        defects = make_defects(*SCENARIOS[scenario])
+        path = str(tmp_path / "lot_defect_list.csv")
+        bench(manager.FileManager.save_defect_csv, defects, path, rounds=5)
+
+    @pytest.mark.parametrize("scenario", SCENARIO_IDS)
+    def test_merge_insert_defect_infos(self, bench, tmp_path, scenario):
+        manager = pytest.importorskip("aoi_data_manager")
+        if not hasattr(manager.SqlOperations, "merge_insert_defect_infos"):
+            pytest.skip("SqlOperations.merge_insert_defect_infos がありません")
+        defects = make_defects(*SCENARIOS[scenario])
+        db = manager.SqlOperations(str(tmp_path), "aoi_data.db")
+        db.create_tables()
+        try:
+            bench(db.merge_insert_defect_infos, defects, rounds=3)
+        finally:
+            db.close()
+
+
+class TestImageExport:
+    """マーカー付き不良画像の出力"""
+
+    def test_defect_image_exporter(self, bench, tmp_path, board_image):
+        exporter = DefectImageExporter()
+        defect = sample_defect()
+        try:
+            bench(
+                exporter.export, defect, board_image, str(tmp_path), "defect", rounds=5
+            )
+        finally:
+            exporter.shutdown()
+
+    def test_export_canvas_image_with_markers(self, bench, tmp_path, board_image):
+        manager = pytest.importorskip("aoi_data_manager")
+        export = getattr(manager.FileManager, "export_canvas_image_with_markers", None)
+        if export is None:
+            pytest.skip("FileManager.export_canvas_image_with_markers がありません")
+        defect = sample_defect()
+        bench(
+            export,
+            defect,
+            board_image,
+            str(tmp_path),
+            "defect",
+            rounds=5,
+        )
@@ -0,0 +1,59 @@
+"""
+Kintone同期のスループット・ベンチマーク
+
+KintoneClient（aoi_data_manager）をローカルのKintoneスタブに向けて、
+1回の保存（post_defect_records）の処理時間・records/s・リクエスト数と、
+スロットリング（429）時の挙動を計測します。
+"""
+
+import pytest
+
+from tests.support.kintone_stub import KintoneStub, KintoneStubConfig
+from tests.support.synthetic import SCENARIOS, make_defects
+
+# スタブの条件（名前: 設定）
+STUB_CONDITIONS = {
+    "lan": KintoneStubConfig(latency_s=0.02, jitter_s=0.01),
+    "throttled": KintoneStubConfig(latency_s=0.02, jitter_s=0.01, throttle_every=5),
+}
+
+
+@pytest.fixture
+def kintone_client():
+    manager = pytest.importorskip("aoi_data_manager")
+    if not hasattr(manager.KintoneClient, "post_defect_records"):
+        pytest.skip("KintoneClient.post_defect_records がありません")
+    return manager.KintoneClient(subdomain="aoi-bench", app_id=1, api_token="bench")
+
+
+@pytest.mark.parametrize("condition", list(STUB_CONDITIONS))
+@pytest.mark.parametrize("scenario", ["small", "typical"])
+def test_post_defect_records(bench, kintone_client, scenario, condition):
+    defects = make_defects(*SCENARIOS[scenario])
+    outcome = {}
+
+    with KintoneStub(STUB_CONDITIONS[condition]) as stub, stub.redirect():
+
+        def save():
+            stub.reset()
+            try:
+                kintone_client.post_defect_records(defects)
+                outcome["error"] = None
+            except Exception as e:
+                outcome["error"] = f"{type(e).__name__}: {e}"
+
+        bench(save, rounds=3)
+        stats = stub.stats
+
+    if stats.requests == 0:
+        pytest.skip("KintoneClientがrequests経由で送信していません")
+    elapsed_s = bench.last_median_ms / 1000.0
+    print(
+        f"  {len(defects)}件 / {elapsed_s:.3f}s = {len(defects) / elapsed_s:.0f} records/s,"
+        f" リクエスト {stats.requests}回, 429 {stats.throttled}回,"
+        f" 上限超過 {stats.bulk_errors}回, 結果 {outcome['error'] or 'OK'}"
+    )
+    # 一括上限（100件）を守って分割送信していること
+    assert stats.bulk_errors == 0
+    if condition == "lan":
+        assert outcome["error"] is None
@@ -0,0 +1,3 @@
+"""
+テスト・ベンチマーク用の支援モジュール（合成データ・Kintoneスタブ）
+"""
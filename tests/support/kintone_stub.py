@@ -0,0 +1,378 @@
+"""
+Kintoneレコード API のローカルスタブ
+
+本番のKintoneに接続せずに同期処理の負荷を測定するため、
+/k/v1/records.json・/k/v1/record.json・/k/v1/app.json を模倣する
+HTTPサーバーをローカルで起動します。
+
+- 一括処理の上限（登録・更新・削除は100件、取得は500件）を超えると400
+- 応答遅延（固定 + ゆらぎ）
+- N回に1回、または確率で429（スロットリング）
+- requests 経由の *.cybozu.com へのリクエストをスタブへ転送（redirect()）
+
+使用例:
+    with KintoneStub(KintoneStubConfig(latency_s=0.05, throttle_every=10)) as stub:
+        with stub.redirect():
+            client = KintoneClient(subdomain="example", app_id=1, api_token="x")
+            client.post_defect_records(defects)
+        print(stub.stats.requests, stub.stats.throttled)
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+# Kintone REST APIの一括処理上限
+BULK_WRITE_LIMIT = 100
+BULK_READ_LIMIT = 500
+
+
+@dataclass
+class KintoneStubConfig:
+    """スタブの動作設定"""
+
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    throttle_every: int = 0
+    throttle_rate: float = 0.0
+    api_token: Optional[str] = None
+    seed: int = 0
+
+
+@dataclass
+class KintoneStubStats:
+    """スタブが受けたリクエストの集計"""
+
+    requests: int = 0
+    by_endpoint: Dict[str, int] = field(default_factory=dict)
+    throttled: int = 0
+    bulk_errors: int = 0
+    records_written: int = 0
+    records_deleted: int = 0
+
+    def requests_for(self, method: str, path: str = "/k/v1/records.json") -> int:
+        """メソッド・パス毎のリクエスト数"""
+        return self.by_endpoint.get(f"{method} {path}", 0)
+
+
+class KintoneStubError(Exception):
+    """Kintone形式のエラー応答"""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class KintoneStub:
+    """Kintoneレコード API を模倣するローカルHTTPサーバー"""
+
+    def __init__(self, config: Optional[KintoneStubConfig] = None):
+        """
+        コンストラクタ
+
+        ### Args:
+        - config (KintoneStubConfig): 遅延・スロットリング等の設定
+        """
+        self.config = config or KintoneStubConfig()
+        self.stats = KintoneStubStats()
+        self.apps: Dict[str, Dict[int, dict]] = {}
+        self._next_id = 1
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """スタブのURL（http://127.0.0.1:ポート）"""
+        if self._server is None:
+            raise RuntimeError("スタブが起動していません")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """サーバーを起動してURLを返す"""
+        stub = self
+
+        class Handler(_KintoneHandler):
+            pass
+
+        Handler.stub = stub
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True, name="kintone-stub"
+        )
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """サーバーを停止"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "KintoneStub":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        """保存済みレコードと集計をクリア"""
+        with self._lock:
+            self.apps.clear()
+            self.stats = KintoneStubStats()
+            self._next_id = 1
+
+    def records(self, app: str) -> List[dict]:
+        """アプリの保存済みレコード（id順）"""
+        with self._lock:
+            return [
+                self.apps.get(str(app), {})[i]
+                for i in sorted(self.apps.get(str(app), {}))
+            ]
+
+    @contextmanager
+    def redirect(self, domain_suffix: str = ".cybozu.com"):
+        """
+        requests 経由の *.cybozu.com へのリクエストをスタブに転送する
+
+        KintoneClient等がrequestsで送信するリクエストのURLを書き換えるため、
+        クライアント側のコードを変更せずにスタブを使用できる。
+        """
+        from requests.adapters import HTTPAdapter
+
+        original_send = HTTPAdapter.send
+        base = urlsplit(self.base_url)
+
+        def send(adapter, request, **kwargs):
+            url = urlsplit(request.url)
+            if (url.hostname or "").endswith(domain_suffix):
+                request.url = urlunsplit(
+                    (base.scheme, base.netloc, url.path, url.query, url.fragment)
+                )
+            return original_send(adapter, request, **kwargs)
+
+        HTTPAdapter.send = send
+        try:
+            yield self
+        finally:
+            HTTPAdapter.send = original_send
+
+    # --- リクエスト処理（ハンドラーから呼ばれる） ---
+
+    def handle(self, method: str, path: str, query: dict, body: dict, headers) -> dict:
+        """リクエストを処理して応答の辞書を返す（エラー時はKintoneStubError）"""
+        with self._lock:
+            self.stats.requests += 1
+            key = f"{method} {path}"
+            self.stats.by_endpoint[key] = self.stats.by_endpoint.get(key, 0) + 1
+            throttled = self.__should_throttle()
+            if throttled:
+                self.stats.throttled += 1
+
+        delay = self.config.latency_s + self._random.uniform(0, self.config.jitter_s)
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            raise KintoneStubError(429, "STUB_THROTTLED", "Too many requests.")
+        if self.config.api_token is not None and self.config.api_token not in (
+            headers.get("X-Cybozu-API-Token") or ""
+        ).split(","):
+            raise KintoneStubError(401, "STUB_INVALID_TOKEN", "APIトークンが不正です。")
+
+        app = str(body.get("app") or _first(query, "app") or "")
+        if path == "/k/v1/app.json":
+            return {"appId": _first(query, "id") or app, "name": "stub"}
+        if path == "/k/v1/record.json":
+            return self.__handle_record(method, app, query, body)
+        if path == "/k/v1/records.json":
+            return self.__handle_records(method, app, query, body)
+        raise KintoneStubError(404, "STUB_NOT_FOUND", f"{path} は存在しません。")
+
+    def __should_throttle(self) -> bool:
+        """429を返すか（ロック内で呼ぶ）"""
+        every = self.config.throttle_every
+        if every and self.stats.requests % every == 0:
+            return True
+        return self.config.throttle_rate > 0 and (
+            self._random.random() < self.config.throttle_rate
+        )
+
+    def __handle_record(self, method, app, query, body) -> dict:
+        """単一レコードの取得・登録"""
+        if method == "GET":
+            record_id = int(_first(query, "id") or 0)
+            with self._lock:
+                record = self.apps.get(app, {}).get(record_id)
+            if record is None:
+                raise KintoneStubError(404, "GAIA_RE01", "レコードが見つかりません。")
+            return {"record": record}
+        if method == "POST":
+            ids = self.__insert(app, [body.get("record", {})])
+            return {"id": ids[0], "revision": "1"}
+        raise KintoneStubError(405, "STUB_NOT_SUPPORTED", f"{method} は未対応です。")
+
+    def __handle_records(self, method, app, query, body) -> dict:
+        """複数レコードの取得・登録・更新・削除"""
+        if method == "GET":
+            return self.__select(app, body.get("query") or _first(query, "query") or "")
+        if method == "POST":
+            records = body.get("records", [])
+            self.__check_bulk(len(records), BULK_WRITE_LIMIT)
+            ids = self.__insert(app, records)
+            return {"ids": ids, "revisions": ["1"] * len(ids)}
+        if method == "PUT":
+            records = body.get("records", [])
+            self.__check_bulk(len(records), BULK_WRITE_LIMIT)
+            return {"records": self.__update(app, records)}
+        if method == "DELETE":
+            ids = body.get("ids") or [
+                v[0] for k, v in query.items() if k.startswith("ids[")
+            ]
+            self.__check_bulk(len(ids), BULK_WRITE_LIMIT)
+            with self._lock:
+                table = self.apps.setdefault(app, {})
+                for record_id in ids:
+                    table.pop(int(record_id), None)
+                self.stats.records_deleted += len(ids)
+            return {}
+        raise KintoneStubError(405, "STUB_NOT_SUPPORTED", f"{method} は未対応です。")
+
+    def __check_bulk(self, count: int, limit: int):
+        """一括処理の上限を超えていればエラー"""
+        if count > limit:
+            with self._lock:
+                self.stats.bulk_errors += 1
+            raise KintoneStubError(
+                400, "CB_VA01", f"一度に処理できるレコードは{limit}件までです。"
+            )
+
+    def __insert(self, app: str, records: List[dict]) -> List[str]:
+        """レコードを登録してIDを返す"""
+        ids = []
+        with self._lock:
+            table = self.apps.setdefault(app, {})
+            for record in records:
+                record_id = self._next_id
+                self._next_id += 1
+                stored = dict(record)
+                stored["$id"] = {"type": "__ID__", "value": str(record_id)}
+                stored["$revision"] = {"type": "__REVISION__", "value": "1"}
+                table[record_id] = stored
+                ids.append(str(record_id))
+            self.stats.records_written += len(records)
+        return ids
+
+    def __update(self, app: str, records: List[dict]) -> List[dict]:
+        """レコードを更新（id または updateKey で指定）"""
+        results = []
+        with self._lock:
+            table = self.apps.setdefault(app, {})
+            for entry in records:
+                record_id = self.__find_id(table, entry)
+                if record_id is None:
+                    raise KintoneStubError(
+                        404, "GAIA_RE01", "更新するレコードが見つかりません。"
+                    )
+                stored = table[record_id]
+                stored.update(entry.get("record", {}))
+                revision = int(stored["$revision"]["value"]) + 1
+                stored["$revision"] = {"type": "__REVISION__", "value": str(revision)}
+                results.append({"id": str(record_id), "revision": str(revision)})
+            self.stats.records_written += len(records)
+        return results
+
+    @staticmethod
+    def __find_id(table: Dict[int, dict], entry: dict) -> Optional[int]:
+        """更新対象のレコードIDを検索"""
+        if "id" in entry:
+            record_id = int(entry["id"])
+            return record_id if record_id in table else None
+        update_key = entry.get("updateKey") or {}
+        field_code, value = update_key.get("field"), update_key.get("value")
+        for record_id, record in table.items():
+            if (record.get(field_code) or {}).get("value") == value:
+                return record_id
+        return None
+
+    def __select(self, app: str, query: str) -> dict:
+        """クエリの limit / offset のみを解釈してレコードを返す"""
+        tokens = query.split()
+        limit = _token_after(tokens, "limit", BULK_READ_LIMIT)
+        offset = _token_after(tokens, "offset", 0)
+        self.__check_bulk(limit, BULK_READ_LIMIT)
+        records = self.records(app)
+        return {
+            "records": records[offset : offset + limit],
+            "totalCount": str(len(records)),
+        }
+
+
+class _KintoneHandler(BaseHTTPRequestHandler):
+    """KintoneStubにリクエストを渡すハンドラー"""
+
+    stub: KintoneStub = None
+
+    def do_GET(self):
+        self.__dispatch("GET")
+
+    def do_POST(self):
+        self.__dispatch("POST")
+
+    def do_PUT(self):
+        self.__dispatch("PUT")
+
+    def do_DELETE(self):
+        self.__dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        # 負荷測定中にリクエスト毎のログを出さない
+        pass
+
+    def __dispatch(self, method: str):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+            result = self.stub.handle(
+                method, url.path, parse_qs(url.query), body, self.headers
+            )
+            self.__respond(200, result)
+        except KintoneStubError as e:
+            self.__respond(e.status, {"code": e.code, "message": str(e), "id": "stub"})
+        except ValueError as e:
+            self.__respond(400, {"code": "CB_IJ01", "message": str(e), "id": "stub"})
+
+    def __respond(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _first(query: dict, key: str) -> Optional[str]:
+    """parse_qsの結果から最初の値を取得"""
+    values = query.get(key)
+    return values[0] if values else None
+
+
+def _token_after(tokens: List[str], keyword: str, default: int) -> int:
+    """クエリ文字列のキーワードの次の数値を取得"""
+    for i, token in enumerate(tokens[:-1]):
+        if token.lower() == keyword:
+            return int(tokens[i + 1])
+    return default
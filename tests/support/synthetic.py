@@ -0,0 +1,180 @@
+"""
+テスト・ベンチマーク用の合成データ
+
+指図（基板数 10～5,000、基板毎の不良数 0～200）の不良・修理データ、
+SMTスケジュール、基板画像を乱数シードから再現可能に生成します。
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+try:
+    from aoi_data_manager import DefectInfo, RepairdInfo
+except ImportError:
+    # aoi_data_managerがない環境では同じフィールドを持つデータクラスで代用
+
+    @dataclass
+    class DefectInfo:
+        line_name: str = ""
+        current_board_index: int = 1
+        defect_number: str = ""
+        reference: str = ""
+        defect_name: str = ""
+        x: Optional[float] = None
+        y: Optional[float] = None
+        insert_datetime: str = ""
+        serial: str = ""
+        aoi_user: str = ""
+        model_code: str = ""
+        lot_number: str = ""
+        model_label: str = ""
+        board_label: str = ""
+        board_number_label: str = ""
+        image_path: str = ""
+        kintone_record_id: str = ""
+        id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    @dataclass
+    class RepairdInfo:
+        id: str = ""
+        is_repaird: str = ""
+        parts_type: str = ""
+        insert_datetime: str = ""
+        repaird_user: str = ""
+        kintone_record_id: str = ""
+
+
+DEFECT_NAMES = ["ショート", "未はんだ", "部品ズレ", "欠品", "異物", "ブリッジ"]
+
+# ベンチマークのシナリオ（名前: (基板数, 基板毎の最大不良数)）
+SCENARIOS = {
+    "small": (10, 20),
+    "dense": (10, 200),
+    "typical": (500, 4),
+    "large": (5000, 1),
+}
+
+
+def make_lot_number(rng: random.Random) -> str:
+    """指図番号（1234567-10 形式）を生成"""
+    return f"{rng.randrange(10**6, 10**7)}-{rng.choice(['10', '20'])}"
+
+
+def make_defects(
+    boards: int, max_defects: int, seed: int = 0, lot_number: Optional[str] = None
+) -> List[DefectInfo]:
+    """
+    1指図分の不良リストを生成
+
+    基板毎の不良数は 0～max_defects の一様乱数。
+
+    ### Args:
+    - boards (int): 基板数
+    - max_defects (int): 基板毎の最大不良数
+    - seed (int): 乱数シード
+    - lot_number (str): 指図番号（省略時は乱数）
+    """
+    rng = random.Random(seed)
+    lot_number = lot_number or make_lot_number(rng)
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    defects = []
+    for board in range(1, boards + 1):
+        for number in range(1, rng.randint(0, max_defects) + 1):
+            defects.append(
+                DefectInfo(
+                    line_name="SMT-1",
+                    current_board_index=board,
+                    defect_number=str(number),
+                    reference=f"R{rng.randrange(1, 999)}",
+                    defect_name=rng.choice(DEFECT_NAMES),
+                    x=round(rng.random(), 4),
+                    y=round(rng.random(), 4),
+                    insert_datetime=(
+                        start + timedelta(seconds=len(defects))
+                    ).isoformat(),
+                    serial=f"SN{board:05d}",
+                    aoi_user="A001",
+                    model_code="Y8470722R",
+                    lot_number=lot_number,
+                    model_label="CN-SNDDJ0CJ",
+                    board_label="411CA",
+                    board_number_label="S面",
+                    id=str(uuid.UUID(int=rng.getrandbits(128))),
+                )
+            )
+    return defects
+
+
+def make_repairds(
+    defects: List[DefectInfo], repaired_ratio: float = 0.8, seed: int = 0
+) -> List[RepairdInfo]:
+    """
+    不良リストに対応する修理データを生成
+
+    ### Args:
+    - defects (List[DefectInfo]): 不良リスト
+    - repaired_ratio (float): 修理データを作成する不良の割合
+    - seed (int): 乱数シード
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 13, 0, 0)
+    repairds = []
+    for defect in defects:
+        if rng.random() >= repaired_ratio:
+            continue
+        repairds.append(
+            RepairdInfo(
+                id=defect.id,
+                is_repaird=rng.choice(["修理済み", "修理済み", "異形"]),
+                parts_type=rng.choice(["チップ", "その他", ""]),
+                insert_datetime=(start + timedelta(seconds=len(repairds))).isoformat(),
+                repaird_user="B002",
+            )
+        )
+    return repairds
+
+
+def make_lot(
+    boards: int, max_defects: int, repaired_ratio: float = 0.8, seed: int = 0
+) -> Tuple[List[DefectInfo], List[RepairdInfo]]:
+    """1指図分の不良リストと修理データを生成"""
+    defects = make_defects(boards, max_defects, seed=seed)
+    return defects, make_repairds(defects, repaired_ratio, seed=seed)
+
+
+def make_schedule_df(lots: int, seed: int = 0):
+    """SMTスケジュール（SMTSchedule.get_lot_infos相当）のDataFrameを生成"""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    rows = [
+        {
+            "lot_number": f"{1000000 + i}-{rng.choice(['10', '20'])}",
+            "model_code": f"Y{rng.randrange(10**6, 10**7)}R",
+            "model_name": f"CN-{rng.randrange(1000, 9999)}",
+            "board_name": f"{rng.randrange(100, 999)}CA",
+            "line_name": f"SMT-{rng.randrange(1, 6)}",
+            "quantity": rng.randrange(10, 5000),
+        }
+        for i in range(lots)
+    ]
+    return pd.DataFrame(rows)
+
+
+def make_board_image(path: str, size=(2448, 2048), seed: int = 0) -> str:
+    """AOIの基板画像に近いJPEG画像を生成"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (20, 110, 40))
+    draw = ImageDraw.Draw(image)
+    for _ in range(3000):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        w, h = rng.randrange(4, 60), rng.randrange(2, 30)
+        color = rng.choice([(200, 170, 60), (40, 40, 40), (220, 220, 220)])
+        draw.rectangle((x, y, x + w, y + h), fill=color)
+    image.save(path, format="JPEG", quality=90)
+    return path
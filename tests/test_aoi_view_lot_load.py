@@ -0,0 +1,129 @@
+"""
+指図の不良リストの非同期読み込みのテスト
+
+共有データベースの読み込みをDBキューで行い、結果をUI更新として反映すること、
+読み込み中は保存を受け付けないこと、指図が変わった後の結果は破棄することを
+確認します。Tkを使わずに試せるよう、データベースとウィジェットは代替を使います。
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.aoi_view import AOIView
+from src.services.defect_store import DefectStore
+from src.services.task_executor import TaskExecutor
+from src.services.ui_dispatcher import UiDispatcher
+
+
+class FakeWidget:
+    """afterの登録のみを記録するテスト用のウィジェット"""
+
+    def after(self, ms, func):
+        return None
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class FakePartitions:
+    """共有データベースの読み込みを止めておけるパーティション"""
+
+    directory = "//nas/db"
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.release = threading.Event()
+        self.threads = []
+
+    def partition_for_lot(self, lot_number):
+        return "aoi_data_202506.db"
+
+    def get_by_lot(self, lot_number):
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(5)
+        return list(self.shared.get(lot_number, []))
+
+
+class FakeSqlDb:
+    def get_defect_info_by_lot(self, lot_number):
+        return [SimpleNamespace(id="local", lot_number=lot_number)]
+
+    def close(self):
+        pass
+
+
+def make_view(partitions):
+    view = AOIView.__new__(AOIView)
+    sqlite_db = FakeSqlDb()
+    refreshed = []
+    statuses = []
+    view.__dict__.update(
+        executor=TaskExecutor({"db": 1}),
+        ui=UiDispatcher(FakeWidget()),
+        db_partitions=partitions,
+        sqlite_db=sqlite_db,
+        sqlite_db_dir="",
+        local_dbs={"aoi_data_202506.db": sqlite_db},
+        db_name="aoi_data_202506.db",
+        delete_defect_ids=[],
+        current_lot_number="1234567-10",
+        lot_generation=0,
+        lot_loading=False,
+        defect_list=DefectStore(),
+        image_exporter=SimpleNamespace(cancel_prefetch=lambda: 0),
+        is_share_available=lambda target: True,
+        update_defect_listbox=lambda: refreshed.append(len(view.defect_list)),
+        create_serial_dict=lambda defect_list: None,
+        update_index=lambda: None,
+        update_board_label=lambda: None,
+        defect_number_update=lambda: None,
+        update_status=statuses.append,
+    )
+    return view, refreshed, statuses
+
+
+class TestLotLoad:
+    """AOIViewの不良リストの読み込みのテストクラス"""
+
+    def test_shared_read_runs_off_tk_thread(self):
+        """共有データベースはDBキューで読み込み、UI更新として反映する"""
+        shared = {"1234567-10": [SimpleNamespace(id="other", lot_number="1234567-10")]}
+        partitions = FakePartitions(shared)
+        view, refreshed, statuses = make_view(partitions)
+
+        view.read_defect_list_db()
+        # 読み込み中は保存を受け付けない
+        assert view.lot_loading
+        assert not view._AOIView__check_lot_loaded()
+        assert statuses
+
+        partitions.release.set()
+        assert view.executor.wait(timeout=5)
+        assert partitions.threads == ["db-1"]
+        assert refreshed == []
+
+        view.ui.drain()
+        assert not view.lot_loading
+        assert [d.id for d in view.defect_list] == ["other", "local"]
+        assert refreshed == [2]
+        view.executor.shutdown()
+
+    def test_result_for_previous_lot_is_discarded(self):
+        """読み込み中に指図が変わった場合は結果を反映しない"""
+        partitions = FakePartitions({})
+        view, refreshed, _ = make_view(partitions)
+
+        view.read_defect_list_db()
+        view._AOIView__start_lot_generation()
+        partitions.release.set()
+        assert view.executor.wait(timeout=5)
+        view.ui.drain()
+
+        assert not view.lot_loading
+        assert len(view.defect_list) == 0
+        assert refreshed == []
+        view.executor.shutdown()
@@ -0,0 +1,214 @@
+"""
+不良マーカーのクリック選択と編集のテスト
+
+表示中のマーカー付近のクリックで既存の不良を選択し、そのまま保存すると
+同じID・同じ位置のレコードが更新されること、マーカーを表示していない
+場合はクリックで選択しないこと、入力確認のダイアログの時間を処理時間に
+含めないことを確認します。Tkを使わずに試せるよう、ウィジェットは
+最小限の代替を使います。
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("aoi_data_manager")
+
+from aoi_data_manager import DefectInfo
+
+from src.aoi_view import AOIView
+from src.services.defect_store import DefectStore
+
+
+class FakeCanvas:
+    """タグ毎の図形数のみを記録するCanvas"""
+
+    def __init__(self):
+        self.items = []
+
+    def create_oval(self, *coords, tags=(), **options):
+        tags = (tags,) if isinstance(tags, str) else tuple(tags)
+        self.items.append(tags)
+
+    def delete(self, tag):
+        self.items = [tags for tags in self.items if tag not in tags and tag != "all"]
+
+    def find_withtag(self, tag):
+        return tuple(i for i, tags in enumerate(self.items) if tag in tags)
+
+
+class FakeEntry:
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += str(text)
+
+
+class FakeLabel:
+    def __init__(self, text=""):
+        self.text = text
+
+    def cget(self, name):
+        return self.text
+
+    def config(self, text=None, **options):
+        if text is not None:
+            self.text = text
+
+
+class FakeTreeview:
+    """行の値と選択状態のみを持つTreeview"""
+
+    def __init__(self):
+        self.rows = {}
+        self.selected = ()
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def insert(self, parent, index, values):
+        item = f"I{len(self.rows) + 1:03d}"
+        self.rows[item] = tuple(str(v) for v in values)
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            self.rows.pop(item, None)
+
+    def item(self, item, option=None, values=None):
+        if values is not None:
+            self.rows[item] = tuple(str(v) for v in values)
+        return self.rows[item]
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, item):
+        self.selected = (item,)
+
+    def focus(self, item):
+        pass
+
+    def see(self, item):
+        pass
+
+
+def make_view(defects):
+    """表示・入力部分を代替したAOIView（Tkを初期化しない）"""
+    view = AOIView.__new__(AOIView)
+    view.__dict__.update(
+        fillColor="red",
+        photo_image=object(),
+        displayed_image_size=(800, 600),
+        image_offset=(0, 0),
+        canvas=FakeCanvas(),
+        defect_listbox=FakeTreeview(),
+        no_value=FakeLabel(),
+        rf_entry=FakeEntry(),
+        defect_entry=FakeEntry(),
+        aoi_user_label_value=FakeLabel("山田"),
+        model_label_value=FakeLabel("MODEL"),
+        board_label_value=FakeLabel("BOARD"),
+        side_label_value=FakeLabel("S面"),
+        reference_data=SimpleNamespace(defect_name=lambda number: None),
+        share_health=SimpleNamespace(is_down=lambda name: False),
+        data_directory="",
+        current_board_index=1,
+        current_coordinates=None,
+        current_line_name="L1",
+        current_item_code="Y8470722R",
+        current_lot_number="1234567-10",
+        current_image_path=None,
+        serial_dict={},
+        defect_list=DefectStore(defects),
+        lot_loading=False,
+        _marker_grid=None,
+        _marker_grid_key=None,
+    )
+    saved = []
+    view.post_kintone_record_async = lambda snapshot: saved.append(snapshot)
+    view._AOIView__check_data_directory = lambda: True
+    view._AOIView__insert_defect_info_to_db_async = lambda snapshot: None
+    view.update_defect_listbox()
+    return view, saved
+
+
+def click(view, rel_x, rel_y):
+    view.on_canvas_click(SimpleNamespace(x=rel_x * 800, y=rel_y * 600))
+
+
+class TestMarkerSelection:
+    """AOIViewのマーカー選択・編集のテストクラス"""
+
+    def test_click_select_and_save_updates_same_record(self):
+        """マーカー付近のクリックで選択し、保存すると同じレコードを更新する"""
+        defects = [
+            DefectInfo(
+                current_board_index=1,
+                defect_number=str(n),
+                reference=f"R{n}",
+                defect_name="ショート",
+                x=0.1 * n,
+                y=0.5,
+                kintone_record_id=f"k{n}",
+            )
+            for n in (1, 2)
+        ]
+        view, saved = make_view(defects)
+        assert len(view.canvas.find_withtag("defect_marker")) == 2
+
+        click(view, 0.2 + 0.002, 0.5)
+        view.on_defect_select(None)
+        assert view.no_value.cget("text") == "2"
+        assert view.current_coordinates == (0.2, 0.5)
+
+        view.rf_entry.delete(0)
+        view.rf_entry.insert(0, "c12")
+        view.save_defect_info()
+
+        assert len(view.defect_list) == 2
+        edited = view.defect_list[1]
+        assert edited.id == defects[1].id
+        assert edited.kintone_record_id == "k2"
+        assert edited.reference == "C12"
+        assert (edited.x, edited.y) == (0.2, 0.5)
+        assert view.defect_list[0].id == defects[0].id
+        assert len(saved) == 1 and len(saved[0]) == 2
+
+    def test_click_without_markers_places_new_coordinate(self):
+        """マーカーを表示していない場合はクリック位置を新しい座標にする"""
+        defects = [DefectInfo(current_board_index=1, defect_number="1", x=0.5, y=0.5)]
+        view, _ = make_view(defects)
+        view.canvas.delete("defect_marker")
+
+        click(view, 0.5, 0.5)
+        assert view.defect_listbox.selection() == ()
+        assert view.current_coordinates == (0.5, 0.5)
+        assert view.no_value.cget("text") == "2"
+
+    def test_dialog_time_is_not_recorded(self, monkeypatch):
+        """入力確認のダイアログで中断した保存は処理時間に記録しない"""
+        from src.aoi_view import latency, messagebox
+
+        view, saved = make_view([])
+        monkeypatch.setattr(messagebox, "showwarning", lambda *args: None)
+        before = latency.summary().get("save_defect_info", {}).get("count", 0)
+
+        view.save_defect_info()
+        assert saved == []
+        assert latency.summary().get("save_defect_info", {}).get("count", 0) == before
+
+        view.current_coordinates = (0.5, 0.5)
+        view.rf_entry.insert(0, "R1")
+        view.defect_entry.insert(0, "ショート")
+        view.save_defect_info()
+        assert len(saved) == 1
+        assert latency.summary()["save_defect_info"]["count"] == before + 1
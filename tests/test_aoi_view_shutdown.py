@@ -0,0 +1,68 @@
+"""
+終了時のデータベースのクローズ順のテスト
+
+登録済みのSQLite書き込みを実行し終えてから接続を閉じること、
+閉じた後に新しい接続を開いても書き込み中の接続に影響しないことを
+確認します。Tkを使わずに試せるよう、データベースは代替を使います。
+"""
+
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.aoi_view import AOIView
+from src.services.defect_store import DefectStore
+from src.services.task_executor import TaskExecutor
+
+
+class FakeSqlDb:
+    """書き込み・クローズの順序を記録するデータベース"""
+
+    def __init__(self, events, release):
+        self.events = events
+        self.release = release
+
+    def merge_insert_defect_infos(self, records):
+        self.release.wait(5)
+        self.events.append(("insert", len(records)))
+
+    def close(self):
+        self.events.append(("close",))
+
+
+def make_view(executor, sqlite_db):
+    view = AOIView.__new__(AOIView)
+    view.__dict__.update(
+        executor=executor,
+        sqlite_db=sqlite_db,
+        local_dbs={"aoi_data_202506.db": sqlite_db},
+        db_partitions=None,
+        db_name="aoi_data_202506.db",
+        current_lot_number="1234567-10",
+        unmerged_lots={},
+    )
+    return view
+
+
+class TestCloseSqliteDbs:
+    """AOIViewのデータベースのクローズのテストクラス"""
+
+    def test_close_runs_after_pending_inserts(self):
+        """登録済みの書き込みの完了後に接続を閉じる"""
+        executor = TaskExecutor({"db": 1})
+        events = []
+        release = threading.Event()
+        view = make_view(executor, FakeSqlDb(events, release))
+
+        view._AOIView__insert_defect_info_to_db_async(
+            DefectStore([object(), object()]).snapshot()
+        )
+        view._AOIView__close_sqlite_dbs()
+        assert view.sqlite_db is None and view.local_dbs == {}
+        assert events == []
+
+        release.set()
+        assert executor.shutdown(timeout=5)
+        assert events == [("insert", 2), ("close",)]
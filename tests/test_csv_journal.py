@@ -0,0 +1,157 @@
+"""
+追記型CSVジャーナルのテスト
+
+変更分のみが追記されること、読み込み時にID毎の最新状態へ
+畳み込まれること、コンパクション後もベースCSVから同じ状態が
+復元できること、コンパクション中の追記を失わないことを確認します。
+"""
+
+import csv
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+from src.services.csv_journal import CsvJournal
+from src.services.fs_cache import fs_cache
+
+
+@dataclass
+class SampleRecord:
+    id: str = ""
+    board: int = 1
+    x: Optional[float] = None
+    status: str = ""
+
+
+def read_records(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [
+            SampleRecord(
+                id=row["id"],
+                board=int(row["board"]),
+                x=float(row["x"]) if row["x"] else None,
+                status=row["status"],
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def write_records(records, path):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=[f.name for f in fields(SampleRecord)])
+        writer.writeheader()
+        for record in records:
+            writer.writerow(asdict(record))
+
+
+def count_journal_rows(journal: CsvJournal) -> int:
+    with open(journal.journal_path, newline="", encoding="utf-8-sig") as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+class TestCsvJournal:
+    """CsvJournalのテストクラス"""
+
+    def create_journal(self, tmp_path, threshold=200):
+        base_path = str(tmp_path / "1234567-10_repaird_list.csv")
+        return CsvJournal(
+            base_path, SampleRecord, read_records, write_records, threshold
+        )
+
+    def test_sync_appends_only_changed_records(self, tmp_path):
+        """2回目以降のsyncは変更レコードのみ追記する"""
+        journal = self.create_journal(tmp_path)
+        records = [SampleRecord(id=str(i), board=1, x=0.5) for i in range(10)]
+
+        assert journal.sync(records) == 10
+        records[3].status = "修理済み"
+        assert journal.sync(records) == 1
+        assert journal.sync(records) == 0
+        assert count_journal_rows(journal) == 11
+
+    def test_load_folds_latest_state_per_id(self, tmp_path):
+        """ジャーナルは最新状態に畳み込まれ、削除も反映される"""
+        journal = self.create_journal(tmp_path)
+        records = [SampleRecord(id=str(i), board=2, x=0.25) for i in range(3)]
+        journal.sync(records)
+        records[0].status = "修理済み"
+        journal.sync(records)
+        journal.remove(["2"])
+
+        loaded = self.create_journal(tmp_path).load()
+        by_id = {record.id: record for record in loaded}
+
+        assert sorted(by_id) == ["0", "1"]
+        assert by_id["0"].status == "修理済み"
+        assert by_id["0"].board == 2
+        assert by_id["1"].x == 0.25
+
+    def test_compaction_rewrites_base_and_removes_journal(self, tmp_path):
+        """閾値を超えるとベースCSVに畳み込まれる"""
+        journal = self.create_journal(tmp_path, threshold=5)
+        records = [SampleRecord(id=str(i)) for i in range(3)]
+        journal.sync(records)
+        for status in ("異形", "修理済み"):
+            records[1].status = status
+            journal.sync(records)
+
+        assert not os.path.exists(journal.journal_path)
+        assert os.path.exists(journal.base_path)
+        loaded = {r.id: r for r in self.create_journal(tmp_path).load()}
+        assert loaded["1"].status == "修理済み"
+        assert len(loaded) == 3
+
+    def test_compaction_keeps_rows_appended_meanwhile(self, tmp_path):
+        """畳み込み中に他の端末が追記した行は新しいジャーナルに残る"""
+        other = self.create_journal(tmp_path)
+
+        def write_while_appending(records, path):
+            write_records(records, path)
+            other.append([SampleRecord(id="late", status="修理済み")])
+
+        base_path = str(tmp_path / "1234567-10_repaird_list.csv")
+        journal = CsvJournal(
+            base_path, SampleRecord, read_records, write_while_appending
+        )
+        journal.sync([SampleRecord(id=str(i)) for i in range(3)])
+        journal.compact()
+
+        assert not os.path.exists(journal.compacting_path)
+        assert count_journal_rows(journal) == 1
+        loaded = {r.id: r for r in self.create_journal(tmp_path).load()}
+        assert sorted(loaded) == ["0", "1", "2", "late"]
+
+    def test_interrupted_compaction_is_resumed(self, tmp_path):
+        """中断したコンパクションのジャーナルも読み込み、次のコンパクションで畳み込む"""
+        journal = self.create_journal(tmp_path)
+        journal.sync([SampleRecord(id="a"), SampleRecord(id="b")])
+        # 前回の起動でジャーナルを別名に変えた後に終了した状態
+        os.replace(journal.journal_path, journal.compacting_path)
+        fs_cache.invalidate(journal.journal_path)
+        fs_cache.invalidate(journal.compacting_path)
+        journal.remove(["a"])
+
+        assert [r.id for r in self.create_journal(tmp_path).load()] == ["b"]
+        assert CsvJournal.exists_for(journal.base_path)
+        self.create_journal(tmp_path).compact()
+        assert not os.path.exists(journal.compacting_path)
+        assert [r.id for r in read_records(journal.base_path)] == ["b"]
+        assert [r.id for r in self.create_journal(tmp_path).load()] == ["b"]
+
+    def test_sync_rows_from_snapshot(self, tmp_path):
+        """別のインスタンスで作成した行（スプールの記録）を差分として追記する"""
+        journal = self.create_journal(tmp_path)
+        records = [SampleRecord(id=str(i), board=3) for i in range(4)]
+        journal.sync(records)
+
+        writer = self.create_journal(tmp_path)
+        writer.load()
+        records[0].status = "修理済み"
+        rows = self.create_journal(tmp_path).to_rows(records[:3])
+        assert writer.sync_rows(rows) == 2
+
+        loaded = {r.id: r for r in self.create_journal(tmp_path).load()}
+        assert sorted(loaded) == ["0", "1", "2"]
+        assert loaded["0"].status == "修理済み"
+        # スプールに記録した行からレコードを復元できる
+        assert self.create_journal(tmp_path).from_rows(rows) == records[:3]
@@ -0,0 +1,129 @@
+"""
+共有データベースのパーティションのテスト
+
+指図の書き込み先をカタログ・旧データ・当月の順に決めること、
+書き込みの終わったパーティションには書き込まず、削除はカタログに記録して
+読み込み時に除外すること、読み込み時にパーティションを合わせること、
+過去のパーティションを変更なしとして開くことを確認します。
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.services.db_partitions import DbPartitions
+
+
+@dataclass
+class Record:
+    """テスト用の不良情報"""
+
+    id: str = ""
+    lot_number: str = ""
+    defect_name: str = ""
+
+
+def write_rows(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS defect_info"
+        " (id TEXT PRIMARY KEY, lot_number TEXT, defect_name TEXT)"
+    )
+    conn.executemany("INSERT OR REPLACE INTO defect_info VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def make_partitions(directory, now=datetime(2025, 6, 15), **kwargs):
+    return DbPartitions(directory, Record, clock=lambda: now, **kwargs)
+
+
+class TestDbPartitions:
+    """DbPartitionsのテストクラス"""
+
+    def test_partition_for_new_and_legacy_lots(self, tmp_path):
+        """未登録の指図は旧データにあれば旧データ、なければ当月に書き込む"""
+        write_rows(tmp_path / "aoi_data.db", [("a", "1111111-10", "ブリッジ")])
+        partitions = make_partitions(tmp_path)
+
+        assert partitions.partition_for_lot("1111111-10") == "aoi_data.db"
+        assert partitions.partition_for_lot("2222222-10") == "aoi_data_202506.db"
+        assert [r.id for r in partitions.get_by_lot("1111111-10")] == ["a"]
+        partitions.close()
+
+    def test_catalog_routes_lookups(self, tmp_path):
+        """カタログに登録した指図は登録したパーティションから読み込む"""
+        write_rows(tmp_path / "aoi_data_202505.db", [("a", "1111111-10", "欠品")])
+        write_rows(tmp_path / "aoi_data_202506.db", [("b", "2222222-10", "")])
+        make_partitions(tmp_path).register(
+            {"1111111-10": "aoi_data_202505.db", "2222222-10": "aoi_data_202506.db"}
+        )
+
+        partitions = make_partitions(tmp_path)
+        assert partitions.partition_for_lot("1111111-10") == "aoi_data_202505.db"
+        assert partitions.get_by_lot("1111111-10") == [
+            Record("a", "1111111-10", "欠品")
+        ]
+        assert [r.id for r in partitions.get_by_lot("2222222-10")] == ["b"]
+        partitions.close()
+
+    def test_lot_split_across_partitions_is_merged(self, tmp_path):
+        """複数のパーティションにある指図は合わせ、同じIDは後のものを優先する"""
+        write_rows(tmp_path / "aoi_data_202505.db", [("a", "1111111-10", "旧")])
+        write_rows(
+            tmp_path / "aoi_data_202506.db",
+            [("a", "1111111-10", "新"), ("b", "1111111-10", "")],
+        )
+        partitions = make_partitions(tmp_path)
+        partitions.register({"1111111-10": "aoi_data_202505.db"})
+        partitions.register({"1111111-10": "aoi_data_202506.db"})
+
+        records = {r.id: r.defect_name for r in partitions.get_by_lot("1111111-10")}
+        assert records == {"a": "新", "b": ""}
+        partitions.close()
+
+    def test_closed_partition_is_not_written(self, tmp_path):
+        """書き込みの終わったパーティションの指図は当月に書き込み、削除はカタログで除外する"""
+        write_rows(
+            tmp_path / "aoi_data_202503.db",
+            [("a", "1111111-10", "欠品"), ("b", "1111111-10", "")],
+        )
+        write_rows(tmp_path / "aoi_data_202505.db", [("c", "2222222-10", "")])
+        make_partitions(tmp_path).register(
+            {"1111111-10": "aoi_data_202503.db", "2222222-10": "aoi_data_202505.db"}
+        )
+
+        partitions = make_partitions(tmp_path, open_months=3)
+        assert partitions.partition_for_lot("1111111-10") == "aoi_data_202506.db"
+        assert partitions.partition_for_lot("2222222-10") == "aoi_data_202505.db"
+
+        # 当月に書き込んだ編集を重ね、書き込みの終わったファイルは変更しない
+        write_rows(tmp_path / "aoi_data_202506.db", [("a", "1111111-10", "ブリッジ")])
+        closed = (tmp_path / "aoi_data_202503.db").read_bytes()
+        partitions.register(
+            {"1111111-10": "aoi_data_202506.db"}, deleted={"b": "1111111-10"}
+        )
+        records = {r.id: r.defect_name for r in partitions.get_by_lot("1111111-10")}
+        assert records == {"a": "ブリッジ"}
+        assert (tmp_path / "aoi_data_202503.db").read_bytes() == closed
+        partitions.close()
+
+    def test_immutable_months_and_no_directory(self, tmp_path):
+        """当月を含めて指定月数より前のパーティションを変更なしとして扱う"""
+        partitions = make_partitions(tmp_path, open_months=3)
+        assert not partitions.is_immutable("aoi_data_202506.db")
+        assert not partitions.is_immutable("aoi_data_202504.db")
+        assert partitions.is_immutable("aoi_data_202503.db")
+        assert partitions.is_immutable("aoi_data_202412.db")
+        assert not partitions.is_immutable("aoi_data.db")
+        # 変更なしとして扱う1ヶ月前から書き込み先にしない
+        assert partitions.is_writable("aoi_data_202505.db")
+        assert not partitions.is_writable("aoi_data_202504.db")
+        assert partitions.is_writable("aoi_data.db")
+        assert make_partitions(tmp_path, open_months=1).is_writable(
+            "aoi_data_202506.db"
+        )
+
+        local_only = make_partitions("")
+        assert local_only.partition_for_lot("1111111-10") == "aoi_data_202506.db"
+        assert local_only.get_by_lot("1111111-10") == []
@@ -0,0 +1,122 @@
+"""
+共有データベースの圧縮スナップショットのテスト
+
+圧縮したまま取得・展開した内容が元のファイルと一致すること、転送量が
+元のファイルより小さいこと、過去のパーティションは展開済みの
+スナップショットから読み、展開前は共有のファイルを読んで取得を1回だけ
+依頼することを確認します。
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+
+import pytest
+
+from src.services.db_partitions import DbPartitions
+from src.services.db_snapshot import DbSnapshotCache
+
+
+@dataclass
+class Record:
+    """テスト用の不良情報"""
+
+    id: str = ""
+    lot_number: str = ""
+    defect_name: str = ""
+
+
+def create_db(path, lots=20, per_lot=50):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE defect_info (id TEXT PRIMARY KEY, lot_number TEXT, defect_name TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO defect_info VALUES (?, ?, ?)",
+        [
+            (f"{lot}-{i}", f"{1000000 + lot}-10", "ブリッジ")
+            for lot in range(lots)
+            for i in range(per_lot)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestDbSnapshotCache:
+    """DbSnapshotCacheのテストクラス"""
+
+    @pytest.mark.parametrize("codec", ["lzma", "zlib"])
+    def test_publish_and_fetch_roundtrip(self, tmp_path, codec):
+        """スナップショットを展開した内容が元と一致し、転送量が元より小さい"""
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        db_path = shared / "aoi_data_202501.db"
+        create_db(db_path)
+        raw = db_path.read_bytes()
+
+        publisher = DbSnapshotCache(tmp_path / "a", codec)
+        assert publisher.fetch(str(db_path)) is None
+        size = publisher.publish(str(db_path))
+        assert 0 < size < len(raw)
+        assert publisher.publish(str(db_path)) == 0
+
+        station = DbSnapshotCache(tmp_path / "b", codec)
+        local_path = station.fetch(str(db_path))
+        assert open(local_path, "rb").read() == raw
+        assert station.bytes_transferred == size
+        assert station.fetch(str(db_path)) == local_path
+        assert station.bytes_transferred == size
+
+    def test_corrupt_snapshot_is_rejected(self, tmp_path):
+        """途中で終わったスナップショットは展開せずにエラーとする"""
+        db_path = tmp_path / "aoi_data_202501.db"
+        create_db(db_path)
+        cache = DbSnapshotCache(tmp_path / "cache")
+        cache.publish(str(db_path))
+        snapshot = tmp_path / "aoi_data_202501.db.xz"
+        snapshot.write_bytes(snapshot.read_bytes()[:100])
+
+        with pytest.raises(OSError):
+            cache.fetch(str(db_path))
+        assert cache.cached(str(db_path)) is None
+
+    def test_partitions_read_from_snapshot(self, tmp_path):
+        """過去のパーティションは展開済みのスナップショットだけを読み、ない場合は取得を依頼する"""
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        create_db(shared / "aoi_data_202501.db", lots=2, per_lot=3)
+        requested = []
+
+        def make_partitions(cache_dir):
+            return DbPartitions(
+                shared,
+                Record,
+                clock=lambda: datetime(2025, 6, 1),
+                snapshots=DbSnapshotCache(cache_dir),
+                on_missing_snapshot=requested.append,
+            )
+
+        # 展開前は共有のファイルを読み、取得は依頼するだけ（ここでは取得しない）
+        DbSnapshotCache(tmp_path / "publisher").publish(
+            str(shared / "aoi_data_202501.db")
+        )
+        partitions = make_partitions(tmp_path / "b")
+        partitions.register({"1000000-10": "aoi_data_202501.db"})
+        assert len(partitions.get_by_lot("1000000-10")) == 3
+        assert len(partitions.get_by_lot("1000001-10")) == 0
+        assert requested == [str(shared / "aoi_data_202501.db")]
+        assert not (tmp_path / "b" / "aoi_data_202501.db").exists()
+
+        # バックグラウンドで取得した後はスナップショットを読む
+        # （取得後に共有のファイルに追加した行は読まない）
+        assert DbSnapshotCache(tmp_path / "b").fetch(requested[0])
+        conn = sqlite3.connect(shared / "aoi_data_202501.db")
+        conn.execute(
+            "INSERT INTO defect_info VALUES ('0-99', '1000000-10', 'ブリッジ')"
+        )
+        conn.commit()
+        conn.close()
+        assert len(partitions.get_by_lot("1000000-10")) == 3
+        assert len(requested) == 1
+        partitions.close()
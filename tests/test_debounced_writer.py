@@ -0,0 +1,124 @@
+"""
+遅延書き込みのテスト
+
+タイマー経過前の変更はまとめて1回だけ書き込むこと、flushで直ちに
+書き込むこと、waitで依頼済みの書き込みの完了を待てること、submitの
+処理を書き込みと同じ順序で実行すること、書き込みの例外で後続を
+止めないことを確認します。
+"""
+
+import threading
+
+from src.services.debounced_writer import DebouncedWriter
+
+
+class FakeWidget:
+    """afterの登録のみを記録するテスト用のウィジェット"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self._next_id = 0
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self.scheduled[self._next_id] = func
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def run_pending(self):
+        for after_id in list(self.scheduled):
+            self.scheduled.pop(after_id)()
+
+
+def make_writer(widget, write, **kwargs):
+    """書き込むたびに1から順に増える番号をスナップショットとする"""
+    state = {"value": 0}
+
+    def _collect():
+        state["value"] += 1
+        return state["value"]
+
+    return DebouncedWriter(widget, _collect, write, **kwargs)
+
+
+class TestDebouncedWriter:
+    """DebouncedWriterのテストクラス"""
+
+    def test_changes_are_debounced(self):
+        """タイマー経過前の変更はタイマーを登録し直し、1回だけ書き込む"""
+        widget = FakeWidget()
+        written = []
+        writer = make_writer(widget, written.append)
+
+        writer.mark_dirty()
+        writer.mark_dirty()
+        writer.mark_dirty()
+        assert writer.dirty
+        assert len(widget.scheduled) == 1
+
+        widget.run_pending()
+        assert writer.wait(timeout=5)
+        assert written == [1]
+        assert not writer.dirty
+        assert writer.close(timeout=5)
+
+    def test_flush_writes_immediately(self):
+        """flushはタイマーを取り消して直ちに書き込み、変更がなければ何もしない"""
+        widget = FakeWidget()
+        written = []
+        writer = make_writer(widget, written.append)
+
+        writer.mark_dirty()
+        writer.flush()
+        assert widget.scheduled == {}
+        writer.flush()
+        assert writer.wait(timeout=5)
+        assert written == [1]
+
+        writer.mark_dirty()
+        assert writer.close(timeout=5)
+        assert written == [1, 2]
+
+    def test_wait_and_submit_follow_write_order(self):
+        """submitの処理とwaitは依頼済みの書き込みの後に実行する"""
+        widget = FakeWidget()
+        release = threading.Event()
+        order = []
+        writer = DebouncedWriter(
+            widget,
+            lambda: "snapshot",
+            lambda payload: (release.wait(5), order.append(payload)),
+        )
+
+        writer.mark_dirty()
+        writer.flush()
+        writer.submit(lambda: order.append("compact"))
+        assert not writer.wait(timeout=0.05)
+        assert order == []
+
+        release.set()
+        assert writer.wait(timeout=5)
+        assert order == ["snapshot", "compact"]
+        assert writer.close(timeout=5)
+
+    def test_error_does_not_stop_later_writes(self):
+        """書き込みの例外はon_errorに渡し、後続の書き込みを続ける"""
+        widget = FakeWidget()
+        errors = []
+        written = []
+
+        def _write(payload):
+            if payload == 1:
+                raise OSError("共有ディレクトリに接続できません")
+            written.append(payload)
+
+        writer = make_writer(widget, _write, on_error=errors.append)
+        writer.mark_dirty()
+        writer.flush()
+        writer.mark_dirty()
+        writer.flush()
+        assert writer.close(timeout=5)
+        assert [str(e) for e in errors] == ["共有ディレクトリに接続できません"]
+        assert written == [2]
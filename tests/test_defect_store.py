@@ -0,0 +1,130 @@
+"""
+不良レコードのストアのテスト
+
+リストと同じ操作でDefectInfoと同じ値が得られること、指図内で一定の列の
+文字列を共有すること、スナップショットは取得時点で複製してその後の
+変更の影響を受けないこと、replaceで複製に置き換えてversionを進める
+ことを確認します。
+"""
+
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import pytest
+
+from src.services.defect_store import DefectStore
+from src.services.memory_budget import records_nbytes
+
+
+@dataclass
+class Defect:
+    """DefectInfo相当のレコード"""
+
+    current_board_index: int = 1
+    defect_number: str = ""
+    reference: str = ""
+    x: Optional[float] = None
+    y: Optional[float] = None
+    lot_number: str = ""
+    model_code: str = ""
+    aoi_user: str = ""
+    id: str = field(default="")
+
+
+def make_records(count: int):
+    # SQLite・CSVから読み込んだ場合と同じく行毎に別の文字列オブジェクトにする
+    return [
+        Defect(
+            current_board_index=i // 4 + 1,
+            defect_number=str(i % 4 + 1),
+            reference=f"R{i}",
+            x=(i % 10) / 10,
+            y=None if i % 7 == 0 else 0.5,
+            lot_number="".join(["1234567", "-10"]),
+            model_code="".join(["MODEL", "-A"]),
+            aoi_user="".join(["山", "田"]),
+            id=f"id-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+class TestDefectStore:
+    """DefectStoreのテストクラス"""
+
+    def test_list_operations(self):
+        """リストと同じ操作で同じレコードが得られる"""
+        records = make_records(50)
+        store = DefectStore(records)
+
+        assert len(store) == 50
+        assert list(store) == records
+        assert asdict(store[7]) == asdict(records[7])
+        assert store[-1].id == "id-49"
+        assert [d.id for d in store[1:3]] == ["id-1", "id-2"]
+
+        version = store.version
+        del store[1]
+        store[0] = Defect(id="a")
+        store.append(Defect(id="b"))
+        assert [store[0].id, store[1].id, store[-1].id] == ["a", "id-2", "b"]
+        assert store.version == version + 3
+        with pytest.raises(TypeError):
+            store[0:1] = [Defect()]
+
+    def test_shares_lot_constant_strings(self):
+        """指図内で一定の列の文字列は共有し、レコード毎の値はそのまま保持する"""
+        records = make_records(2000)
+        assert records[0].lot_number is not records[1].lot_number
+        store = DefectStore(records)
+
+        assert store[0].lot_number is store[1].lot_number
+        assert store[0].aoi_user is store[1999].aoi_user
+        assert store[0].id == "id-0" and store[1].reference == "R1"
+        assert store.nbytes() < records_nbytes(records)
+
+        store.clear()
+        assert len(store) == 0 and not store
+        assert store.nbytes() < 1024
+
+    def test_snapshot_is_detached_and_shared(self):
+        """スナップショットは取得時点の内容を複製して保持し、複製は共有する"""
+        store = DefectStore(make_records(5))
+        snapshot = store.snapshot()
+        store[0].reference = "C1"
+        store.append(Defect(id="new"))
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(snapshot.records()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(snapshot) == 5
+        assert all(records is results[0] for records in results)
+        assert [d.id for d in results[0]] == [f"id-{i}" for i in range(5)]
+        assert results[0][0].reference == "R0"
+        results[0][1].reference = "X"
+        assert store[1].reference == "R1"
+        assert store.to_records()[5].id == "new"
+
+    def test_replace_copies_record_and_bumps_version(self):
+        """replaceは複製に置き換えてversionを進め、取得済みのスナップショットは変わらない"""
+        store = DefectStore(make_records(3))
+        original = store[1]
+        snapshot = store.snapshot()
+        version = store.version
+
+        replaced = store.replace(
+            1, defect_number="9", lot_number="".join(["1234567", "-10"])
+        )
+        assert store[1] is replaced and replaced is not original
+        assert (replaced.defect_number, original.defect_number) == ("9", "2")
+        assert replaced.lot_number is store[0].lot_number
+        assert store.version == version + 1
+        assert snapshot.records()[1].defect_number == "2"
@@ -0,0 +1,83 @@
+"""
+ファイルシステムのメタデータキャッシュのテスト
+
+期限内の確認ではos.statを呼ばないこと、期限切れ・自分での書き込み後は
+最新の状態を取得することを確認します。
+"""
+
+import os
+
+from src.services.fs_cache import FsMetadataCache
+
+
+class FakeClock:
+    """手動で進める時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    clock = FakeClock()
+    return FsMetadataCache(clock=clock, **kwargs), clock
+
+
+class TestFsMetadataCache:
+    """FsMetadataCacheのテストクラス"""
+
+    def test_exists_is_cached_until_ttl(self, tmp_path, monkeypatch):
+        """期限内はos.statを呼ばず、期限切れ後に取得し直す"""
+        cache, clock = make_cache(ttl=2.0)
+        calls = []
+        real_stat = os.stat
+        monkeypatch.setattr(
+            os, "stat", lambda path, *a, **k: calls.append(path) or real_stat(path)
+        )
+
+        assert cache.isdir(tmp_path)
+        assert cache.exists(tmp_path)
+        assert len(calls) == 1 and cache.hits == 1
+
+        clock.now = 2.5
+        assert cache.exists(tmp_path)
+        assert len(calls) == 2
+
+    def test_negative_results_expire_sooner(self, tmp_path):
+        """存在しない結果は短い期限で取得し直す"""
+        cache, clock = make_cache(ttl=10.0, negative_ttl=1.0)
+        path = tmp_path / "lot"
+
+        assert cache.exists(path) is False
+        path.mkdir()
+        assert cache.exists(path) is False
+        clock.now = 1.5
+        assert cache.exists(path) is True
+
+    def test_makedirs_and_invalidate_on_write(self, tmp_path):
+        """自分で作成・書き込んだパスは期限内でも最新の状態になる"""
+        cache, _ = make_cache()
+        output_dir = tmp_path / "1234567-10"
+
+        assert cache.listdir(tmp_path) == []
+        cache.makedirs(output_dir)
+        assert cache.isdir(output_dir)
+        assert cache.listdir(tmp_path) == ["1234567-10"]
+        cache.makedirs(output_dir)
+
+        path = output_dir / "image.png"
+        assert cache.isfile(path) is False
+        path.write_bytes(b"x")
+        cache.invalidate(path)
+        assert cache.isfile(path)
+        assert cache.stat(path).st_size == 1
+        assert cache.listdir(output_dir) == ["image.png"]
+
+    def test_max_entries(self, tmp_path):
+        """上限を超えても保持するパスの数は増え続けない"""
+        cache, _ = make_cache(max_entries=4)
+        for i in range(10):
+            cache.exists(tmp_path / f"missing{i}")
+        assert len(cache._stats) <= 4
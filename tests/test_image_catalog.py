@@ -0,0 +1,155 @@
+"""
+基板画像カタログのテスト
+
+品目コード・解析結果から画像を検索できること、ディレクトリの更新日時が
+変わらない限り読み直さないこと、追加・削除されたファイルのみ解析し直すこと、
+見つからない場合の読み直しを一定間隔に制限すること、保存したカタログを
+次回起動時に使うことを確認します。
+"""
+
+import os
+
+import pytest
+
+from src.services.image_catalog import ImageCatalog
+
+
+def parse(name):
+    """FileManager.parse_image_filename相当（品目_番号_機種_基板_面）"""
+    parts = name.split("_")
+    if len(parts) < 5:
+        raise ValueError(name)
+    return parts[2], parts[3], parts[4]
+
+
+class CountingParser:
+    """解析回数を数えるパーサー"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, name):
+        self.calls += 1
+        return parse(name)
+
+
+def touch(directory, name):
+    path = directory / name
+    path.write_bytes(b"")
+    return path
+
+
+def bump_mtime(directory, seconds=10):
+    """ディレクトリの更新日時を確実に変える"""
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    directory = tmp_path / "images"
+    directory.mkdir()
+    touch(directory, "Y8470722R_20_CN-SNDDJ0CJ_411CA_S面.jpg")
+    touch(directory, "Y8470722RX_20_CN-OTHER_411CA_C面.jpg")
+    touch(directory, "Z1000000A_10_MODEL_BOARD_C面.png")
+    touch(directory, "notes.txt")
+    (directory / "Y8470722R_dir.jpg").mkdir()
+    return directory
+
+
+class TestImageCatalog:
+    """ImageCatalogのテストクラス"""
+
+    def test_find_by_item_code_and_info(self, image_dir):
+        """品目コードの完全一致を優先し、解析結果からも検索できる"""
+        catalog = ImageCatalog(parser=parse)
+        directory = str(image_dir)
+
+        assert catalog.find(directory, "Y8470722R") == (
+            "Y8470722R_20_CN-SNDDJ0CJ_411CA_S面.jpg"
+        )
+        assert catalog.find(directory, "Z1000") == "Z1000000A_10_MODEL_BOARD_C面.png"
+        assert catalog.find(directory, "NOPE") is None
+        assert len(catalog) == 3
+        assert catalog.find_by_info(directory, "MODEL", "BOARD", "C面") == (
+            "Z1000000A_10_MODEL_BOARD_C面.png"
+        )
+        assert catalog.info("Y8470722R_20_CN-SNDDJ0CJ_411CA_S面.jpg") == (
+            "CN-SNDDJ0CJ",
+            "411CA",
+            "S面",
+        )
+
+    def test_incremental_refresh(self, image_dir):
+        """更新日時が変わらなければ読み直さず、変わった場合は新しいファイルのみ解析する"""
+        parser = CountingParser()
+        catalog = ImageCatalog(parser=parser)
+        directory = str(image_dir)
+
+        assert catalog.refresh(directory) is True
+        assert parser.calls == 3
+        assert catalog.refresh(directory) is False
+
+        touch(image_dir, "A0000001B_30_NEW_BOARD_S面.jpg")
+        os.remove(image_dir / "Z1000000A_10_MODEL_BOARD_C面.png")
+        bump_mtime(image_dir)
+        assert catalog.find(directory, "A0000001B") == "A0000001B_30_NEW_BOARD_S面.jpg"
+        assert parser.calls == 4
+        assert catalog.find_by_info(directory, "MODEL", "BOARD", "C面") is None
+
+    def test_miss_rescans_once(self, image_dir):
+        """更新日時が同じでも見つからない場合は一度だけ読み直す"""
+        catalog = ImageCatalog(parser=parse)
+        directory = str(image_dir)
+        catalog.refresh(directory)
+        stat = os.stat(image_dir)
+
+        touch(image_dir, "B0000002C_30_NEW_BOARD_S面.jpg")
+        os.utime(image_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert catalog.find(directory, "B0000002C") == "B0000002C_30_NEW_BOARD_S面.jpg"
+
+    def test_miss_rescan_is_rate_limited(self, image_dir, tmp_path):
+        """見つからない場合の読み直しは間隔内に1回だけ行い、一覧が同じなら保存しない"""
+        cache_path = tmp_path / "image_catalog.json"
+        now = [0.0]
+        catalog = ImageCatalog(
+            cache_path, parser=parse, min_rescan_interval_s=30.0, clock=lambda: now[0]
+        )
+        directory = str(image_dir)
+        catalog.refresh(directory)
+        os.remove(cache_path)
+
+        assert catalog.find(directory, "B0000002C") is None
+        assert not cache_path.exists()
+
+        stat = os.stat(image_dir)
+        touch(image_dir, "B0000002C_30_NEW_BOARD_S面.jpg")
+        os.utime(image_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        now[0] = 10.0
+        assert catalog.find(directory, "B0000002C") is None
+
+        now[0] = 31.0
+        assert catalog.find(directory, "B0000002C") == "B0000002C_30_NEW_BOARD_S面.jpg"
+        assert cache_path.exists()
+
+    def test_persistent_cache(self, image_dir, tmp_path):
+        """保存したカタログは同じディレクトリで更新がなければ読み直さずに使う"""
+        cache_path = tmp_path / "image_catalog.json"
+        directory = str(image_dir)
+        ImageCatalog(cache_path, parser=parse).refresh(directory)
+        assert cache_path.exists()
+
+        parser = CountingParser()
+        catalog = ImageCatalog(cache_path, parser=parser)
+        assert catalog.refresh(directory) is False
+        assert parser.calls == 0
+        assert catalog.info("Z1000000A_10_MODEL_BOARD_C面.png") == (
+            "MODEL",
+            "BOARD",
+            "C面",
+        )
+
+        other = tmp_path / "other"
+        other.mkdir()
+        assert catalog.find(str(other), "Y8470722R") is None
+        assert len(catalog) == 0
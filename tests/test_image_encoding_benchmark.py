@@ -0,0 +1,105 @@
+"""
+不良画像エンコード形式ベンチマーク
+
+不良画像（最大800×600 + テキスト領域160px）を各出力形式で
+エンコードし、エンコード時間と書き込みバイト数を比較します。
+
+実行方法:
+    python tests/test_image_encoding_benchmark.py
+    python -m pytest tests/test_image_encoding_benchmark.py -v
+"""
+
+import configparser
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.image_exporter import ImageEncodeOptions
+
+# 比較する出力形式（settings.iniの[IMAGE_EXPORT]と同じキー）
+BENCHMARK_SETTINGS = {
+    "png (compress_level=6)": {"format": "png", "png_compress_level": "6"},
+    "png (compress_level=1)": {"format": "png", "png_compress_level": "1"},
+    "png (compress_level=0)": {"format": "png", "png_compress_level": "0"},
+    "jpeg (quality=85)": {"format": "jpeg", "quality": "85"},
+    "webp (quality=80)": {"format": "webp", "quality": "80"},
+}
+
+
+def create_sample_image(size=(960, 600)) -> Image.Image:
+    """基板画像に近い（配線・部品パターンを含む）テスト画像を作成"""
+    rng = random.Random(0)
+    image = Image.new("RGB", size, (20, 110, 40))
+    draw = ImageDraw.Draw(image)
+    for _ in range(1500):
+        x, y = rng.randrange(size[0] - 160), rng.randrange(size[1])
+        w, h = rng.randrange(4, 30), rng.randrange(2, 14)
+        color = rng.choice([(200, 170, 60), (40, 40, 40), (220, 220, 220)])
+        draw.rectangle((x, y, x + w, y + h), fill=color)
+    draw.rectangle((size[0] - 160, 0, size[0], size[1]), fill="white")
+    for i in range(7):
+        draw.text((size[0] - 150, 10 + i * 20), f"LINE {i}: R{100 + i}", fill="black")
+    draw.ellipse((390, 290, 410, 310), outline="red", width=3)
+    return image
+
+
+def options_for(settings: Dict[str, str]) -> ImageEncodeOptions:
+    """設定値の辞書からエンコード設定を作成"""
+    config = configparser.ConfigParser()
+    config["IMAGE_EXPORT"] = settings
+    return ImageEncodeOptions.from_config(config["IMAGE_EXPORT"])
+
+
+def run_benchmark(iterations: int = 5) -> List[Dict]:
+    """各出力形式のエンコード時間と出力サイズを測定"""
+    image = create_sample_image()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, settings in BENCHMARK_SETTINGS.items():
+            options = options_for(settings)
+            path = os.path.join(tmp_dir, f"sample.{options.extension}")
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                options.encode(image, path)
+                timings.append(time.perf_counter() - start)
+            results.append(
+                {
+                    "label": label,
+                    "format": options.pil_format,
+                    "median_ms": statistics.median(timings) * 1000,
+                    "bytes": os.path.getsize(path),
+                }
+            )
+    return results
+
+
+def print_results(results: List[Dict]):
+    """結果を表形式で表示"""
+    print(f"{'出力形式':<26}{'実形式':<8}{'エンコード(ms)':>16}{'サイズ(KB)':>12}")
+    for row in results:
+        print(
+            f"{row['label']:<26}{row['format']:<8}"
+            f"{row['median_ms']:>16.1f}{row['bytes'] / 1024:>12.1f}"
+        )
+
+
+def test_image_encoding_benchmark():
+    """全ての出力形式でエンコードでき、サイズが報告されること"""
+    results = run_benchmark(iterations=1)
+    print_results(results)
+    assert len(results) == len(BENCHMARK_SETTINGS)
+    assert all(row["bytes"] > 0 for row in results)
+
+
+if __name__ == "__main__":
+    print_results(run_benchmark())
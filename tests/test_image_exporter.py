@@ -0,0 +1,151 @@
+"""
+不良画像出力のテスト
+
+バックグラウンド出力が即座に出力予定パスを返し、
+キャッシュ済みの基板画像を再利用して画像を書き出すこと、
+未開始の先読みを取り消せること、出力の完了を待たずに登録した
+削除が出力の後に記録されること、終了時の完了待ちを打ち切れることを
+確認します。
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image
+
+from src.services.image_exporter import BaseImageCache, DefectImageExporter
+from src.services.task_executor import TaskExecutor
+from src.services.write_spool import WriteSpool
+
+
+@dataclass
+class SampleDefect:
+    lot_number: str = "1234567-10"
+    current_board_index: int = 1
+    defect_number: str = "1"
+    reference: str = "R101"
+    defect_name: str = "はんだ少"
+    serial: str = ""
+    aoi_user: str = ""
+    x: Optional[float] = 0.5
+    y: Optional[float] = 0.5
+
+
+class TestDefectImageExporter:
+    """DefectImageExporterのテストクラス"""
+
+    def create_board_image(self, tmp_path, size=(1600, 1200)):
+        path = tmp_path / "Y8470722R_20_CN-SNDDJ0CJ_411CA_S面.jpg"
+        Image.new("RGB", size, "green").save(path)
+        return str(path)
+
+    def test_submit_returns_path_and_writes_in_background(self, tmp_path):
+        """submitは出力予定パスを返し、waitで出力が完了する"""
+        board_image = self.create_board_image(tmp_path)
+        output_dir = tmp_path / "1234567-10"
+        exporter = DefectImageExporter(max_image_size=(800, 600))
+        results = []
+
+        path = exporter.submit(
+            SampleDefect(),
+            board_image,
+            str(output_dir),
+            "1234567-10_1_1",
+            on_done=lambda p, e: results.append((p, e)),
+        )
+
+        assert exporter.wait(timeout=30)
+        exporter.shutdown()
+        assert results == [(path, None)]
+        with Image.open(path) as image:
+            assert image.size == (800 + 160, 600)
+
+    def test_spool_records_export_and_delete(self, tmp_path):
+        """スプールを指定した場合は出力・削除を記録し、反映時に書き込む"""
+        board_image = self.create_board_image(tmp_path)
+        output_dir = tmp_path / "share" / "1234567-10"
+        spool = WriteSpool(tmp_path / "spool")
+        exporter = DefectImageExporter(max_image_size=(800, 600), spool=spool)
+
+        path = exporter.export(
+            SampleDefect(), board_image, str(output_dir), "1234567-10_1_1"
+        )
+        assert not output_dir.exists()
+        assert spool.pending() == 1
+
+        spool.replay()
+        with Image.open(path) as image:
+            assert image.size == (800 + 160, 600)
+
+        exporter.delete(str(output_dir), "1234567-10_1_1")
+        spool.replay()
+        assert list(output_dir.iterdir()) == []
+
+    def test_base_image_is_decoded_once(self, tmp_path):
+        """同じ基板画像は再デコードせずキャッシュを返す"""
+        board_image = self.create_board_image(tmp_path)
+        cache = BaseImageCache()
+
+        first = cache.get(board_image, (800, 600))
+        second = cache.get(board_image, (800, 600))
+
+        assert first is second
+        assert first.size == (800, 600)
+
+    def test_cancel_prefetch_skips_queued_decode(self, tmp_path):
+        """指図の切り替え時に未開始の先読みを取り消し、デコードしない"""
+        board_image = self.create_board_image(tmp_path)
+        executor = TaskExecutor({"export": 1})
+        exporter = DefectImageExporter(executor=executor)
+        release = threading.Event()
+        executor.submit("export", release.wait, 5)
+
+        future = exporter.prefetch(board_image)
+        assert exporter.cancel_prefetch() == 1
+        release.set()
+        assert exporter.wait(timeout=5)
+        assert future.cancelled()
+        assert exporter.cache.nbytes() == 0
+        executor.shutdown()
+
+    def test_after_exports_runs_behind_pending_exports(self, tmp_path):
+        """出力中の画像の削除は待機せずに登録し、出力の記録の後にスプールへ記録する"""
+        board_image = self.create_board_image(tmp_path)
+        output_dir = tmp_path / "share" / "1234567-10"
+        spool = WriteSpool(tmp_path / "spool")
+        executor = TaskExecutor({"export": 1})
+        exporter = DefectImageExporter(
+            max_image_size=(800, 600), spool=spool, executor=executor
+        )
+        release = threading.Event()
+        executor.submit("export", release.wait, 5)
+        exporter.submit(SampleDefect(), board_image, str(output_dir), "1234567-10_1_1")
+
+        deleted = exporter.after_exports(
+            exporter.delete, str(output_dir), "1234567-10_1_1"
+        )
+        renamed = exporter.after_exports(spool.put, "rename", str(output_dir))
+        assert not deleted.done() and not renamed.done()
+        assert spool.pending() == 0
+
+        release.set()
+        assert exporter.wait(timeout=30)
+        assert deleted.result() == "画像の削除を登録しました: 1234567-10_1_1"
+        kinds = [entry["kind"] for entry in spool._entries]
+        assert kinds == ["file", "delete", "delete", "delete", "rename"]
+        executor.shutdown()
+
+    def test_shutdown_wait_is_bounded(self, tmp_path):
+        """終了時の出力の完了待ちは指定した時間で打ち切る"""
+        board_image = self.create_board_image(tmp_path)
+        executor = TaskExecutor({"export": 1})
+        exporter = DefectImageExporter(executor=executor)
+        release = threading.Event()
+        executor.submit("export", release.wait, 5)
+        exporter.submit(SampleDefect(), board_image, str(tmp_path), "1234567-10_1_1")
+
+        assert not exporter.shutdown(wait=True, timeout=0.05)
+        release.set()
+        assert exporter.shutdown(wait=True, timeout=30)
+        executor.shutdown()
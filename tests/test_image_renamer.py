@@ -0,0 +1,79 @@
+"""
+不良画像リネームのテスト
+
+削除後の番号振り直しで、番号が変わる画像のみが
+上書きなしでリネームされることを確認します。
+"""
+
+from dataclasses import dataclass
+
+from src.services.image_renamer import DefectImageRenamer
+
+
+@dataclass
+class SampleDefect:
+    lot_number: str
+    current_board_index: int
+    defect_number: str
+    image_path: str = ""
+
+
+class TestDefectImageRenamer:
+    """DefectImageRenamerのテストクラス"""
+
+    def test_plan_renumber_returns_only_changed_items(self):
+        """削除した不良より後ろの同一基板の不良のみが対象になる"""
+        defects = [
+            SampleDefect("1234567-10", 1, "1"),
+            SampleDefect("1234567-10", 1, "2"),
+            SampleDefect("1234567-10", 2, "1"),
+            SampleDefect("1234567-10", 2, "3"),
+            SampleDefect("1234567-10", 2, "4"),
+            SampleDefect("1234567-10", 3, "1"),
+        ]
+
+        plan = DefectImageRenamer.plan_renumber(defects)
+
+        assert [(item.current_board_index, old, new) for item, old, new in plan] == [
+            (2, "3", "2"),
+            (2, "4", "3"),
+        ]
+
+    def test_rename_all_handles_overlapping_names(self, tmp_path):
+        """旧名と新名が重なっても内容が入れ替わらない"""
+        lot_dir = tmp_path / "1234567-10"
+        lot_dir.mkdir()
+        defects = [SampleDefect("1234567-10", 1, str(n)) for n in (2, 3, 4)]
+        for defect in defects:
+            path = DefectImageRenamer.image_path(
+                str(tmp_path), defect, defect.defect_number
+            )
+            with open(path, "w") as f:
+                f.write(defect.defect_number)
+
+        plan = DefectImageRenamer.plan_renumber(defects)
+        pairs = [
+            (
+                DefectImageRenamer.image_path(str(tmp_path), item, old),
+                DefectImageRenamer.image_path(str(tmp_path), item, new),
+            )
+            for item, old, new in plan
+        ]
+        result = DefectImageRenamer(max_workers=4).rename_all(pairs)
+
+        assert len(result.renamed) == 3
+        assert not result.errors
+        contents = {p.name: p.read_text() for p in sorted(lot_dir.iterdir())}
+        assert contents == {
+            "1234567-10_1_1.png": "2",
+            "1234567-10_1_2.png": "3",
+            "1234567-10_1_3.png": "4",
+        }
+
+    def test_rename_all_reports_missing_files(self, tmp_path):
+        """存在しない画像はスキップして報告する"""
+        missing = str(tmp_path / "missing.png")
+        result = DefectImageRenamer().rename_all([(missing, missing + ".new")])
+
+        assert result.missing == [missing]
+        assert not result.renamed
@@ -0,0 +1,95 @@
+"""
+Kintoneスタブ・合成データのテスト
+
+スタブが一括処理の上限・スロットリングを模倣すること、
+*.cybozu.com へのrequestsのリクエストがスタブに転送されること、
+合成データが再現可能であることを確認します。
+"""
+
+import requests
+
+from tests.support.kintone_stub import KintoneStub, KintoneStubConfig
+from tests.support.synthetic import make_lot
+
+RECORDS_URL = "https://example.cybozu.com/k/v1/records.json"
+
+
+def record(i):
+    return {"reference": {"value": f"R{i}"}}
+
+
+class TestKintoneStub:
+    """KintoneStubのテストクラス"""
+
+    def test_post_get_update_delete_roundtrip(self):
+        """登録・取得・更新・削除が保存済みレコードに反映される"""
+        with KintoneStub() as stub, stub.redirect():
+            response = requests.post(
+                RECORDS_URL, json={"app": 1, "records": [record(i) for i in range(3)]}
+            )
+            assert response.status_code == 200
+            ids = response.json()["ids"]
+
+            response = requests.put(
+                RECORDS_URL,
+                json={
+                    "app": 1,
+                    "records": [
+                        {"id": ids[0], "record": {"reference": {"value": "X"}}}
+                    ],
+                },
+            )
+            assert response.json()["records"][0]["revision"] == "2"
+
+            requests.delete(RECORDS_URL, json={"app": 1, "ids": [ids[2]]})
+            response = requests.get(RECORDS_URL, params={"app": 1, "query": "limit 10"})
+
+            records = response.json()["records"]
+            assert [r["reference"]["value"] for r in records] == ["X", "R1"]
+            assert stub.stats.requests_for("POST") == 1
+            assert stub.stats.records_written == 4
+
+    def test_bulk_limit_and_throttling(self):
+        """101件の登録は400、N回に1回は429を返す"""
+        config = KintoneStubConfig(throttle_every=3)
+        with KintoneStub(config) as stub, stub.redirect():
+            too_many = {"app": 1, "records": [record(i) for i in range(101)]}
+            statuses = [requests.post(RECORDS_URL, json=too_many).status_code]
+            statuses += [
+                requests.post(
+                    RECORDS_URL, json={"app": 1, "records": [record(0)]}
+                ).status_code
+                for _ in range(5)
+            ]
+
+        assert statuses == [400, 200, 429, 200, 200, 429]
+        assert stub.stats.bulk_errors == 1
+        assert stub.stats.throttled == 2
+
+    def test_api_token_is_checked(self):
+        """APIトークンを設定した場合は一致しないリクエストを401にする"""
+        with KintoneStub(KintoneStubConfig(api_token="secret")) as stub:
+            with stub.redirect():
+                ok = requests.get(
+                    RECORDS_URL,
+                    params={"app": 1},
+                    headers={"X-Cybozu-API-Token": "secret"},
+                )
+                ng = requests.get(RECORDS_URL, params={"app": 1})
+
+        assert ok.status_code == 200
+        assert ng.status_code == 401
+
+
+class TestSynthetic:
+    """合成データのテストクラス"""
+
+    def test_make_lot_is_reproducible(self):
+        """同じシードからは同じデータが生成され、修理データは不良IDを参照する"""
+        defects, repairds = make_lot(50, 10, repaired_ratio=0.5, seed=3)
+        again, _ = make_lot(50, 10, repaired_ratio=0.5, seed=3)
+
+        assert [d.id for d in defects] == [d.id for d in again]
+        assert {d.current_board_index for d in defects} <= set(range(1, 51))
+        assert {r.id for r in repairds} <= {d.id for d in defects}
+        assert 0 < len(repairds) < len(defects)
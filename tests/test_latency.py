@@ -0,0 +1,67 @@
+"""
+操作レイテンシ計測のテスト
+
+ヒストグラムのパーセンタイルが実測値の10%以内に収まること、
+コンテキストマネージャで記録され、区間毎にJSON行で
+出力されることを確認します。
+"""
+
+import json
+
+import pytest
+
+from src.services.latency import LatencyHistogram, LatencyRecorder
+
+
+class TestLatencyHistogram:
+    """LatencyHistogramのテストクラス"""
+
+    def test_percentiles_within_bucket_error(self):
+        """p50/p95/p99はバケット幅（10%）以内の誤差"""
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.add(float(ms))
+
+        assert histogram.percentile(50) == pytest.approx(500, rel=0.1)
+        assert histogram.percentile(95) == pytest.approx(950, rel=0.1)
+        assert histogram.percentile(99) == pytest.approx(990, rel=0.1)
+        assert histogram.percentile(100) == 1000
+        assert 700 <= histogram.count_over(200) <= 800
+
+    def test_empty_histogram(self):
+        """記録がない場合は0を返す"""
+        assert LatencyHistogram().summary(200)["p99_ms"] == 0.0
+
+
+class TestLatencyRecorder:
+    """LatencyRecorderのテストクラス"""
+
+    def test_measure_records_samples(self):
+        """withブロックの処理時間を記録し、例外時も記録される"""
+        recorder = LatencyRecorder()
+
+        with recorder.measure("save"):
+            pass
+        with pytest.raises(RuntimeError):
+            with recorder.measure("kintone_post"):
+                raise RuntimeError("429")
+
+        summary = recorder.summary()
+        assert summary["save"]["count"] == 1
+        assert summary["kintone_post"]["count"] == 1
+
+    def test_dump_writes_window_and_resets(self, tmp_path):
+        """出力は前回出力以降の区間のみ"""
+        log_path = tmp_path / "latency.log"
+        recorder = LatencyRecorder(target_ms=200)
+        for ms in (50, 120, 450):
+            recorder.record("change_lot", ms)
+
+        assert recorder.dump(str(log_path)) == 1
+        assert recorder.dump(str(log_path)) == 0
+
+        record = json.loads(log_path.read_text(encoding="utf-8").splitlines()[0])
+        assert record["name"] == "change_lot"
+        assert record["count"] == 3
+        assert record["over_target"] == 1
+        assert recorder.summary()["change_lot"]["count"] == 3
@@ -0,0 +1,33 @@
+"""
+起動時の遅延インポートのテスト
+
+パッケージのインポートだけでは pandas・PIL・aoi_data_manager 等の
+重いモジュールが読み込まれないことを確認します。
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("numpy", "pandas", "PIL", "aoi_data_manager", "ktec_smt_schedule")
+
+
+class TestLazyImports:
+    """遅延インポートのテストクラス"""
+
+    def test_package_import_does_not_load_heavy_modules(self):
+        """src・src.servicesのインポートで重いモジュールを読み込まない"""
+        code = (
+            "import sys; import src, src.services; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == ""
@@ -0,0 +1,89 @@
+"""
+座標マーカーの座標変換のテスト
+
+配列での変換が1点ずつの変換と同じ結果になること、基板毎の座標の
+抽出がDefectStoreとリストで同じになること、格子索引でクリック位置に
+最も近いマーカーを判定できることを確認します。
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.services.defect_store import DefectStore
+from src.services.marker_geometry import (
+    MarkerGrid,
+    board_coordinates,
+    relative_to_canvas,
+)
+from tests.support.synthetic import make_defects
+
+DISPLAYED = (640, 480)
+OFFSET = (80, 10)
+
+
+class TestTransforms:
+    """相対座標・Canvas座標の変換のテストクラス"""
+
+    def test_matches_scalar_conversion(self):
+        """1点ずつの変換（AOIView.relative_to_canvas_coords相当）と一致する"""
+        xs = np.array([0.0, 0.25, 0.999])
+        ys = np.array([0.5, 0.0, 0.75])
+        canvas_xs, canvas_ys = relative_to_canvas(xs, ys, DISPLAYED, OFFSET)
+
+        for x, y, cx, cy in zip(xs, ys, canvas_xs, canvas_ys):
+            assert cx == x * DISPLAYED[0] + OFFSET[0]
+            assert cy == y * DISPLAYED[1] + OFFSET[1]
+
+
+class TestBoardCoordinates:
+    """基板毎の座標抽出・ヒットテストのテストクラス"""
+
+    def test_store_and_list_agree(self):
+        """DefectStoreとリストで同じ位置・座標を返す"""
+        defects = make_defects(10, 30, seed=3)
+        defects[0].x = None
+        store = DefectStore(defects)
+        board = defects[0].current_board_index
+
+        from_list = board_coordinates(defects, board)
+        from_store = board_coordinates(store, board)
+        for expected, actual in zip(from_list, from_store):
+            assert actual.tolist() == expected.tolist()
+
+        positions, ranks, xs, _ = from_list
+        on_board = [d for d in defects if d.current_board_index == board]
+        assert 0 not in positions.tolist()
+        assert on_board[ranks[0]] is defects[positions[0]]
+        assert xs[0] == defects[positions[0]].x
+
+
+class TestMarkerGrid:
+    """MarkerGridのテストクラス"""
+
+    def test_matches_brute_force(self):
+        """格子索引の判定結果は全件の比較と一致する"""
+        rng = np.random.default_rng(7)
+        xs = rng.random(2000)
+        ys = rng.random(2000)
+        positions = np.arange(2000) * 3
+        grid = MarkerGrid.build(positions, xs, ys)
+        radius_x, radius_y = 8 / 640, 8 / 480
+
+        for x, y in rng.random((200, 2)):
+            distances = ((xs - x) / radius_x) ** 2 + ((ys - y) / radius_y) ** 2
+            nearest = int(np.argmin(distances))
+            expected = positions[nearest] if distances[nearest] <= 1 else None
+            assert grid.nearest(x, y, radius_x, radius_y) == expected
+
+    def test_edges_and_empty(self):
+        """画像の端の点・空の索引"""
+        grid = MarkerGrid.build(
+            np.array([5, 9]), np.array([0.0, 0.999]), np.array([0.0, 1.0])
+        )
+        assert len(grid) == 2
+        assert grid.nearest(0.005, 0.005, 0.01, 0.01) == 5
+        assert grid.nearest(0.995, 0.995, 0.01, 0.01) == 9
+        assert grid.nearest(0.5, 0.5, 0.01, 0.01) is None
+        empty = MarkerGrid.build(np.empty(0, dtype=int), np.empty(0), np.empty(0))
+        assert empty.nearest(0.5, 0.5, 0.01, 0.01) is None
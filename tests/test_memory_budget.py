@@ -0,0 +1,125 @@
+"""
+メモリ予算のテスト
+
+予算に近づいた場合に破棄できるキャッシュが優先度順に破棄され、
+状態の変化が通知されること、SMTスケジュールの列が省メモリな型に
+変換されても検索結果が変わらないことを確認します。
+"""
+
+import configparser
+
+import pytest
+
+from src.services.memory_budget import (
+    MB,
+    MemoryBudget,
+    compact_dataframe,
+    dataframe_nbytes,
+    records_nbytes,
+)
+
+
+class FakeCache:
+    """使用量を指定できるキャッシュ"""
+
+    def __init__(self, nbytes):
+        self.bytes = nbytes
+        self.evicted = 0
+
+    def nbytes(self):
+        return self.bytes
+
+    def clear(self):
+        self.bytes = 0
+        self.evicted += 1
+
+
+class TestMemoryBudget:
+    """MemoryBudgetのテストクラス"""
+
+    def test_evicts_in_priority_order_until_below_warning(self):
+        """警告の閾値を下回るまで優先度の小さいものから破棄する"""
+        budget = MemoryBudget(100, warn_ratio=0.8, process_probe=None)
+        images = FakeCache(40 * MB)
+        thumbnails = FakeCache(30 * MB)
+        budget.register("縮小画像", thumbnails.nbytes, thumbnails.clear, priority=20)
+        budget.register("画像", images.nbytes, images.clear, priority=10)
+        budget.register("不良リスト", lambda: 20 * MB)
+
+        assert budget.check() == "ok"
+        assert images.evicted == 1
+        assert thumbnails.evicted == 0
+        assert budget.last_used_bytes == 50 * MB
+
+    def test_warning_when_nothing_to_evict(self):
+        """破棄できない使用量が閾値を超えた場合は警告・超過を通知する"""
+        budget = MemoryBudget(100, warn_ratio=0.8, process_probe=None)
+        size = {"bytes": 85 * MB}
+        budget.register("SMT計画表", lambda: size["bytes"])
+        events = []
+        budget.add_listener(lambda level, used: events.append(level))
+
+        assert budget.check() == "warning"
+        size["bytes"] = 120 * MB
+        assert budget.check() == "critical"
+        size["bytes"] = 10 * MB
+        assert budget.check() == "ok"
+        assert events == ["warning", "critical", "ok"]
+
+    def test_process_usage_is_considered(self):
+        """プロセス全体の使用量が集計値より大きい場合はそちらで判定する"""
+        budget = MemoryBudget(100, process_probe=lambda: 90 * MB)
+        assert budget.check() == "warning"
+
+    def test_disabled_budget(self):
+        """予算0は無効"""
+        budget = MemoryBudget(0, process_probe=lambda: 10**12)
+        assert not budget.enabled
+        assert budget.check() == "ok"
+
+    def test_from_config(self):
+        """[MEMORY]セクションの読み込み"""
+        config = configparser.ConfigParser()
+        config.read_string("[MEMORY]\nbudget_mb = 512\nwarn_ratio = 0.5\n")
+        budget = MemoryBudget.from_config(config["MEMORY"])
+        assert budget.budget_mb == 512
+        assert budget.warn_ratio == 0.5
+
+
+class TestSizeEstimates:
+    """使用量の推定・省メモリ化のテストクラス"""
+
+    def test_compact_dataframe_keeps_lookup(self):
+        """型を変換しても指図の検索結果は変わらず、使用量は減る"""
+        pd = pytest.importorskip("pandas")
+        df = pd.DataFrame(
+            {
+                "lot_number": [f"{1000000 + i}-10" for i in range(1000)],
+                "model_code": [f"MODEL-{i % 5}" for i in range(1000)],
+                "machine_name": [f"LINE{i % 3}" for i in range(1000)],
+                "quantity": list(range(1000)),
+                "ratio": [i / 7 for i in range(1000)],
+            }
+        )
+        compact = compact_dataframe(df)
+
+        assert dataframe_nbytes(compact) < dataframe_nbytes(df)
+        assert compact["lot_number"].dtype == object
+        assert str(compact["model_code"].dtype) == "category"
+        record = compact[compact["lot_number"] == "1000007-10"].iloc[0].to_dict()
+        assert record["model_code"] == "MODEL-2"
+        assert record["machine_name"] == "LINE1"
+        assert record["quantity"] == 7
+
+    def test_records_nbytes_scales_with_length(self):
+        """不良リストの推定使用量は件数に比例する"""
+
+        class Record:
+            def __init__(self, i):
+                self.reference = f"R{i}"
+                self.x = i
+
+        small = records_nbytes([Record(i) for i in range(10)])
+        large = records_nbytes([Record(i) for i in range(1000)])
+        assert records_nbytes([]) == 0
+        assert large > small * 50
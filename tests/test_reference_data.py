@@ -0,0 +1,59 @@
+"""
+参照データレジストリのテスト
+
+defect_mapping.csv / user.csv が一度だけ読み込まれ、
+ファイルが更新された場合のみ再読み込みされることを確認します。
+"""
+
+import os
+
+import pytest
+
+from src.services.reference_data import MtimeCachedFile, ReferenceData
+
+
+def write_csv(path, text, mtime=None):
+    path.write_text(text, encoding="utf-8-sig")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestReferenceData:
+    """ReferenceDataのテストクラス"""
+
+    def test_defect_mapping_parses_float_numbers(self, tmp_path):
+        """pandasで保存された "1.0" 形式の番号も整数として扱う"""
+        mapping_path = tmp_path / "defect_mapping.csv"
+        write_csv(mapping_path, "no,name\n1.0,ショート\n2,未はんだ\n,\n")
+        data = ReferenceData(mapping_path, tmp_path / "user.csv")
+
+        assert data.defect_mapping() == {1: "ショート", 2: "未はんだ"}
+        assert data.defect_name(1) == "ショート"
+        assert data.defect_name(99) is None
+
+    def test_users_reload_only_when_file_changes(self, tmp_path):
+        """更新日時が変わった場合のみ再読み込みする"""
+        user_path = tmp_path / "user.csv"
+        write_csv(user_path, "id,name\nA001,山田\n", mtime=1_000_000)
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return {"count": len(calls)}
+
+        cached = MtimeCachedFile(user_path, loader)
+        assert cached.get() == {"count": 1}
+        assert cached.get() == {"count": 1}
+
+        write_csv(user_path, "id,name\nA001,山田\nB002,佐藤\n", mtime=1_000_100)
+        assert cached.get() == {"count": 2}
+
+        data = ReferenceData(tmp_path / "defect_mapping.csv", user_path)
+        assert data.user_name("B002") == "佐藤"
+        assert data.has_user("C003") is False
+
+    def test_missing_file_raises(self, tmp_path):
+        """ファイルが存在しない場合はFileNotFoundError"""
+        data = ReferenceData(tmp_path / "none.csv", tmp_path / "user.csv")
+        with pytest.raises(FileNotFoundError):
+            data.defect_mapping()
@@ -0,0 +1,92 @@
+"""
+NAS接続状態の監視のテスト
+
+応答時間・失敗から正常／遅延／切断を判定すること、応答がない確認を
+待ち続けないこと、状態が変わった場合のみ通知することを確認します。
+"""
+
+import threading
+import time
+
+from src.services.share_health import ShareHealthMonitor
+
+
+class FakeProber:
+    """ディレクトリ毎に遅延・失敗を指定できる確認関数"""
+
+    def __init__(self):
+        self.delays = {}
+        self.failing = set()
+        self.blocked = {}
+
+    def __call__(self, path):
+        if path in self.blocked:
+            self.blocked[path].wait()
+        time.sleep(self.delays.get(path, 0))
+        if path in self.failing:
+            raise OSError(f"接続できません: {path}")
+
+
+class TestShareHealthMonitor:
+    """ShareHealthMonitorのテストクラス"""
+
+    def test_states_from_latency_and_errors(self):
+        """応答時間・失敗から各ディレクトリと全体の状態を判定する"""
+        prober = FakeProber()
+        monitor = ShareHealthMonitor(
+            {"image": "//nas/image", "data": "//nas/data", "plan": ""},
+            degraded_ms=20,
+            prober=prober,
+        )
+        assert monitor.state == "unknown"
+        assert monitor.is_down("data") is False
+        assert monitor.check_now() == "healthy"
+        assert set(monitor.statuses()) == {"image", "data"}
+
+        prober.delays["//nas/image"] = 0.05
+        assert monitor.check_now() == "degraded"
+        assert monitor.status("image").latency_ms >= 20
+
+        prober.failing.add("//nas/data")
+        assert monitor.check_now() == "down"
+        assert monitor.is_down("data")
+        assert "接続できません" in monitor.status("data").error
+
+    def test_hung_probe_is_down_without_waiting(self):
+        """応答がない確認は待ち続けずに切断とし、次の確認で重複して開始しない"""
+        prober = FakeProber()
+        release = threading.Event()
+        prober.blocked["//nas/data"] = release
+        monitor = ShareHealthMonitor(
+            {"image": "//nas/image", "data": "//nas/data"},
+            timeout_s=0.1,
+            prober=prober,
+        )
+        calls = []
+        monitor.prober = lambda path: calls.append(path) or prober(path)
+
+        start = time.monotonic()
+        assert monitor.check_now() == "down"
+        assert time.monotonic() - start < 1.0
+        assert monitor.status("image").state == "healthy"
+        assert monitor.check_now() == "down"
+        assert calls.count("//nas/data") == 1
+
+        release.set()
+        time.sleep(0.05)
+        assert monitor.check_now() == "healthy"
+
+    def test_listeners_on_change_and_targets(self):
+        """いずれかの状態が変わった場合のみ通知し、パスの変更で状態を初期化する"""
+        prober = FakeProber()
+        monitor = ShareHealthMonitor({"data": "//nas/data"}, prober=prober)
+        events = []
+        monitor.add_listener(lambda state, statuses: events.append(state))
+
+        monitor.check_now()
+        monitor.check_now()
+        assert events == ["healthy"]
+
+        monitor.set_targets({"data": "//nas/other"})
+        assert events == ["healthy", "unknown"]
+        assert monitor.status("data").path == "//nas/other"
@@ -0,0 +1,96 @@
+"""
+共有データベースの読み取り専用クエリのテスト
+
+コピーせずに指図の行だけを取得すること、他の接続による書き込みを
+次のクエリで反映すること、読み取り専用で開くことを確認します。
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+from src.services.shared_db_reader import SharedDbReader, sqlite_readonly_uri
+
+
+@dataclass
+class Record:
+    """テスト用の不良情報"""
+
+    id: str = ""
+    lot_number: str = ""
+    defect_name: str = ""
+    x: Optional[float] = None
+
+
+def create_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE repaird_info (id TEXT PRIMARY KEY, is_repaird TEXT)")
+    conn.execute(
+        "CREATE TABLE defect_info (id TEXT PRIMARY KEY, lot_number TEXT,"
+        " defect_name TEXT, x REAL, extra TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO defect_info (id, lot_number, defect_name, x) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+class TestSharedDbReader:
+    """SharedDbReaderのテストクラス"""
+
+    def test_get_by_lot(self, tmp_path):
+        """指図の行だけを共通の列でレコードに変換する"""
+        path = tmp_path / "aoi_data.db"
+        create_db(
+            path,
+            [("a", "1234567-10", "ブリッジ", 1.5), ("b", "7654321-10", "欠品", 2.0)],
+        )
+        reader = SharedDbReader(path, Record)
+
+        assert reader.get_by_lot("1234567-10") == [
+            Record("a", "1234567-10", "ブリッジ", 1.5)
+        ]
+        assert reader.table == "defect_info"
+        assert reader.get_by_lot("0000000-00") == []
+        reader.close()
+
+    def test_sees_writes_from_other_connections(self, tmp_path):
+        """接続を開いたまま、他の端末のマージを次のクエリで反映する"""
+        path = tmp_path / "aoi_data.db"
+        create_db(path, [("a", "1234567-10", "ブリッジ", None)])
+        reader = SharedDbReader(path, Record)
+        assert len(reader.get_by_lot("1234567-10")) == 1
+
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "INSERT INTO defect_info (id, lot_number) VALUES ('c', '1234567-10')"
+        )
+        conn.commit()
+        conn.close()
+        assert [r.id for r in reader.get_by_lot("1234567-10")] == ["a", "c"]
+        reader.close()
+
+    def test_read_only_and_reconnect(self, tmp_path):
+        """読み取り専用で開き、存在しない場合は失敗後に開き直す"""
+        path = tmp_path / "aoi_data.db"
+        reader = SharedDbReader(path, Record)
+        with pytest.raises(sqlite3.Error):
+            reader.get_by_lot("1234567-10")
+        assert not path.exists()
+
+        create_db(path, [("a", "1234567-10", "", None)])
+        assert len(reader.get_by_lot("1234567-10")) == 1
+        with pytest.raises(sqlite3.Error):
+            reader._conn.execute("DELETE FROM defect_info")
+        reader.close()
+
+    def test_readonly_uri(self, tmp_path):
+        """パスの空白・日本語をエスケープしたmode=roのURIを作成する"""
+        path = tmp_path / "共有 DB" / "aoi_data.db"
+        uri = sqlite_readonly_uri(path)
+        assert uri.startswith("file:///") and uri.endswith("?mode=ro")
+        assert " " not in uri and "%20" in uri
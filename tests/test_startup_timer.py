@@ -0,0 +1,79 @@
+"""
+起動時間計測のテスト
+
+全段階が記録された時点でバージョン付きのJSON行がログに出力されること、
+ローテーション済みのログを含めてバージョン間で比較できることを確認します。
+"""
+
+import json
+
+import pytest
+
+from src.services.startup_timer import (
+    StartupTimer,
+    compare_versions,
+    read_records,
+)
+
+
+class TestStartupTimer:
+    """StartupTimerのテストクラス"""
+
+    def test_writes_once_when_all_phases_recorded(self, tmp_path):
+        """全段階が揃った時点で1回だけ出力する"""
+        log_path = tmp_path / "startup_timing.log"
+        timer = StartupTimer(expected=("imports", "first_paint", "db_ready"))
+        timer.configure(str(log_path), version="1.2.3")
+
+        timer.mark("imports")
+        timer.mark("first_paint")
+        assert not log_path.exists()
+        with timer.phase("db_ready"):
+            pass
+        timer.mark("imports")
+
+        lines = log_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        assert record["version"] == "1.2.3"
+        assert list(record["marks"]) == ["imports", "first_paint", "db_ready"]
+        assert "db_ready" in record["durations"]
+        assert record["missing"] == []
+        assert timer.write_report() is False
+
+    def test_phase_records_error_and_reraises(self, tmp_path):
+        """失敗した段階もエラーとして記録される"""
+        timer = StartupTimer(expected=("kintone_ready", "schedule_ready"))
+        with pytest.raises(ConnectionError):
+            with timer.phase("kintone_ready"):
+                raise ConnectionError("timeout")
+
+        record = timer.record()
+        assert record["errors"] == {"kintone_ready": "timeout"}
+        assert record["missing"] == ["schedule_ready"]
+
+    def test_compare_versions_uses_rotated_logs(self, tmp_path):
+        """ローテーション済みのファイルも含めてバージョン毎の中央値を集計する"""
+        log_path = tmp_path / "startup_timing.log"
+        rotated = tmp_path / "startup_timing.log.1"
+        rotated.write_text(
+            json.dumps({"version": "0.1", "total": 5.0, "marks": {"imports": 2.0}})
+            + "\n",
+            encoding="utf-8",
+        )
+        log_path.write_text(
+            "\n".join(
+                json.dumps({"version": v, "total": t, "marks": {"imports": i}})
+                for v, t, i in [("0.1", 3.0, 1.0), ("0.2", 1.0, 0.2)]
+            )
+            + "\nnot json\n",
+            encoding="utf-8",
+        )
+
+        comparison = compare_versions(read_records(str(log_path)))
+
+        count, medians = comparison["0.1"]
+        assert count == 2
+        assert medians["imports"] == pytest.approx(1.5)
+        assert medians["total"] == pytest.approx(4.0)
+        assert comparison["0.2"][1]["total"] == pytest.approx(1.0)
@@ -0,0 +1,91 @@
+"""
+バックグラウンド処理の実行キューのテスト
+
+キュー毎の同時実行数を超えないこと、同じキーの処理を登録順に実行すること、
+未開始の処理を取り消せること、待ち件数を返すことを確認します。
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.services import DefectImageExporter
+from src.services.task_executor import TaskExecutor
+
+
+class TestTaskExecutor:
+    """TaskExecutorのテストクラス"""
+
+    def test_concurrency_is_bounded_per_queue(self):
+        """キュー毎の同時実行数を超えて実行しない"""
+        executor = TaskExecutor({"io": 2})
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def task():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+
+        futures = [executor.submit("io", task) for _ in range(8)]
+        assert executor.wait(timeout=5)
+        assert all(f.done() for f in futures)
+        assert max(peak) == 2
+        executor.shutdown()
+
+    def test_same_key_runs_in_order(self):
+        """同じキーの処理は登録順に1つずつ、異なるキーは並列に実行する"""
+        executor = TaskExecutor({"kintone": 2})
+        order = []
+        release = threading.Event()
+
+        executor.submit("kintone", release.wait, 5, key="lot-a")
+        executor.submit("kintone", order.append, "a2", key="lot-a")
+        executor.submit("kintone", order.append, "b1", key="lot-b")
+        time.sleep(0.05)
+        assert order == ["b1"]
+        assert executor.stats()["kintone"] == {"queued": 1, "running": 1}
+
+        release.set()
+        assert executor.wait(timeout=5)
+        assert order == ["b1", "a2"]
+        executor.shutdown()
+
+    def test_cancel_and_pending(self):
+        """未開始の処理を取り消し、結果・例外をFutureで返す"""
+        executor = TaskExecutor({"db": 1})
+        release = threading.Event()
+        executor.submit("db", release.wait, 5)
+        queued = [executor.submit("db", lambda: 1, key=k) for k in ("a", "b", "a")]
+        assert executor.pending("db") == 4
+
+        assert executor.cancel("db", key="a") == 2
+        assert queued[0].cancelled() and queued[2].cancelled()
+        release.set()
+        assert queued[1].result(timeout=5) == 1
+        assert executor.pending() == 0
+
+        failed = executor.submit("db", lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            failed.result(timeout=5)
+        assert executor.shutdown(timeout=5)
+        with pytest.raises(RuntimeError):
+            executor.submit("db", lambda: None)
+
+    def test_image_exporter_uses_export_queue(self, tmp_path):
+        """不良画像の出力を共通の実行キューで実行する"""
+        executor = TaskExecutor({"export": 1})
+        exporter = DefectImageExporter(executor=executor)
+        calls = []
+        exporter.export = lambda *args: calls.append(args)
+
+        exporter.submit(object(), "board.jpg", str(tmp_path), "defect")
+        assert exporter.wait(timeout=5)
+        assert len(calls) == 1
+        exporter.shutdown(wait=True)
+        executor.shutdown()
@@ -0,0 +1,94 @@
+"""
+UI更新の一括反映のテスト
+
+同じキーの更新は最新の値のみを反映すること、登録順に反映すること、
+キーなしの更新は置き換えないこと、ワーカースレッドから登録できること、
+1つの更新の例外が他の更新を止めないことを確認します。
+"""
+
+import threading
+
+from src.services.ui_dispatcher import UiDispatcher
+
+
+class FakeWidget:
+    """afterの登録のみを記録するテスト用のウィジェット"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self._next_id = 0
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self.scheduled[self._next_id] = func
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def run_pending(self):
+        for after_id in list(self.scheduled):
+            self.scheduled.pop(after_id)()
+
+
+class TestUiDispatcher:
+    """UiDispatcherのテストクラス"""
+
+    def test_same_key_is_coalesced(self):
+        """同じキーの未反映の更新は最新の値のみを最後に反映する"""
+        dispatcher = UiDispatcher(FakeWidget())
+        applied = []
+        dispatcher.post("status", applied.append, "読み込み中")
+        dispatcher.post("smt", applied.append, "SMT")
+        dispatcher.post("status", applied.append, "完了")
+        dispatcher.post(None, applied.append, "dialog1")
+        dispatcher.post(None, applied.append, "dialog2")
+
+        assert len(dispatcher) == 4
+        assert dispatcher.drain() == 4
+        assert applied == ["SMT", "完了", "dialog1", "dialog2"]
+        assert dispatcher.coalesced == 1
+        assert dispatcher.drain() == 0
+
+    def test_tick_applies_posts_from_threads(self):
+        """ワーカースレッドからの更新を定期処理でまとめて反映する"""
+        widget = FakeWidget()
+        dispatcher = UiDispatcher(widget)
+        dispatcher.start()
+        applied = []
+
+        threads = [
+            threading.Thread(
+                target=lambda n=n: [
+                    dispatcher.post(f"label{n}", applied.append, (n, i))
+                    for i in range(100)
+                ]
+            )
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert applied == []
+
+        widget.run_pending()
+        assert sorted(applied) == [(n, 99) for n in range(4)]
+        assert dispatcher.coalesced == 4 * 99
+        # 次回の定期処理が登録されている
+        assert len(widget.scheduled) == 1
+
+        dispatcher.post("status", applied.append, "x")
+        dispatcher.stop()
+        assert widget.scheduled == {}
+        assert len(dispatcher) == 0
+
+    def test_error_does_not_block_other_updates(self):
+        """1つの更新の例外で他の更新を止めない"""
+        dispatcher = UiDispatcher(FakeWidget())
+        applied = []
+        dispatcher.post("broken", lambda: 1 / 0)
+        dispatcher.post("status", applied.append, "ok")
+
+        assert dispatcher.drain() == 2
+        assert applied == ["ok"]
@@ -0,0 +1,171 @@
+"""
+ローカルスプールのテスト
+
+書き込みがスプールに記録され、接続できる場合に記録順に反映されること、
+接続できない間の記録が次回起動時にも残り反映されること、一時的な失敗は
+間隔を延ばしながら再試行し、それ以外の失敗の記録のみfailedに移して
+後続の反映を止めないこと、書き込み途中の一時ファイルを削除することを
+確認します。
+"""
+
+import os
+
+from src.services.write_spool import KIND_DELETE, WriteSpool
+
+
+def write_text(text):
+    def _write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    return _write
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class TestWriteSpool:
+    """WriteSpoolのテストクラス"""
+
+    def test_replays_in_order(self, tmp_path):
+        """記録順に反映し、反映後はスプールから削除する"""
+        share = tmp_path / "share"
+        spool = WriteSpool(tmp_path / "spool")
+        target = str(share / "1234567-10" / "1234567-10_1_1.png")
+        counts = []
+        spool.add_listener(counts.append)
+
+        spool.put_file(target, write_text("v1"), suffix=".png")
+        spool.put(KIND_DELETE, target)
+        spool.put_file(target, write_text("v2"), suffix=".png")
+        assert spool.pending() == 3
+        assert not os.path.exists(target)
+
+        assert spool.replay() == 3
+        assert read_text(target) == "v2"
+        assert spool.pending() == 0
+        assert counts[-1] == 0
+        assert os.listdir(tmp_path / "spool") == []
+
+    def test_offline_entries_survive_restart(self, tmp_path):
+        """接続できない間は反映せず、次回起動時に記録順に反映する"""
+        online = {"value": False}
+        calls = []
+        spool = WriteSpool(
+            tmp_path / "spool", is_available=lambda target: online["value"]
+        )
+        spool.register("merge", lambda entry: calls.append(entry["args"]["n"]))
+        spool.put("merge", "//nas/db", {"n": 1})
+        spool.put_file(str(tmp_path / "out.csv"), write_text("a"))
+        spool.put("merge", "//nas/db", {"n": 2})
+        assert spool.replay() == 0
+
+        restarted = WriteSpool(
+            tmp_path / "spool", is_available=lambda target: online["value"]
+        )
+        restarted.register("merge", lambda entry: calls.append(entry["args"]["n"]))
+        assert restarted.pending() == 3
+        assert restarted.pending("merge") == 2
+        online["value"] = True
+        assert restarted.replay() == 3
+        assert calls == [1, 2]
+        assert read_text(tmp_path / "out.csv") == "a"
+
+        # 連番は前回の続きから振られる
+        entry = restarted.put("merge", "//nas/db", {"n": 3})
+        assert entry["seq"] == 4
+
+    def test_latest_reads_pending_entry_without_replay(self, tmp_path):
+        """反映を待たずに種類・反映先毎の最新の未反映の記録を参照できる"""
+        spool = WriteSpool(tmp_path / "spool", is_available=lambda target: False)
+        spool.register("sync", lambda entry: None)
+        spool.put("sync", "//nas/a.csv", {"rows": [1]})
+        spool.put("sync", "//nas/b.csv", {"rows": [2]})
+        spool.put("sync", "//nas/a.csv", {"rows": [1, 3]})
+
+        assert spool.latest("sync", "//nas/a.csv")["args"]["rows"] == [1, 3]
+        assert spool.latest("sync", "//nas/c.csv") is None
+        assert spool.latest("other", "//nas/a.csv") is None
+
+    def test_transient_failures_retry_with_backoff(self, tmp_path):
+        """一時的な失敗（OSError）は間隔を延ばしながら反映できるまで再試行する"""
+        online = {"value": False}
+        attempts = []
+
+        def _flaky(entry):
+            attempts.append(entry["seq"])
+            if not online["value"]:
+                raise OSError("共有ディレクトリに接続できません")
+
+        spool = WriteSpool(
+            tmp_path / "spool", retry_interval_s=60, max_retry_interval_s=600
+        )
+        spool.register("flaky", _flaky)
+        spool.put("flaky", "//nas/db")
+        spool.put_file(str(tmp_path / "out.txt"), write_text("ok"))
+
+        assert spool.replay() == 0
+        # 再試行の時刻まで反映を試みない
+        assert spool.replay() == 0
+        assert attempts == [1]
+        assert spool.latest("flaky", "//nas/db")["retry_at"] > 0
+
+        for _ in range(10):
+            spool.kick()
+            assert spool.replay() == 0
+        assert len(attempts) == 11
+        assert spool.pending() == 2
+        assert spool.failed() == 0
+
+        online["value"] = True
+        spool.kick()
+        assert spool.replay() == 2
+        assert read_text(tmp_path / "out.txt") == "ok"
+        assert not os.path.exists(tmp_path / "spool" / "failed")
+
+    def test_permanent_failures_move_to_failed(self, tmp_path):
+        """OSError以外の失敗の記録はfailedに移して後続を反映し、件数を数える"""
+
+        def _broken(entry):
+            raise ValueError("内容が不正です")
+
+        spool = WriteSpool(tmp_path / "spool")
+        spool.register("broken", _broken)
+        spool.put("broken", "//nas/db")
+        spool.put("unknown", "//nas/db")
+        spool.put_file(str(tmp_path / "out.txt"), write_text("ok"))
+
+        assert spool.replay() == 1
+        assert spool.failed() == 2
+        assert read_text(tmp_path / "out.txt") == "ok"
+        assert sorted(os.listdir(tmp_path / "spool" / "failed")) == [
+            "0000000001.json",
+            "0000000002.json",
+        ]
+        # 次回起動時もfailedの件数を引き継ぐ
+        assert WriteSpool(tmp_path / "spool").failed() == 2
+
+    def test_load_removes_leftover_temp_files(self, tmp_path):
+        """書き込み途中で終了した一時ファイルは次回起動時に削除する"""
+        spool_dir = tmp_path / "spool"
+        spool = WriteSpool(spool_dir, is_available=lambda target: False)
+        spool.put("merge", "//nas/db", {"n": 1})
+        (spool_dir / "0000000002.json.tmp").write_text("{", encoding="utf-8")
+
+        restarted = WriteSpool(spool_dir, is_available=lambda target: False)
+        assert restarted.pending() == 1
+        assert sorted(os.listdir(spool_dir)) == ["0000000001.json"]
+
+    def test_drain_with_worker(self, tmp_path):
+        """反映スレッドが記録を反映し、drainで完了を待てる"""
+        spool = WriteSpool(tmp_path / "spool", retry_interval_s=0.05)
+        spool.start()
+        try:
+            for i in range(5):
+                spool.put_file(str(tmp_path / f"{i}.txt"), write_text(str(i)))
+            assert spool.drain(timeout=5)
+            assert read_text(tmp_path / "4.txt") == "4"
+        finally:
+            spool.stop()